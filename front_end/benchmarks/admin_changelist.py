@@ -0,0 +1,114 @@
+"""
+Page load times of the user admin changelist on large user tables.
+
+For each table size, generated users are added (generate_users) and a
+handful of changelist pages are timed with the stock changelist (COUNT(*),
+OFFSET pages, full facet counts) and with the fast one (estimated counts,
+keyset pages, cached facet counts). Run it from the front_end directory
+against a local Postgres:
+
+    python -m benchmarks.admin_changelist --sizes 10000 1000000 10000000
+
+Remove the generated users afterwards with
+``python manage.py generate_users --count 0 --delete``.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from benchmarks import driver
+
+EMAIL = "benchmark-admin@spendingtree.local"
+PASSWORD = "bench-password-123"
+PATH = "/admin/registration/user/"
+PREFIX = "generated"
+
+
+def pages(size):
+    """Return (name, stock query, fast query) for each page to time."""
+    from registration.models import User
+
+    per_page = 100
+    middle = size // 2
+    email = (
+        User.objects.order_by("email").values_list("email", flat=True)[middle]
+        if size
+        else ""
+    )
+    return [
+        ("first page", "", ""),
+        ("middle page", f"?p={middle // per_page}", f"?after={email}"),
+        ("admins", "?is_admin__exact=1", "?is_admin=1"),
+        ("non-admins", "?is_admin__exact=0", "?is_admin=0"),
+        ("search", f"?q={PREFIX}12345", f"?q={PREFIX}12345"),
+    ]
+
+
+def use_stock_changelist(model_admin):
+    """Switch ``model_admin`` to the stock paginator, counts and pages."""
+    from django.contrib.admin.views.main import ChangeList
+    from django.core.paginator import Paginator
+
+    model_admin.paginator = Paginator
+    model_admin.show_full_result_count = True
+    model_admin.list_filter = ("is_admin",)
+    model_admin.get_changelist = lambda request, **kwargs: ChangeList
+
+
+def time_page(session, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = session.request("GET", PATH + query)
+        timings.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(f"{PATH}{query} returned {response.status}")
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 1000000, 10000000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    wsgi_app, _ = driver.setup()
+    from django.contrib import admin
+    from django.core.cache import cache
+    from django.core.management import call_command
+
+    from registration.models import User
+
+    user = driver.ensure_user(EMAIL, PASSWORD)
+    if not user.is_admin:
+        user.is_admin = True
+        user.save()
+    session = driver.Session(wsgi_app)
+    session.login(EMAIL, PASSWORD)
+
+    model_admin = admin.site._registry[User]
+    fast = {
+        name: getattr(model_admin, name)
+        for name in ("paginator", "show_full_result_count", "list_filter")
+    }
+
+    print(f"{'users':>10} {'page':<12} {'stock ms':>10} {'fast ms':>10}")
+    for size in sorted(args.sizes):
+        call_command("generate_users", count=size, prefix=PREFIX, stdout=io.StringIO())
+        total = User.objects.count()
+        for name, stock_query, fast_query in pages(size):
+            use_stock_changelist(model_admin)
+            stock = time_page(session, stock_query, args.repeat)
+            for attribute, value in fast.items():
+                setattr(model_admin, attribute, value)
+            del model_admin.get_changelist
+            cache.clear()
+            fast_ms = time_page(session, fast_query, args.repeat)
+            print(f"{total:>10} {name:<12} {stock:>10.1f} {fast_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Side-by-side throughput of the WSGI and ASGI entry points.
+
+WSGI requests run on a thread pool the size of the concurrency level, like
+a threaded server would. ASGI requests run as concurrent tasks on one event
+loop and are served by the async-native views. Run it from the front_end
+directory against a migrated database:
+
+    python -m benchmarks.asgi_vs_wsgi --requests 200 --concurrency 1 4 16
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+
+ENDPOINTS = {
+    "login GET": ("GET", "/registration/login/", None),
+    "login POST": (
+        "POST",
+        "/registration/login/",
+        {"username": EMAIL, "password": PASSWORD},
+    ),
+    "home GET": ("GET", "/", None),
+}
+
+
+def bench_wsgi(app, endpoint, requests, concurrency):
+    method, path, data = ENDPOINTS[endpoint]
+    sessions = [driver.Session(app) for _ in range(concurrency)]
+    for session in sessions:
+        session.login(EMAIL, PASSWORD)
+
+    def worker(session):
+        for _ in range(requests // concurrency):
+            session.request(method, path, data)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        list(threads.map(worker, sessions))
+    return (requests // concurrency) * concurrency / (time.perf_counter() - start)
+
+
+async def bench_asgi(app, endpoint, requests, concurrency):
+    method, path, data = ENDPOINTS[endpoint]
+    sessions = [driver.Session(app) for _ in range(concurrency)]
+    for session in sessions:
+        await session.alogin(EMAIL, PASSWORD)
+
+    async def worker(session):
+        for _ in range(requests // concurrency):
+            await session.arequest(method, path, data)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(session) for session in sessions))
+    return (requests // concurrency) * concurrency / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    wsgi_app, asgi_app = driver.setup()
+    driver.ensure_user(EMAIL, PASSWORD)
+
+    print(f"{'endpoint':<12} {'conc':>4} {'wsgi rps':>10} {'asgi rps':>10}")
+    for endpoint in ENDPOINTS:
+        for concurrency in args.concurrency:
+            wsgi_rps = bench_wsgi(wsgi_app, endpoint, args.requests, concurrency)
+            asgi_rps = asyncio.run(
+                bench_asgi(asgi_app, endpoint, args.requests, concurrency)
+            )
+            print(
+                f"{endpoint:<12} {concurrency:>4} {wsgi_rps:>10.1f} {asgi_rps:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
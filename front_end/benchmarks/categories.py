@@ -0,0 +1,198 @@
+"""
+Subtree rollups and moves on large category trees.
+
+Seeds --users generated users (prefix "categories"), each with a random
+tree of --nodes categories under --roots top-level ones, and
+--transactions transactions over the last --months months spread over
+their categories by generate_transactions --categorized. Runs that find
+the trees and transactions there already keep them. Then times, for
+random categories at the top of a tree, in the middle and at its leaves:
+
+- the total spent under the category in a month, i.e. "Food/* in March",
+  with Transaction.objects.under();
+- the month's totals by the category's children, with rollup();
+- Category.move() of the category under another part of its tree.
+
+Reported with the categories and transactions the queries cover on
+average and the indexes their plans use. Run it from the front_end
+directory against a local Postgres, e.g.:
+
+    python -m benchmarks.categories --transactions 10000000
+
+``manage.py generate_transactions --prefix categories --count 0 --delete``
+removes the transactions again.
+"""
+import argparse
+import datetime
+import io
+import random
+import re
+import time
+
+from benchmarks import driver
+from benchmarks.ledger import percentile
+
+PREFIX = "categories"
+
+
+def build_tree(user, nodes, roots, rng):
+    """Give ``user`` a random tree of ``nodes`` categories."""
+    from django.db import connection, transaction
+
+    from ledger.models import Category
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # The paths need the ids up front
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence('ledger_category', 'id')) "
+            "FROM generate_series(1, %s)",
+            [nodes],
+        )
+        ids = [pk for (pk,) in cursor.fetchall()]
+        categories = []
+        for i, pk in enumerate(ids):
+            # A random recursive tree: about ln(nodes) levels deep, with
+            # subtrees of every size
+            parent = categories[rng.randrange(i)] if i >= roots else None
+            categories.append(
+                Category(
+                    id=pk,
+                    user=user,
+                    parent=parent,
+                    name=f"Category {i}",
+                    path=f"{parent.path if parent else ''}{pk}/",
+                )
+            )
+        Category.objects.bulk_create(categories, batch_size=5000)
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--nodes", type=int, default=10000, help="Per user.")
+    parser.add_argument("--roots", type=int, default=10, help="Per user.")
+    parser.add_argument("--transactions", type=int, default=10000000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=200, help="Per kind.")
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from ledger import partitions
+    from ledger.models import Category, Transaction
+    from registration.models import User
+
+    rng = random.Random(0)
+    start = time.perf_counter()
+    call_command(
+        "generate_users", count=args.users, prefix=PREFIX, stdout=io.StringIO()
+    )
+    users = list(User.objects.filter(email__lower__startswith=PREFIX))
+    for user in users:
+        if not user.categories.exists():
+            build_tree(user, args.nodes, args.roots, rng)
+    call_command(
+        "generate_transactions",
+        count=args.transactions,
+        prefix=PREFIX,
+        months=args.months,
+        categorized=True,
+        stdout=io.StringIO(),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE ledger_category")
+    print(f"Seeded in {time.perf_counter() - start:.1f}s.")
+
+    categories = list(Category.objects.filter(user__in=users))
+    parents = {category.parent_id for category in categories}
+    kinds = {
+        "top": [c for c in categories if c.depth == 0],
+        "middle": [c for c in categories if c.depth in (2, 3) and c.pk in parents],
+        "leaf": [c for c in categories if c.pk not in parents],
+    }
+    print(
+        f"{len(categories)} categories, {max(c.depth for c in categories) + 1} "
+        f"levels deep at most; {Transaction.objects.count()} transactions."
+    )
+
+    now = timezone.now()
+    first = partitions.month_start(now - datetime.timedelta(days=31 * args.months))
+
+    def month():
+        start = partitions.month_start(
+            first + datetime.timedelta(days=rng.randrange(31 * args.months))
+        )
+        return start, partitions.next_month(start)
+
+    print(
+        f"{'query':<7} {'kind':<7} {'nodes':>6} {'rows':>6} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+
+    def report(query, kind, nodes, rows, times):
+        print(
+            f"{query:<7} {kind:<7} {sum(nodes) / len(nodes):>6.0f} "
+            f"{sum(rows) / len(rows):>6.0f} {percentile(times, 50):>8.2f} "
+            f"{percentile(times, 95):>8.2f} {percentile(times, 99):>8.2f} "
+            f"{max(times):>8.2f}"
+        )
+
+    plans = {}
+    for kind, candidates in kinds.items():
+        spent, rollup, nodes, rows = [], [], [], []
+        for _ in range(args.queries):
+            category = rng.choice(candidates)
+            start, end = month()
+            in_month = Transaction.objects.filter(
+                booked_at__gte=start, booked_at__lt=end
+            )
+            under = in_month.under(category)
+            _, ms = timed(lambda: under.filter(amount__lt=0).aggregate(Sum("amount")))
+            spent.append(ms)
+            _, ms = timed(lambda: in_month.rollup(category))
+            rollup.append(ms)
+            nodes.append(Category.objects.subtree(category).count())
+            rows.append(under.count())
+        plans[kind] = under.explain()
+        report("spent", kind, nodes, rows, spent)
+        report("rollup", kind, nodes, rows, rollup)
+
+    for kind, candidates in kinds.items():
+        moves, nodes = [], []
+        for _ in range(min(args.queries, 50)):
+            category = rng.choice(candidates)
+            category.refresh_from_db()
+            # Anywhere else in the tree, or the top if that's where it is
+            parent = rng.choice([None, *kinds["middle"], *kinds["top"]])
+            if parent is not None:
+                parent.refresh_from_db()
+                if parent.user_id != category.user_id or parent.path.startswith(
+                    category.path
+                ):
+                    parent = None
+            _, ms = timed(lambda: category.move(parent))
+            moves.append(ms)
+            nodes.append(Category.objects.subtree(category).count())
+        report("move", kind, nodes, [0], moves)
+
+    for kind, plan in plans.items():
+        # The partitions' indexes are named after their month
+        indexes = {
+            re.sub(r"_\d{6}_", "_YYYYMM_", name)
+            for name in re.findall(r"Index (?:Only )?Scan (?:using|on) (\w+)", plan)
+        }
+        print(f"{kind} plan uses: {', '.join(sorted(indexes))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Requests per second on /registration/login/ with the connection pool on and off.
+
+Each simulated browser logs in once, then either re-renders the login page
+with its session (one session read) or posts the login form again (user
+lookup, password check and session write). Both entry points are measured:
+WSGI on a thread pool and ASGI on an event loop. Run it from the front_end
+directory against a local Postgres:
+
+    python -m benchmarks.connection_pool --requests 400 --concurrency 1 8
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+PATH = "/registration/login/"
+REQUESTS = {
+    "GET": None,
+    "POST": {"username": EMAIL, "password": PASSWORD},
+}
+
+
+def bench_wsgi(app, method, requests, concurrency):
+    def worker(_):
+        session = driver.Session(app)
+        session.login(EMAIL, PASSWORD)
+        for _ in range(requests // concurrency):
+            session.request(method, PATH, REQUESTS[method])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        list(threads.map(worker, range(concurrency)))
+    return (requests // concurrency) * concurrency / (time.perf_counter() - start)
+
+
+async def bench_asgi(app, method, requests, concurrency):
+    async def worker():
+        session = driver.Session(app)
+        await session.alogin(EMAIL, PASSWORD)
+        for _ in range(requests // concurrency):
+            await session.arequest(method, PATH, REQUESTS[method])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (requests // concurrency) * concurrency / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    wsgi_app, asgi_app = driver.setup()
+    from django.db import connections
+
+    from front_end.postgresql_pool.pool import close_pools, pool_stats
+
+    settings_dict = connections.databases["default"]
+    pool_options = settings_dict.get("POOL")
+    if pool_options is None:
+        parser.error("DATABASES['default'] has no POOL options to compare with")
+
+    driver.ensure_user(EMAIL, PASSWORD)
+
+    print(f"{'method':<6} {'pool':<5} {'conc':>4} {'wsgi rps':>10} {'asgi rps':>10}")
+    for method in REQUESTS:
+        for pooled in (False, True):
+            settings_dict["POOL"] = pool_options if pooled else None
+            for concurrency in args.concurrency:
+                wsgi_rps = bench_wsgi(wsgi_app, method, args.requests, concurrency)
+                asgi_rps = asyncio.run(
+                    bench_asgi(asgi_app, method, args.requests, concurrency)
+                )
+                print(
+                    f"{method:<6} {'on' if pooled else 'off':<5} {concurrency:>4} "
+                    f"{wsgi_rps:>10.1f} {asgi_rps:>10.1f}"
+                )
+
+    for key, stats in pool_stats().items():
+        print(f"\npool {key[0]}/{key[1]}")
+        for name, value in stats.items():
+            print(f"  {name:<22} {value:g}")
+    close_pools()
+
+
+if __name__ == "__main__":
+    main()
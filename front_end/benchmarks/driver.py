@@ -0,0 +1,212 @@
+"""
+In-process HTTP driver for the benchmarks.
+
+Requests are handed straight to the WSGI and ASGI application objects, so
+no server, socket or external service is involved and the numbers measure
+Django and the project code only.
+"""
+import asyncio
+import io
+import os
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+HOST = "localhost"
+# Outside INTERNAL_IPS, so the debug toolbar stays out of the measurements
+CLIENT_ADDR = "192.0.2.1"
+
+
+def setup(profile=None):
+    """
+    Configure Django the way wsgi.py and asgi.py do and return both apps,
+    with the settings ``profile`` if given instead of SETTINGS_PROFILE.
+    """
+    if profile is not None:
+        os.environ["SETTINGS_PROFILE"] = profile
+    from front_end.asgi import application as asgi_app
+    from front_end.wsgi import application as wsgi_app
+
+    return wsgi_app, asgi_app
+
+
+def ensure_user(email, password):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(email=email, password=password)
+    elif not user.check_password(password):
+        user.set_password(password)
+        user.save()
+    return user
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def header(self, name):
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def cookies(self):
+        cookie = SimpleCookie()
+        for key, value in self.headers:
+            if key.lower() == "set-cookie":
+                cookie.load(value)
+        return {name: morsel.value for name, morsel in cookie.items()}
+
+
+class Session:
+    """
+    Cookie jar shared by the requests of one simulated browser. Unsafe
+    requests send the CSRF cookie back as the X-CSRFToken header.
+    Use request()/login() against the WSGI app and arequest()/alogin()
+    against the ASGI app.
+    """
+
+    def __init__(self, app, client_addr=CLIENT_ADDR):
+        self.app = app
+        self.client_addr = client_addr
+        self.cookies = {}
+
+    def _request_parts(self, method, data):
+        headers = {"host": HOST}
+        if self.cookies:
+            headers["cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if method != "GET" and "csrftoken" in self.cookies:
+            headers["x-csrftoken"] = self.cookies["csrftoken"]
+        body = b""
+        if data is not None:
+            body = urlencode(data).encode()
+            headers["content-type"] = "application/x-www-form-urlencoded"
+            headers["content-length"] = str(len(body))
+        return headers, body
+
+    def _store(self, response):
+        for name, value in response.cookies.items():
+            if value:
+                self.cookies[name] = value
+            else:
+                self.cookies.pop(name, None)
+        return response
+
+    def request(self, method, path, data=None):
+        headers, body = self._request_parts(method, data)
+        return self._store(
+            wsgi_call(self.app, method, path, headers, body, self.client_addr)
+        )
+
+    async def arequest(self, method, path, data=None):
+        headers, body = self._request_parts(method, data)
+        return self._store(
+            await asgi_call(self.app, method, path, headers, body, self.client_addr)
+        )
+
+    def login(self, email, password):
+        """Log in through the login form and keep the session cookie."""
+        self.request("GET", "/registration/login/")
+        response = self.request(
+            "POST", "/registration/login/", {"username": email, "password": password}
+        )
+        if response.status != 302:
+            raise RuntimeError(f"Login failed with status {response.status}")
+        return response
+
+    async def alogin(self, email, password):
+        await self.arequest("GET", "/registration/login/")
+        response = await self.arequest(
+            "POST", "/registration/login/", {"username": email, "password": password}
+        )
+        if response.status != 302:
+            raise RuntimeError(f"Login failed with status {response.status}")
+        return response
+
+
+def wsgi_call(app, method, path, headers, body, client_addr=CLIENT_ADDR):
+    url = urlsplit(path)
+    environ = {
+        "REQUEST_METHOD": method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "SERVER_NAME": HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": client_addr,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers.items():
+        key = name.upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        environ[key] = value
+
+    started = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        started["status"] = int(status.split()[0])
+        started["headers"] = response_headers
+
+    result = app(environ, start_response)
+    try:
+        content = b"".join(result)
+    finally:
+        # Fires request_finished, which returns the database connection
+        if hasattr(result, "close"):
+            result.close()
+    return Response(started["status"], started["headers"], content)
+
+
+async def asgi_call(app, method, path, headers, body, client_addr=CLIENT_ADDR):
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        "client": (client_addr, 0),
+        "server": (HOST, 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Wait for the disconnect that never comes
+            await asyncio.Future()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = {"body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = [
+                (k.decode("latin1"), v.decode("latin1")) for k, v in message["headers"]
+            ]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return Response(response["status"], response["headers"], b"".join(response["body"]))
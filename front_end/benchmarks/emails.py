@@ -0,0 +1,63 @@
+"""
+Email validations and normalizations per second, with and without the
+registration.emails cache.
+
+A pool of --addresses distinct addresses is validated and normalized
+--rounds times over, as the sign-in and reset forms see returning users:
+once with Django's validate_email() and normalize_email() plus lower(), as
+before the cache, and once through registration.emails, whose first round
+fills the LRU. Run it from the front_end directory:
+
+    python -m benchmarks.emails --addresses 1000 --rounds 50
+"""
+import argparse
+import time
+
+from benchmarks import driver
+
+
+def rate(function, addresses, rounds):
+    """Calls of ``function`` per second over ``rounds`` passes of ``addresses``."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for address in addresses:
+            function(address)
+    return len(addresses) * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--addresses", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.contrib.auth.base_user import BaseUserManager
+    from django.core.validators import validate_email
+
+    from registration import emails
+
+    addresses = [
+        f"First.Last+{n}@{domain}"
+        for n, domain in zip(
+            range(args.addresses),
+            ["Example.com", "mail.example.org", "bücher.de"] * args.addresses,
+        )
+    ]
+    emails.clear()
+    functions = {
+        "validate": (validate_email, emails.validate),
+        "normalize": (
+            lambda email: BaseUserManager.normalize_email(email).lower(),
+            emails.lookup_key,
+        ),
+    }
+    print(f"{'':<10} {'uncached/s':>12} {'cached/s':>12} {'speedup':>8}")
+    for name, (uncached, cached) in functions.items():
+        before = rate(uncached, addresses, args.rounds)
+        after = rate(cached, addresses, args.rounds)
+        print(f"{name:<10} {before:>12,.0f} {after:>12,.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Load test of the registration flows through wsgi.py and asgi.py.
+
+Each flow signs up a new user, signs in, opens the home page, changes the
+password, signs out and resets the password through the link the reset
+email would carry. Flows run at each concurrency level on threads against
+the WSGI app and as tasks on one event loop against the ASGI app, after
+--users generated users are seeded so the user table isn't empty (they're
+kept for the next run; ``manage.py generate_users --prefix loadtest
+--delete`` removes them). A first flow per app warms it up and isn't
+measured.
+
+Reported per run: requests and flows per second, latency percentiles
+overall and per step, SQL queries per flow (from front_end.metrics, with
+every request measured) and CPU time per request of this process. Password
+hashing runs in the configured executor, whose worker processes aren't
+counted; --inline-hashing brings it into this process.
+
+Each flow comes from its own client IP. The global rate limits are off, as
+every flow comes from this one process, but the per-IP and per-email
+buckets are still checked.
+
+--output writes the results as JSON and --baseline compares them with an
+earlier file, e.g. from another commit. Run it from the front_end
+directory against a local Postgres:
+
+    python -m benchmarks.flows --flows 50 --concurrency 1 4 --output flows.json
+"""
+import argparse
+import asyncio
+import contextvars
+import io
+import json
+import os
+import subprocess
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import driver
+
+PASSWORDS = ("Flow-first-pw1", "Flow-second-pw2", "Flow-third-pw3")
+SERVERS = ("wsgi", "asgi")
+PERCENTILES = (50, 90, 99)
+
+# SQL queries of the requests of the flow running in this context
+_flow_queries = contextvars.ContextVar("flow_queries")
+
+
+class Flow:
+    """
+    The requests of one simulated user, as (step, method, path, data,
+    expected status). Steps that depend on an earlier response are built
+    when they're reached.
+    """
+
+    def __init__(self, email, client_addr):
+        self.email = email
+        self.client_addr = client_addr
+        # The Location of the last response
+        self.location = None
+
+    def steps(self):
+        email = self.email
+        first, second, third = PASSWORDS
+        yield "signup GET", "GET", "/registration/signup/", None, 200
+        yield "signup POST", "POST", "/registration/signup/", {
+            "email": email,
+            "password1": first,
+            "password2": first,
+        }, 302
+        yield "login GET", "GET", "/registration/login/", None, 200
+        yield "login POST", "POST", "/registration/login/", {
+            "username": email,
+            "password": first,
+        }, 302
+        yield "home GET", "GET", "/", None, 200
+        yield "change password GET", "GET", "/registration/change_password/", None, 200
+        yield "change password POST", "POST", "/registration/change_password/", {
+            "old_password": first,
+            "new_password1": second,
+            "new_password2": second,
+        }, 302
+        yield "logout GET", "GET", "/registration/logout/", None, 302
+        yield "reset GET", "GET", "/registration/reset_password/", None, 200
+        yield "reset POST", "POST", "/registration/reset_password/", {
+            "email": email
+        }, 302
+        # The confirm link redirects to a URL without the token
+        yield "reset link GET", "GET", reset_link(email), None, 302
+        set_password = self.location
+        yield "set password GET", "GET", set_password, None, 200
+        yield "set password POST", "POST", set_password, {
+            "new_password1": third,
+            "new_password2": third,
+        }, 302
+
+
+def reset_link(email):
+    """The path of the reset link emailed to ``email``."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.tokens import default_token_generator
+    from django.db import connection
+    from django.utils.encoding import force_bytes
+    from django.utils.http import urlsafe_base64_encode
+
+    try:
+        user = get_user_model().objects.get(email=email)
+    finally:
+        # Back to the pool, as after a request
+        connection.close()
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    return f"/registration/reset/{uid}/{default_token_generator.make_token(user)}/"
+
+
+def client_addr(run, flow):
+    """A client IP of its own for each flow of each run."""
+    n = run << 16 | flow & 0xFFFF
+    return f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def count_queries(metrics, **kwargs):
+    """request_measured receiver adding to the running flow's query count."""
+    queries = _flow_queries.get(None)
+    if queries is not None:
+        queries.append(metrics.counts["db_queries"])
+
+
+def check(step, response, expected):
+    if response.status != expected:
+        raise RuntimeError(f"{step} returned {response.status}, not {expected}")
+
+
+def run_flow(app, flow):
+    """Run ``flow`` against the WSGI ``app``; return [(step, ms)], queries."""
+    queries = []
+    _flow_queries.set(queries)
+    session = driver.Session(app, client_addr=flow.client_addr)
+    latencies = []
+    for step, method, path, data, expected in flow.steps():
+        start = time.perf_counter()
+        response = session.request(method, path, data)
+        latencies.append((step, (time.perf_counter() - start) * 1000))
+        check(step, response, expected)
+        flow.location = response.header("Location")
+    return latencies, sum(queries)
+
+
+async def arun_flow(app, flow):
+    """Run ``flow`` against the ASGI ``app``; return [(step, ms)], queries."""
+    from asgiref.sync import sync_to_async
+
+    queries = []
+    _flow_queries.set(queries)
+    session = driver.Session(app, client_addr=flow.client_addr)
+    latencies = []
+    steps = flow.steps()
+    while True:
+        # reset_link() queries the database, so the steps are built off the loop
+        step = await sync_to_async(next)(steps, None)
+        if step is None:
+            break
+        step, method, path, data, expected = step
+        start = time.perf_counter()
+        response = await session.arequest(method, path, data)
+        latencies.append((step, (time.perf_counter() - start) * 1000))
+        check(step, response, expected)
+        flow.location = response.header("Location")
+    return latencies, sum(queries)
+
+
+def percentiles(values):
+    """Return {"p50": ..., "p90": ..., "p99": ..., "max": ...} by nearest rank."""
+    values = sorted(values)
+    result = {
+        f"p{p}": values[max(0, -(-len(values) * p // 100) - 1)] for p in PERCENTILES
+    }
+    result["max"] = values[-1]
+    return result
+
+
+def run(server, app, flows, concurrency):
+    """Run ``flows`` at ``concurrency`` and return the results of the run."""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    if server == "wsgi":
+        with ThreadPoolExecutor(max_workers=concurrency) as threads:
+            results = list(threads.map(lambda flow: run_flow(app, flow), flows))
+    else:
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def limited(flow):
+                async with semaphore:
+                    return await arun_flow(app, flow)
+
+            return await asyncio.gather(*(limited(flow) for flow in flows))
+
+        results = asyncio.run(run_all())
+    cpu = time.process_time() - cpu_start
+    seconds = time.perf_counter() - start
+
+    latencies = [latency for flow_latencies, _ in results for latency in flow_latencies]
+    steps = {}
+    for step, ms in latencies:
+        steps.setdefault(step, []).append(ms)
+    return {
+        "server": server,
+        "concurrency": concurrency,
+        "flows": len(flows),
+        "requests": len(latencies),
+        "seconds": seconds,
+        "rps": len(latencies) / seconds,
+        "flows_per_second": len(flows) / seconds,
+        "latency_ms": percentiles([ms for _, ms in latencies]),
+        "steps": {step: percentiles(values) for step, values in steps.items()},
+        "db_queries_per_flow": sum(queries for _, queries in results) / len(flows),
+        "cpu_ms_per_request": cpu / len(latencies) * 1000,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run, baseline=None):
+    latency = run["latency_ms"]
+    line = (
+        f"{run['server']:<5} {run['concurrency']:>4} {run['rps']:>8.1f} "
+        f"{run['flows_per_second']:>7.2f} {latency['p50']:>8.1f} "
+        f"{latency['p90']:>8.1f} {latency['p99']:>8.1f} "
+        f"{run['db_queries_per_flow']:>9.1f} {run['cpu_ms_per_request']:>8.2f}"
+    )
+    if baseline is not None:
+        rps = run["rps"] / baseline["rps"] - 1
+        p90 = latency["p90"] / baseline["latency_ms"]["p90"] - 1
+        line += f"   rps {rps:+.1%}, p90 {p90:+.1%}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flows", type=int, default=50, help="Flows per run.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--server", choices=SERVERS, nargs="+", default=SERVERS)
+    parser.add_argument(
+        "--users", type=int, default=10000, help="Generated users to seed."
+    )
+    parser.add_argument("--inline-hashing", action="store_true")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with this earlier --output.")
+    args = parser.parse_args()
+
+    # Every request is measured, for the query counts
+    os.environ["METRICS_SAMPLE_RATE"] = "1"
+    wsgi_app, asgi_app = driver.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    from front_end.metrics import request_measured
+
+    call_command(
+        "generate_users", count=args.users, prefix="loadtest", stdout=io.StringIO()
+    )
+    request_measured.connect(count_queries)
+    overrides = {
+        "RATELIMITS": {
+            scope: {key: rate for key, rate in rates.items() if key != "global"}
+            for scope, rates in settings.RATELIMITS.items()
+        },
+        "OUTBOX_DIR": tempfile.mkdtemp(),
+    }
+    if args.inline_hashing:
+        overrides["PASSWORD_HASHING_EXECUTOR"] = {
+            "BACKEND": "registration.hashing.InlineHashingExecutor"
+        }
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {
+                (run["server"], run["concurrency"]): run for run in json.load(f)["runs"]
+            }
+
+    apps = {"wsgi": wsgi_app, "asgi": asgi_app}
+    domain = f"{uuid.uuid4().hex[:8]}.loadtest.local"
+    runs = []
+    print(
+        f"{'app':<5} {'conc':>4} {'req/s':>8} {'flows/s':>7} {'p50 ms':>8} "
+        f"{'p90 ms':>8} {'p99 ms':>8} {'SQL/flow':>9} {'CPU ms':>8}"
+    )
+    with override_settings(**overrides):
+        try:
+            for server in args.server:
+                # Not measured: starts the hashing pool and the app's lazy parts
+                run(server, apps[server], [Flow(f"{server}@{domain}", "192.0.2.1")], 1)
+                for concurrency in args.concurrency:
+                    flows = [
+                        Flow(
+                            f"{server}-{concurrency}-{n}@{domain}",
+                            client_addr(len(runs), n),
+                        )
+                        for n in range(args.flows)
+                    ]
+                    runs.append(run(server, apps[server], flows, concurrency))
+                    print_run(runs[-1], baseline.get((server, concurrency)))
+        finally:
+            get_user_model().objects.filter(email__endswith=f"@{domain}").delete()
+
+    if args.output:
+        results = {
+            "commit": git_commit(),
+            "settings": settings.SETTINGS_MODULE,
+            "users": args.users,
+            "inline_hashing": args.inline_hashing,
+            "runs": runs,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
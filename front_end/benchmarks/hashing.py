@@ -0,0 +1,70 @@
+"""
+Compare inline and pooled password hashing under concurrent logins.
+
+Every simulated login verifies an Argon2 hash the way SigninView does.
+Run it from the front_end directory:
+
+    python -m benchmarks.hashing --logins 64
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+from front_end.settings import configure
+
+CONCURRENCY = (1, 4, 16)
+
+
+def run(executor, encoded, password, concurrency, logins):
+    def login(_):
+        start = time.perf_counter()
+        executor.check_password(password, encoded)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        start = time.perf_counter()
+        latencies = sorted(threads.map(login, range(logins)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "logins_per_sec": logins / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    configure()
+    django.setup()
+    from registration.hashing import InlineHashingExecutor, ProcessPoolHashingExecutor
+
+    password = "abcd12efgh"
+    inline = InlineHashingExecutor()
+    pooled = ProcessPoolHashingExecutor(
+        max_workers=args.workers, max_queue=max(CONCURRENCY)
+    )
+    encoded = inline.make_password(password)
+    # Spawn the pool before timing anything
+    pooled.check_password(password, encoded)
+
+    print(f"{'executor':<8} {'conc':>4} {'logins/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, executor in (("inline", inline), ("pooled", pooled)):
+        for concurrency in CONCURRENCY:
+            result = run(executor, encoded, password, concurrency, args.logins)
+            print(
+                f"{name:<8} {concurrency:>4} {result['logins_per_sec']:>10.1f} "
+                f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+            )
+    pooled.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Throughput of the background job queue with 1, 4 and 16 worker processes.
+
+Queues --jobs jobs spread over --users generated users (prefix "jobqueue")
+and times ``manage.py run_workers --processes N --once`` until they're all
+done, for jobs that return at once, which measures the queue itself, and
+for jobs that wait --sleep-ms, like a job waiting on I/O. Each user runs
+at most JOBS_PER_USER jobs at once, so fewer users than processes leaves
+processes idle. Run it from the front_end directory against a local
+Postgres, e.g.:
+
+    python -m benchmarks.job_queue --jobs 5000 --processes 1 4 16
+"""
+import argparse
+import io
+import itertools
+import time
+
+from benchmarks import driver
+
+PREFIX = "jobqueue"
+HANDLER = "benchmarks.job_queue.pause"
+
+
+def pause(job, ms):
+    time.sleep(ms / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sleep-ms", type=float, default=10)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from jobs.models import Job
+    from registration.models import User
+
+    call_command(
+        "generate_users", count=args.users, prefix=PREFIX, stdout=io.StringIO()
+    )
+    users = list(
+        User.objects.filter(email__lower__startswith=PREFIX).order_by("pk")[
+            : args.users
+        ]
+    )
+
+    print(
+        f"{args.jobs} jobs of {len(users)} users, JOBS_PER_USER={settings.JOBS_PER_USER}"
+    )
+    print(f"{'job':<10} {'processes':>9} {'seconds':>8} {'jobs/s':>8} {'done':>6}")
+    for ms in (0, args.sleep_ms):
+        for processes in args.processes:
+            Job.objects.filter(handler=HANDLER).delete()
+            owners = itertools.cycle(users or [None])
+            Job.objects.bulk_create(
+                Job(handler=HANDLER, kwargs={"ms": ms}, user=next(owners))
+                for _ in range(args.jobs)
+            )
+            start = time.perf_counter()
+            call_command(
+                "run_workers", processes=processes, once=True, stdout=io.StringIO()
+            )
+            seconds = time.perf_counter() - start
+            done = Job.objects.filter(handler=HANDLER, status=Job.DONE).count()
+            print(
+                f"{f'{ms:g} ms':<10} {processes:>9} {seconds:>8.2f} "
+                f"{done / seconds:>8.0f} {done:>6}"
+            )
+    Job.objects.filter(handler=HANDLER).delete()
+
+
+if __name__ == "__main__":
+    main()
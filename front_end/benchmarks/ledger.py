@@ -0,0 +1,117 @@
+"""
+Per-user range queries on a large transaction ledger.
+
+Seeds --users generated users (prefix "ledger") with --transactions
+transactions over the last --months months through generate_users and
+generate_transactions, which keep what earlier runs inserted, then times
+Transaction.objects.booked_between() for random users over a month, a
+quarter and a year, against the 50 ms target. Also reported: the rows a
+query returns, the partitions its plan touches and the ledger's size on
+disk per transaction. Run it from the front_end directory against a local
+Postgres, e.g. towards the 100M design target:
+
+    python -m benchmarks.ledger --users 100000 --transactions 100000000
+
+``manage.py generate_transactions --prefix ledger --count 0 --delete``
+removes the transactions again.
+"""
+import argparse
+import datetime
+import io
+import random
+import re
+import time
+
+from benchmarks import driver
+
+PREFIX = "ledger"
+WINDOWS = {"month": 30, "quarter": 91, "year": 365}
+TARGET_MS = 50
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=200, help="Per window.")
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.utils import timezone
+
+    from ledger.models import Transaction
+    from registration.models import User
+
+    start = time.perf_counter()
+    call_command(
+        "generate_users", count=args.users, prefix=PREFIX, stdout=io.StringIO()
+    )
+    call_command(
+        "generate_transactions",
+        count=args.transactions,
+        prefix=PREFIX,
+        months=args.months,
+        stdout=io.StringIO(),
+    )
+    print(f"Seeded in {time.perf_counter() - start:.1f}s.")
+
+    user_ids = list(
+        User.objects.filter(email__lower__startswith=PREFIX).values_list(
+            "pk", flat=True
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sum(pg_total_relation_size(inhrelid)) FROM pg_inherits "
+            "WHERE inhparent = 'ledger_transaction'::regclass"
+        )
+        size = cursor.fetchone()[0] or 0
+    total = Transaction.objects.count()
+    print(
+        f"{total} transactions, {size / 2**20:.0f} MiB with indexes, "
+        f"{size / max(total, 1):.0f} bytes each."
+    )
+
+    now = timezone.now()
+    span = datetime.timedelta(days=30 * args.months)
+    rng = random.Random(0)
+    print(
+        f"{'window':<8} {'rows':>7} {'parts':>5} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8}"
+    )
+    worst = 0
+    for window, days in WINDOWS.items():
+        length = datetime.timedelta(days=days)
+        times, rows = [], []
+        for _ in range(args.queries):
+            end = now - rng.random() * max(span - length, datetime.timedelta())
+            transactions = Transaction.objects.booked_between(
+                rng.choice(user_ids), end - length, end
+            )
+            started = time.perf_counter()
+            rows.append(len(list(transactions)))
+            times.append((time.perf_counter() - started) * 1000)
+        plan = transactions.explain()
+        touched = len(
+            set(re.findall(r" on (ledger_transaction_(?:\d{6}|default))\b", plan))
+        )
+        worst = max(worst, percentile(times, 99))
+        print(
+            f"{window:<8} {sum(rows) / len(rows):>7.0f} {touched:>5} "
+            f"{percentile(times, 50):>8.2f} {percentile(times, 95):>8.2f} "
+            f"{percentile(times, 99):>8.2f} {max(times):>8.2f}"
+        )
+    verdict = "within" if worst < TARGET_MS else "over"
+    print(f"Worst p99: {worst:.1f} ms, {verdict} the {TARGET_MS} ms target.")
+
+
+if __name__ == "__main__":
+    main()
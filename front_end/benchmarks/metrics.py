@@ -0,0 +1,83 @@
+"""
+Overhead of the request metrics at each METRICS_SAMPLE_RATE.
+
+SigninView, SignupView and HomePage (signed in) are requested through WSGI
+handlers loaded with the metrics middleware off (rate 0) and at a sampled
+and the full rate. The handlers take turns request by request, so noise on
+the machine hits them alike, and the median time of a request with each is
+compared with the one without metrics, against the 2% budget for leaving
+them on in production. Run it from the front_end directory against a local
+Postgres, with the settings profile to measure:
+
+    SETTINGS_PROFILE=prod SECRET_KEY=... python -m benchmarks.metrics --requests 2000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+PAGES = {
+    "SigninView": "/registration/login/",
+    "SignupView": "/registration/signup/",
+    "HomePage": "/",
+}
+RATES = (0, 0.1, 1)
+BUDGET = 0.02
+
+
+def time_request(session, path):
+    """Return the time of a GET of ``path`` in milliseconds."""
+    start = time.perf_counter()
+    response = session.request("GET", path)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned {response.status}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    wsgi_app, _ = driver.setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    driver.ensure_user(EMAIL, PASSWORD)
+    handlers = {}
+    for rate in RATES:
+        with override_settings(METRICS_SAMPLE_RATE=rate):
+            handlers[rate] = WSGIHandler()
+    session = driver.Session(wsgi_app)
+    session.login(EMAIL, PASSWORD)
+
+    print(f"{'page':<11} {'rate':>5} {'ms/request':>10} {'overhead':>9}")
+    worst = dict.fromkeys(RATES[1:], 0)
+    for page, path in PAGES.items():
+        times = {rate: [] for rate in RATES}
+        for i in range(args.requests):
+            # Each handler goes first in turn
+            for rate in RATES[i % len(RATES) :] + RATES[: i % len(RATES)]:
+                session.app = handlers[rate]
+                times[rate].append(time_request(session, path))
+        baseline = statistics.median(times[0])
+        for rate in RATES:
+            ms = statistics.median(times[rate])
+            overhead = ms / baseline - 1
+            if rate:
+                worst[rate] = max(worst[rate], overhead)
+            print(f"{page:<11} {rate:>5} {ms:>10.3f} {overhead:>9.1%}")
+    for rate, overhead in worst.items():
+        verdict = "within" if overhead < BUDGET else "over"
+        print(
+            f"Worst overhead at METRICS_SAMPLE_RATE={rate}: {overhead:.1%}, "
+            f"{verdict} the {BUDGET:.0%} budget."
+        )
+
+
+if __name__ == "__main__":
+    main()
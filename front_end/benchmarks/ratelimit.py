@@ -0,0 +1,123 @@
+"""
+Cost of a rate limit check, and the CPU it saves under a login attack.
+
+First a single RateLimiter.check() is timed against the shared
+RATELIMIT_CACHE_ALIAS cache: allowed, rejected and with a new bucket per
+call. Then two attacks are replayed against SigninView with the limits on
+and off, hashing inline so every Argon2 verify is counted in this
+process's CPU time:
+
+- stuffing: one IP tries a different email on every attempt
+- spraying: a different IP on every attempt, all against one email
+
+Run it from the front_end directory against a local Postgres:
+
+    python -m benchmarks.ratelimit --checks 20000 --attempts 200
+"""
+import argparse
+import logging
+import time
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+PATH = "/registration/login/"
+INLINE = {"BACKEND": "registration.hashing.InlineHashingExecutor"}
+
+
+def time_checks(limiter, keys, checks):
+    """Return the mean cost of limiter.check() in nanoseconds."""
+    start = time.perf_counter_ns()
+    for i in range(checks):
+        limiter.check(keys(i))
+    return (time.perf_counter_ns() - start) / checks
+
+
+def microbenchmark(checks):
+    from registration import ratelimit
+    from registration.ratelimit import RateLimiter
+
+    ratelimit.reset()
+    generous = {"ip": "1000000000/s", "email": "1000000000/s", "global": "1000000000/s"}
+    cases = [
+        (
+            "allowed",
+            RateLimiter("benchmark", generous),
+            lambda i: {"ip": "192.0.2.1", "email": EMAIL, "global": ""},
+        ),
+        (
+            "rejected",
+            RateLimiter("benchmark", {"ip": "1/h"}),
+            lambda i: {"ip": "192.0.2.1", "email": EMAIL, "global": ""},
+        ),
+        (
+            "new bucket",
+            RateLimiter("benchmark", generous),
+            lambda i: {"ip": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"},
+        ),
+    ]
+    print(f"{'check':<12} {'ns/check':>10}")
+    for name, limiter, keys in cases:
+        print(f"{name:<12} {time_checks(limiter, keys, checks):>10.0f}")
+
+
+def attack(session, attempts, scenario):
+    """Post ``attempts`` wrong passwords and return the response counts."""
+    statuses = {}
+    for i in range(attempts):
+        if scenario == "stuffing":
+            email = f"victim{i}@example.com"
+        else:
+            email = EMAIL
+            session.client_addr = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        response = session.request(
+            "POST", PATH, {"username": email, "password": "not-the-password"}
+        )
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+    return statuses
+
+
+def load_test(wsgi_app, attempts):
+    from django.conf import settings
+    from django.test import override_settings
+
+    from registration import ratelimit
+
+    driver.ensure_user(EMAIL, PASSWORD)
+    print(
+        f"\n{'attack':<10} {'limits':<6} {'200s':>6} {'429s':>6} "
+        f"{'cpu s':>7} {'cpu ms/req':>10}"
+    )
+    for scenario in ("stuffing", "spraying"):
+        for limited in (False, True):
+            limits = settings.RATELIMITS if limited else {}
+            with override_settings(RATELIMITS=limits, PASSWORD_HASHING_EXECUTOR=INLINE):
+                ratelimit.reset()
+                session = driver.Session(wsgi_app)
+                session.request("GET", PATH)
+                start = time.process_time()
+                statuses = attack(session, attempts, scenario)
+                cpu = time.process_time() - start
+            print(
+                f"{scenario:<10} {'on' if limited else 'off':<6} "
+                f"{statuses.get(200, 0):>6} {statuses.get(429, 0):>6} "
+                f"{cpu:>7.2f} {cpu / attempts * 1000:>10.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--attempts", type=int, default=200)
+    args = parser.parse_args()
+
+    wsgi_app, _ = driver.setup()
+    # Every 429 is logged as a warning, which would drown the results
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+    microbenchmark(args.checks)
+    load_test(wsgi_app, args.attempts)
+
+
+if __name__ == "__main__":
+    main()
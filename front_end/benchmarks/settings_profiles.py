@@ -0,0 +1,128 @@
+"""
+Middleware count and per-request overhead of each settings profile.
+
+Every profile runs in its own process, since settings are read once. For
+each one the report gives the time to import wsgi.py (which warms the
+templates in cached mode), the MIDDLEWARE entries and how many stay in the
+chain (the rest raise MiddlewareNotUsed), and the time of a request to a
+view that returns a constant response, with the profile's middleware and
+with none. Their difference is what the middleware costs every request. The
+login page is timed as a real page. Run it from the front_end directory
+against a local Postgres:
+
+    python -m benchmarks.settings_profiles --requests 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.http import HttpResponse
+from django.urls import path
+
+from benchmarks import driver
+
+PROFILES = ("dev", "test", "prod")
+PING = "/ping/"
+
+
+def ping(request):
+    return HttpResponse("pong")
+
+
+# The URLconf of the constant view, set with ROOT_URLCONF
+urlpatterns = [path(PING.strip("/") + "/", ping)]
+
+
+def active_middleware(middleware):
+    """Return the entries of ``middleware`` that don't opt out at startup."""
+    from django.core.exceptions import MiddlewareNotUsed
+    from django.utils.module_loading import import_string
+
+    active = []
+    for name in middleware:
+        try:
+            import_string(name)(lambda request: None)
+        except MiddlewareNotUsed:
+            continue
+        active.append(name)
+    return active
+
+
+def time_requests(app, path, requests):
+    """Return the mean time of a GET of ``path`` in milliseconds."""
+    session = driver.Session(app)
+    session.request("GET", path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = session.request("GET", path)
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def measure(profile, requests):
+    """Measure ``profile`` in this process and return the results."""
+    start = time.perf_counter()
+    wsgi_app, _ = driver.setup(profile)
+    startup = time.perf_counter() - start
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    with override_settings(ROOT_URLCONF=__name__):
+        with_middleware = time_requests(wsgi_app, PING, requests)
+        with override_settings(MIDDLEWARE=[]):
+            bare = WSGIHandler()
+        without_middleware = time_requests(bare, PING, requests)
+    return {
+        "profile": profile,
+        "startup_ms": startup * 1000,
+        "middleware": len(settings.MIDDLEWARE),
+        "active": len(active_middleware(settings.MIDDLEWARE)),
+        "overhead_ms": with_middleware - without_middleware,
+        "ping_ms": with_middleware,
+        "login_ms": time_requests(wsgi_app, "/registration/login/", requests // 10),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(measure(args.profile, args.requests)))
+        return
+
+    env = dict(os.environ)
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    # prod refuses to start without one
+    env.setdefault("SECRET_KEY", "benchmark-only-secret-key")
+    print(
+        f"{'profile':<8} {'startup ms':>10} {'middleware':>10} {'active':>6} "
+        f"{'overhead ms':>11} {'ping ms':>8} {'login ms':>8}"
+    )
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.settings_profiles"]
+            + ["--profile", profile, "--requests", str(args.requests)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{profile:<8} {result['startup_ms']:>10.0f} {result['middleware']:>10} "
+            f"{result['active']:>6} {result['overhead_ms']:>11.3f} "
+            f"{result['ping_ms']:>8.3f} {result['login_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
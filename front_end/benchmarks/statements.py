@@ -0,0 +1,111 @@
+"""
+Throughput and memory of importing a large bank statement.
+
+Writes a synthetic statement of --rows lines over --years years in --format
+to a temporary file, then imports it into a benchmark account with
+ledger.statements.StatementImporter twice: once into an empty account and
+once more, when every line is a duplicate skipped by the import hash index.
+Rows per second are reported for each pass, with this process's peak
+memory, which should stay flat however many rows there are. Run it from the
+front_end directory against a local Postgres, e.g.:
+
+    python -m benchmarks.statements --rows 10000000
+
+The account and its transactions are deleted afterwards.
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+ACCOUNT = "Benchmark statement"
+PAYEES = ["Coffee", "Groceries", "Rent", "Salary", "Train", "Cinema", "Books"]
+
+
+def write_statement(path, format, rows, years):
+    """Write ``rows`` lines, oldest first, ending yesterday."""
+    rng = random.Random(0)
+    days = 365 * years
+    first = datetime.date.today() - datetime.timedelta(days=days)
+    with open(path, "w", newline="") as f:
+        if format == "csv":
+            f.write("Date,Description,Amount\n")
+        elif format == "ofx":
+            f.write("OFXHEADER:100\n\n<OFX><BANKTRANLIST>\n")
+        else:
+            f.write("!Type:Bank\n")
+        for i in range(rows):
+            date = first + datetime.timedelta(days=i * days // rows)
+            payee = rng.choice(PAYEES)
+            amount = f"{rng.randint(-50000, 20000) / 100:.2f}"
+            if format == "csv":
+                f.write(f"{date:%d/%m/%Y},{payee},{amount}\n")
+            elif format == "ofx":
+                f.write(
+                    f"<STMTTRN><DTPOSTED>{date:%Y%m%d}<TRNAMT>{amount}"
+                    f"<NAME>{payee}</STMTTRN>\n"
+                )
+            else:
+                f.write(f"D{date:%d/%m/%Y}\nT{amount}\nP{payee}\n^\n")
+        if format == "ofx":
+            f.write("</BANKTRANLIST></OFX>\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--format", choices=["csv", "ofx", "qif"], default="csv")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.db import connection
+
+    from ledger import statements
+    from ledger.models import Account
+    from registration.userio import max_rss
+
+    user = driver.ensure_user(EMAIL, PASSWORD)
+    account, _ = Account.objects.get_or_create(user=user, name=ACCOUNT)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"statement.{args.format}")
+        start = time.perf_counter()
+        write_statement(path, args.format, args.rows, args.years)
+        print(
+            f"Wrote {args.rows} rows, {os.path.getsize(path) / 2**20:.0f} MiB, "
+            f"in {time.perf_counter() - start:.1f}s; "
+            f"peak memory {max_rss() / 2**20:.1f} MiB."
+        )
+
+        print(
+            f"{'pass':<10} {'read':>9} {'imported':>9} {'duplicate':>9} "
+            f"{'rows/s':>8} {'peak MiB':>8}"
+        )
+        try:
+            for name in ("new", "again"):
+                importer = statements.StatementImporter(
+                    account, batch_size=args.batch_size
+                )
+                with open(path, newline="") as f:
+                    stats = importer.run(statements.read_statement(f, args.format))
+                print(
+                    f"{name:<10} {stats['read']:>9} {stats['imported']:>9} "
+                    f"{stats['duplicates']:>9} "
+                    f"{stats['read'] / stats['seconds']:>8.0f} "
+                    f"{stats['max_rss'] / 2**20:>8.1f}"
+                )
+        finally:
+            # The transactions go with it
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM ledger_account WHERE id = %s", [account.pk])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Static file throughput: Django's serve view against the staticserve middleware.
+
+The SVG logo and the compiled CSS are requested through the WSGI handler
+in-process. "serve view" is runserver's StaticFilesHandler, which finds each
+file under STATICFILES_DIRS and reads it in Python on every request. The
+middleware rows serve the collected copies in STATIC_ROOT as they're sent in
+production: uncompressed, precompressed and revalidated with If-None-Match.
+With a server that implements wsgi.file_wrapper the file bodies go out with
+sendfile(), so the middleware numbers are an upper bound on the Python time
+per request. Run ``manage.py build_static`` first, then from the front_end
+directory:
+
+    python -m benchmarks.static --requests 2000
+"""
+import argparse
+import time
+
+from benchmarks import driver
+
+ASSETS = {"logo": "brand/logo/logo.svg", "css": "build/app.css"}
+
+
+def throughput(app, path, headers, requests):
+    """Return (requests per second, response bytes per request)."""
+    size = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = driver.wsgi_call(app, "GET", path, dict(headers), b"")
+        if response.status not in (200, 304):
+            raise RuntimeError(f"{path} returned {response.status}")
+        size = len(response.body)
+    return requests / (time.perf_counter() - start), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    driver.setup()
+    from django.conf import settings
+    from django.contrib.staticfiles.handlers import StaticFilesHandler
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    if not staticfiles_storage.hashed_files:
+        raise SystemExit("Run `manage.py build_static` first.")
+    host = {"host": driver.HOST}
+    with override_settings(DEBUG=True):
+        serve_view = StaticFilesHandler(WSGIHandler())
+    with override_settings(STATIC_SERVE=True):
+        middleware = WSGIHandler()
+
+    print(f"{'asset':<6} {'server':<12} {'request':<10} {'req/s':>9} {'bytes':>8}")
+    for asset, name in ASSETS.items():
+        hashed = settings.STATIC_URL + staticfiles_storage.stored_name(name)
+        first = driver.wsgi_call(middleware, "GET", hashed, host, b"")
+        etag = first.header("ETag")
+        cases = [
+            ("serve view", "plain", serve_view, settings.STATIC_URL + name, {}),
+            ("middleware", "plain", middleware, hashed, {}),
+            ("middleware", "gzip", middleware, hashed, {"accept-encoding": "gzip"}),
+            ("middleware", "br", middleware, hashed, {"accept-encoding": "br"}),
+            ("middleware", "304", middleware, hashed, {"if-none-match": etag}),
+        ]
+        for server, request, app, path, headers in cases:
+            with override_settings(DEBUG=app is serve_view):
+                rate, size = throughput(app, path, {**host, **headers}, args.requests)
+            print(f"{asset:<6} {server:<12} {request:<10} {rate:>9.0f} {size:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Render times of login.html and index.html in each TEMPLATE_MODE.
+
+Each page is requested through the WSGI app and the time spent rendering
+its template (including base.html and the included partials) is taken from
+front_end.templating.template_timings(). The first request of each mode is
+reported separately, since that's where the debug and cached modes differ
+most. Run it from the front_end directory against a local Postgres:
+
+    python -m benchmarks.templates --requests 200
+"""
+import argparse
+import copy
+import sys
+import tempfile
+import time
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+PAGES = {
+    "registration/login.html": "/registration/login/",
+    "index.html": "/",
+}
+MODES = ("debug", "cached", "bundle")
+BUNDLE = "benchmark_template_bundle"
+
+
+def templates_setting(templates, mode):
+    """Return a copy of the TEMPLATES setting using the ``mode`` loaders."""
+    if mode == "bundle":
+        loaders = ["front_end.templating.BundleLoader"]
+    else:
+        loaders = [
+            "front_end.templating.FilesystemLoader",
+            "front_end.templating.AppDirectoriesLoader",
+        ]
+    if mode != "debug":
+        loaders = [("front_end.templating.CachedLoader", loaders)]
+    templates = copy.deepcopy(templates)
+    templates[0]["OPTIONS"]["loaders"] = loaders
+    return templates
+
+
+def render_ms(template_name):
+    """Mean render time of ``template_name`` since the timings were reset."""
+    from front_end.templating import template_timings
+
+    renders, seconds = template_timings().get(template_name, (0, 0))
+    return seconds / renders * 1000 if renders else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    wsgi_app, _ = driver.setup()
+    from django.conf import settings
+    from django.template import engines
+    from django.test import override_settings
+
+    from front_end.templating import (
+        bundle_dirs,
+        reset_template_timings,
+        warm_templates,
+        write_bundle,
+    )
+
+    driver.ensure_user(EMAIL, PASSWORD)
+    bundle_dir = tempfile.TemporaryDirectory()
+    engine = engines["django"].engine
+    write_bundle(f"{bundle_dir.name}/{BUNDLE}.py", bundle_dirs(engine))
+    sys.path.insert(0, bundle_dir.name)
+
+    print(
+        f"{'mode':<7} {'template':<24} {'first ms':>9} {'render ms':>10} "
+        f"{'request ms':>11} {'warm-up s':>10}"
+    )
+    for mode in MODES:
+        with override_settings(
+            TEMPLATES=templates_setting(settings.TEMPLATES, mode),
+            TEMPLATE_BUNDLE=BUNDLE,
+        ):
+            start = time.perf_counter()
+            warm_templates()
+            warm_up = time.perf_counter() - start
+            session = driver.Session(wsgi_app)
+            session.login(EMAIL, PASSWORD)
+            for template_name, path in PAGES.items():
+                reset_template_timings()
+                session.request("GET", path)
+                first = render_ms(template_name)
+
+                reset_template_timings()
+                start = time.perf_counter()
+                for _ in range(args.requests):
+                    response = session.request("GET", path)
+                    if response.status != 200:
+                        raise RuntimeError(f"{path} returned {response.status}")
+                request = (time.perf_counter() - start) / args.requests * 1000
+                print(
+                    f"{mode:<7} {template_name:<24} {first:>9.2f} "
+                    f"{render_ms(template_name):>10.2f} {request:>11.2f} "
+                    f"{warm_up:>10.2f}"
+                )
+    bundle_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cost of an authenticated request with a session cookie and a bearer token.
+
+The same signed-in user GETs registration:me through the WSGI app, once
+with the session cookie a browser sends and once with an access token from
+registration:token. Warm requests find the session, the user and the token's
+revocation entry in this process's LRUs; cold ones start with those emptied,
+as in a process that hasn't seen the client yet, and go to the shared
+caches and, for the revocation, the database. The four kinds take turns request by request and their median
+times are compared. Run it from the front_end directory against a local
+Postgres, with the settings profile to measure:
+
+    SETTINGS_PROFILE=prod SECRET_KEY=... python -m benchmarks.token_auth --requests 2000
+"""
+import argparse
+import json
+import statistics
+import time
+import timeit
+from urllib.parse import urlencode
+
+from benchmarks import driver
+
+EMAIL = "benchmark@spendingtree.local"
+PASSWORD = "bench-password-123"
+PATH = "/registration/me/"
+KINDS = ("session warm", "token warm", "session cold", "token cold")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    wsgi_app, _ = driver.setup()
+    from registration import tokens, usercache
+    from registration.sessions import SessionStore
+
+    driver.ensure_user(EMAIL, PASSWORD)
+    session = driver.Session(wsgi_app)
+    session.login(EMAIL, PASSWORD)
+    body = urlencode({"email": EMAIL, "password": PASSWORD}).encode()
+    response = driver.wsgi_call(
+        wsgi_app,
+        "POST",
+        "/registration/token/",
+        {
+            "host": driver.HOST,
+            "content-type": "application/x-www-form-urlencoded",
+            "content-length": str(len(body)),
+        },
+        body,
+    )
+    access_token = json.loads(response.body)["access_token"]
+    bearer = {"host": driver.HOST, "authorization": f"Bearer {access_token}"}
+
+    def get(kind):
+        if kind.endswith("cold"):
+            SessionStore.local.clear()
+            usercache.local.clear()
+            tokens.local.clear()
+        start = time.perf_counter()
+        if kind.startswith("session"):
+            response = session.request("GET", PATH)
+        else:
+            response = driver.wsgi_call(wsgi_app, "GET", PATH, bearer, b"")
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status != 200:
+            raise RuntimeError(f"{kind} returned {response.status}")
+        return elapsed
+
+    times = {kind: [] for kind in KINDS}
+    for i in range(args.requests):
+        # Each kind goes first in turn
+        for kind in KINDS[i % len(KINDS) :] + KINDS[: i % len(KINDS)]:
+            times[kind].append(get(kind))
+
+    print(f"{'auth':<13} {'ms/request':>10} {'vs session':>10}")
+    for kind in KINDS:
+        ms = statistics.median(times[kind])
+        baseline = statistics.median(times["session " + kind.split()[1]])
+        print(f"{kind:<13} {ms:>10.3f} {ms / baseline - 1:>10.1%}")
+
+    number = 10000
+    seconds = timeit.timeit(lambda: tokens.verify_access(access_token), number=number)
+    print(f"verify_access: {seconds / number * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+The admin's URLconf. With LAZY_STARTUP on, it's imported by the first request
+for an admin URL and runs the autodiscovery that AdminConfig would have run
+at startup. See front_end/startup.py.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+app_name = "admin"
+urlpatterns = admin.site.get_urls()
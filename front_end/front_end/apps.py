@@ -0,0 +1,33 @@
+from django.contrib import admin
+from django.contrib.admin import checks as admin_checks
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.staticfiles.apps import StaticFilesConfig
+from django.core import checks
+
+
+class FrontEndStaticFilesConfig(StaticFilesConfig):
+    # The sources of the static/build bundles aren't published on their own,
+    # nor are the design files kept in archive/ directories
+    ignore_patterns = StaticFilesConfig.ignore_patterns + [
+        "*.scss",
+        "vendor/*",
+        "archive",
+    ]
+
+
+def check_admin_app(app_configs, **kwargs):
+    # System checks only run in management commands, never in a worker, so
+    # the ModelAdmins can be registered and checked here
+    admin.autodiscover()
+    return admin_checks.check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    """
+    The admin for LAZY_STARTUP: its autodiscovery runs when the admin's
+    URLconf, front_end.admin_urls, is first imported rather than at startup.
+    """
+
+    def ready(self):
+        checks.register(admin_checks.check_dependencies, checks.Tags.admin)
+        checks.register(check_admin_app, checks.Tags.admin)
@@ -2,15 +2,34 @@
 ASGI config for front_end project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are routed through ``settings.ASGI_URLCONF`` so that they are served
+by the async-native views rather than the sync ones behind a thread hop.
 
 For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
 
-import os
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
-from django.core.asgi import get_asgi_application
+from front_end.settings import configure
+from front_end.templating import warm_templates
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "front_end.settings")
+# A server started without SETTINGS_PROFILE must not run with DEBUG on
+configure(default="prod")
 
-application = get_asgi_application()
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = AsyncViewsASGIHandler()
+
+# Parse every template now rather than on the first requests to use them
+warm_templates()
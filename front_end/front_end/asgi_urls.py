@@ -0,0 +1,25 @@
+"""front_end URL Configuration for the ASGI entry point
+
+Same routes and names as front_end.urls, but served by the async-native
+views. asgi.py points every ASGI request at this module.
+"""
+from django.conf import settings
+from django.urls import include, path
+
+from front_end import views
+from front_end.startup import lazy_path
+
+urlpatterns = [
+    path("", views.home, name="home"),
+    lazy_path("admin/", "front_end.admin_urls", "admin"),
+    path("metrics/", views.metrics, name="metrics"),
+    path(
+        "registration/", include("registration.async_urls", namespace="registration")
+    ),
+    path("ledger/", include("ledger.urls", namespace="ledger")),
+    path("jobs/", include("jobs.urls", namespace="jobs")),
+]
+
+# Only the dev profile installs the toolbar
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(lazy_path("__debug__/", "debug_toolbar.toolbar", "djdt"))
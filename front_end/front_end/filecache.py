@@ -0,0 +1,24 @@
+"""
+Django's file-based cache, but checking its size every CULL_EVERY sets.
+
+The stock backend lists its whole directory on every set() to see whether
+it's over MAX_ENTRIES, so a set costs more the more entries there are: with
+20,000 rate limit buckets, a login from a new address wrote three files at
+about 9 ms each. Here the directory is listed on every CULL_EVERY'th set
+of a process (100 by default), so a cache can run over MAX_ENTRIES by at
+most that many entries per process before it's culled.
+"""
+import itertools
+
+from django.core.cache.backends import filebased
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._cull_every = int(params.get("OPTIONS", {}).get("CULL_EVERY", 100))
+        self._sets = itertools.count(1)
+
+    def _cull(self):
+        if next(self._sets) % self._cull_every == 0:
+            super()._cull()
@@ -0,0 +1,310 @@
+"""
+Per-request performance metrics.
+
+metrics_middleware measures a sample of the requests, METRICS_SAMPLE_RATE of
+them (0 takes the middleware out of the chain). For each one it records:
+
+- the wall time of the request;
+- the number of SQL queries and the time spent in them;
+- the time spent rendering templates;
+- the time spent hashing and checking passwords;
+- hits and misses of the user and session caches.
+
+Project code adds to the current request's measurements with timed() and
+count(), which do nothing when the request isn't sampled. Once a sampled
+request is done:
+
+- its measurements are added to per-view histograms, which metrics_text()
+  returns in the Prometheus text format (served by front_end.views.metrics);
+- request_measured is sent, so other code can export them elsewhere;
+- they are reported in a Server-Timing header when METRICS_SERVER_TIMING is
+  on.
+
+The histograms are per process, like template_timings(), so each worker is
+scraped on its own.
+"""
+import asyncio
+import bisect
+import contextvars
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+from django.utils.decorators import sync_and_async_middleware
+
+# Sent with request, response, view (its name) and metrics (RequestMetrics)
+# after every sampled request
+request_measured = Signal()
+
+# Upper bounds in seconds, the Prometheus client's defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Timed parts of a request: name -> (histogram, Server-Timing name, help)
+TIMED = {
+    "db": ("db_seconds", "db", "Time spent in SQL queries"),
+    "template": ("template_seconds", "tpl", "Time spent rendering templates"),
+    "hash": ("hashing_seconds", "hash", "Time spent hashing passwords"),
+}
+# Counted events: name -> (counter, help)
+COUNTED = {
+    "db_queries": ("db_queries_total", "SQL queries run"),
+    "cache_hits": ("cache_hits_total", "User and session cache hits"),
+    "cache_misses": ("cache_misses_total", "User and session cache misses"),
+}
+PREFIX = "front_end_request_"
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """What one request spent its time on."""
+
+    __slots__ = ("duration", "seconds", "counts", "_timing")
+
+    def __init__(self):
+        self.duration = None
+        self.seconds = dict.fromkeys(TIMED, 0.0)
+        self.counts = dict.fromkeys(COUNTED, 0)
+        # Names being timed, so nested timed() blocks aren't counted twice
+        self._timing = set()
+
+    def add(self, name, seconds):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def server_timing(self):
+        """Return the measurements as the value of a Server-Timing header."""
+        entries = [f"total;dur={self.duration * 1000:.2f}"]
+        for name, (_, metric, _) in TIMED.items():
+            entries.append(f"{metric};dur={self.seconds[name] * 1000:.2f}")
+        entries.append(f'sql;desc="{self.counts["db_queries"]} query(ies)"')
+        entries.append(
+            f'cache;desc="{self.counts["cache_hits"]} hit(s), '
+            f'{self.counts["cache_misses"]} miss(es)"'
+        )
+        return ", ".join(entries)
+
+
+def current():
+    """Return the RequestMetrics of the current request, or None."""
+    return _current.get()
+
+
+def count(name, n=1):
+    """Add ``n`` to the count ``name`` of the current request, if sampled."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.count(name, n)
+
+
+class timed:
+    """
+    Add the time spent in the block to ``name`` of the current request, if
+    sampled. Blocks nested in one of the same name add nothing more.
+
+    A class rather than a generator, as templates enter one per render.
+    """
+
+    __slots__ = ("name", "metrics", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        metrics = _current.get()
+        if metrics is None or self.name in metrics._timing:
+            self.metrics = None
+        else:
+            metrics._timing.add(self.name)
+            self.metrics = metrics
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.metrics is not None:
+            self.metrics._timing.discard(self.name)
+            self.metrics.add(self.name, time.perf_counter() - self.start)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add("db", time.perf_counter() - start)
+        metrics.count("db_queries")
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Sent on every connect(), including each checkout from the pool. First
+    # in the list, as execute_wrapper() pops the last one when it's done.
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute_wrapper)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        # One more for the values above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Yield (upper bound, observations up to it), ending with +Inf."""
+        total = 0
+        for bound, n in zip(self.buckets + ("+Inf",), self.counts):
+            total += n
+            yield bound, total
+
+
+_lock = threading.Lock()
+# View name -> {histogram or counter name: Histogram or int} for this process
+_views = {}
+
+
+def record(view, metrics):
+    """Add a sampled request's measurements to the histograms of ``view``."""
+    with _lock:
+        totals = _views.get(view)
+        if totals is None:
+            totals = _views[view] = {"duration": Histogram()}
+            totals.update((name, Histogram()) for name in TIMED)
+            totals.update(dict.fromkeys(COUNTED, 0))
+        totals["duration"].observe(metrics.duration)
+        for name in TIMED:
+            totals[name].observe(metrics.seconds[name])
+        for name in COUNTED:
+            totals[name] += metrics.counts[name]
+
+
+def reset_metrics():
+    with _lock:
+        _views.clear()
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metrics_text():
+    """Return the histograms and counters in the Prometheus text format."""
+    with _lock:
+        views = {
+            view: {
+                name: (
+                    (list(total.cumulative()), total.sum)
+                    if isinstance(total, Histogram)
+                    else total
+                )
+                for name, total in totals.items()
+            }
+            for view, totals in sorted(_views.items())
+        }
+    histograms = {"duration": ("duration_seconds", "Wall time of requests")}
+    histograms.update(
+        (name, (metric, help)) for name, (metric, _, help) in TIMED.items()
+    )
+
+    lines = [
+        "# HELP front_end_metrics_sample_rate Share of requests measured.",
+        "# TYPE front_end_metrics_sample_rate gauge",
+        f"front_end_metrics_sample_rate {getattr(settings, 'METRICS_SAMPLE_RATE', 0)}",
+    ]
+    for name, (metric, help) in histograms.items():
+        metric = PREFIX + metric
+        lines.append(f"# HELP {metric} {help}, by view.")
+        lines.append(f"# TYPE {metric} histogram")
+        for view, totals in views.items():
+            buckets, total = totals[name]
+            label = f'view="{_label(view)}"'
+            for bound, n in buckets:
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {n}')
+            lines.append(f"{metric}_sum{{{label}}} {total}")
+            lines.append(f"{metric}_count{{{label}}} {buckets[-1][1]}")
+    for name, (metric, help) in COUNTED.items():
+        metric = PREFIX + metric
+        lines.append(f"# HELP {metric} {help}, by view.")
+        lines.append(f"# TYPE {metric} counter")
+        for view, totals in views.items():
+            lines.append(f'{metric}{{view="{_label(view)}"}} {totals[name]}')
+    return "\n".join(lines) + "\n"
+
+
+def view_name(request):
+    """The name of the view that handled ``request``, for the view label."""
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "<unresolved>"
+
+
+def _finish(request, response, metrics, start, server_timing):
+    metrics.duration = time.perf_counter() - start
+    view = view_name(request)
+    record(view, metrics)
+    request_measured.send(
+        sender=RequestMetrics,
+        request=request,
+        response=response,
+        view=view,
+        metrics=metrics,
+    )
+    if server_timing:
+        # The template timings' entries, if any, stay in front
+        timing = response.get("Server-Timing")
+        value = metrics.server_timing()
+        response["Server-Timing"] = f"{timing}, {value}" if timing else value
+    return response
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Measure METRICS_SAMPLE_RATE of the requests (see above)."""
+    rate = getattr(settings, "METRICS_SAMPLE_RATE", 0)
+    if not rate:
+        raise MiddlewareNotUsed
+    server_timing = getattr(settings, "METRICS_SERVER_TIMING", False)
+
+    def sampled():
+        return rate >= 1 or random.random() < rate
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if not sampled():
+                return await get_response(request)
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, metrics, start, server_timing)
+
+    else:
+
+        def middleware(request):
+            if not sampled():
+                return get_response(request)
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            start = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, metrics, start, server_timing)
+
+    return middleware
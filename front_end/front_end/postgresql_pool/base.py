@@ -0,0 +1,58 @@
+"""
+PostgreSQL backend that checks connections out of a process-wide pool
+instead of opening a new one for every request.
+
+Pooling is configured with a POOL entry next to OPTIONS in DATABASES (see
+pool.DEFAULT_OPTIONS for the keys). Without it, or with POOL set to None,
+the backend behaves exactly like django.db.backends.postgresql.
+"""
+import functools
+
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get("POOL")
+        # Maintenance connections (NAME None, e.g. creating the test
+        # database) are short-lived and must not hold databases open.
+        if options is None or self.settings_dict["NAME"] is None:
+            return None
+        key = (
+            self.alias,
+            conn_params["database"],
+            tuple(sorted((k, str(v)) for k, v in conn_params.items())),
+        )
+        connect = functools.partial(super().get_new_connection, conn_params)
+        return get_pool(key, connect, options)
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = self.pool.getconn()
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get(
+            "isolation_level", connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                return self.pool.putconn(self.connection)
+        return super()._close()
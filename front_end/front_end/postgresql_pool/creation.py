@@ -0,0 +1,29 @@
+from django.db.backends.postgresql import creation
+
+from .pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    PostgreSQL refuses to drop or copy a database that has open sessions,
+    so pooled connections to it are closed first.
+
+    The copies of the test database for parallel test runs are always made
+    afresh, even with --keepdb: a kept copy would miss migrations applied to
+    the kept test database since.
+    """
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        # Back to the pool first, then closed with the rest of it
+        self.connection.close()
+        close_pools(database=self.connection.settings_dict["NAME"])
+        if keepdb:
+            target = self.get_test_db_clone_settings(suffix)["NAME"]
+            close_pools(database=target)
+            with self._nodb_cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS {self._quote_name(target)}")
+        super()._clone_test_db(suffix, verbosity, keepdb)
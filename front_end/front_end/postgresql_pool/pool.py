@@ -0,0 +1,254 @@
+"""
+A thread-safe pool of psycopg2 connections shared by every DatabaseWrapper
+in the process, whichever thread (WSGI worker or ASGI sync_to_async) it
+runs on.
+"""
+import collections
+import os
+import threading
+import time
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_INERROR,
+    TRANSACTION_STATUS_INTRANS,
+)
+
+DEFAULT_OPTIONS = {
+    "MIN_SIZE": 1,
+    "MAX_SIZE": 10,
+    # Seconds a connection may live before it is replaced
+    "MAX_LIFETIME": 30 * 60,
+    # Seconds an idle connection above MIN_SIZE is kept around
+    "MAX_IDLE": 5 * 60,
+    # Seconds to wait for a free connection when all MAX_SIZE are in use
+    "TIMEOUT": 10,
+    # Run SELECT 1 on checkout if the connection was idle for longer than this
+    "CHECK_INTERVAL": 30,
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, options=None):
+        options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.connect = connect
+        self.min_size = options["MIN_SIZE"]
+        self.max_size = options["MAX_SIZE"]
+        self.max_lifetime = options["MAX_LIFETIME"]
+        self.max_idle = options["MAX_IDLE"]
+        self.timeout = options["TIMEOUT"]
+        self.check_interval = options["CHECK_INTERVAL"]
+
+        self._cond = threading.Condition()
+        # (connection, created_at, returned_at), most recently returned last
+        self._idle = collections.deque()
+        self._created_at = {}
+        # Open connections plus slots reserved by threads still connecting
+        self._size = 0
+        self._counters = collections.Counter()
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @property
+    def size(self):
+        return self._size
+
+    def getconn(self):
+        """
+        Check a connection out of the pool, opening a new one if the pool
+        is below MAX_SIZE and waiting up to TIMEOUT seconds otherwise.
+        """
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                self._close_idle()
+                if self._idle:
+                    connection, created_at, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    # Reserve the slot, then connect outside the lock
+                    connection = None
+                    self._size += 1
+                else:
+                    remaining = start + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No connection available within {self.timeout}s "
+                            f"({self.max_size} in use)"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            if connection is None:
+                connection = self._open()
+                break
+            if self._healthy(connection, returned_at):
+                break
+            self._discard(connection)
+
+        waited_for = time.monotonic() - start
+        with self._cond:
+            self._counters["checkouts"] += 1
+            if waited:
+                self._counters["waits"] += 1
+                self._wait_time += waited_for
+                self._max_wait_time = max(self._max_wait_time, waited_for)
+        return connection
+
+    def putconn(self, connection):
+        """
+        Return a connection to the pool. Open transactions are rolled back;
+        broken, busy or expired connections are closed instead of kept.
+        """
+        created_at = self._created_at.get(id(connection))
+        if created_at is None:
+            # Not ours (e.g. opened before a fork), just close it
+            connection.close()
+            return
+        if not self._reset(connection) or self._expired(created_at):
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self._counters["checkouts"],
+                "waits": self._counters["waits"],
+                "wait_time_total": self._wait_time,
+                "wait_time_max": self._max_wait_time,
+                "timeouts": self._counters["timeouts"],
+                "connections_opened": self._counters["opened"],
+                "connections_closed": self._counters["closed"],
+                "health_check_failures": self._counters["health_check_failures"],
+            }
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(connection)] = time.monotonic()
+            self._counters["opened"] += 1
+        return connection
+
+    def _discard(self, connection):
+        with self._cond:
+            if self._created_at.pop(id(connection), None) is not None:
+                self._size -= 1
+            self._counters["closed"] += 1
+            self._cond.notify()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _expired(self, created_at):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - created_at >= self.max_lifetime
+        )
+
+    def _healthy(self, connection, returned_at):
+        if connection.closed or self._expired(self._created_at[id(connection)]):
+            return False
+        if time.monotonic() - returned_at < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except Exception:
+            with self._cond:
+                self._counters["health_check_failures"] += 1
+            return False
+        return True
+
+    def _reset(self, connection):
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == TRANSACTION_STATUS_IDLE:
+            return True
+        if status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+                return True
+            except Exception:
+                return False
+        # A query is still running or the connection state is unknown
+        return False
+
+    def _close_idle(self):
+        # Called with the lock held. The oldest idle connections are at the
+        # left, and those above MIN_SIZE are closed once idle for MAX_IDLE.
+        now = time.monotonic()
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][2] >= self.max_idle
+        ):
+            connection, _, _ = self._idle.popleft()
+            del self._created_at[id(connection)]
+            self._size -= 1
+            self._counters["closed"] += 1
+            connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(key, connect, options):
+    """
+    Return the process-wide pool for ``key``, creating it on first use.
+    Keys are (alias, database name, connection parameters) tuples.
+    """
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Connections inherited across fork belong to the parent process.
+            # Forget them without closing, which would end the parent's sessions.
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, options)
+        return _pools[key]
+
+
+def close_pools(database=None):
+    """Close idle connections in every pool, or only in pools for ``database``."""
+    with _pools_lock:
+        pools = [
+            pool for key, pool in _pools.items() if database in (None, key[1])
+        ]
+    for pool in pools:
+        pool.close_all()
+
+
+def pool_stats():
+    with _pools_lock:
+        return {key: pool.stats() for key, pool in _pools.items()}
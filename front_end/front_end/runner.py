@@ -0,0 +1,169 @@
+"""
+Test runner of the test settings profile.
+
+- Test cases run in parallel, one process per CPU core unless --parallel
+  says otherwise, each on its own copy of the test database and with its
+  own directory for the file-based caches, under the run's TEST_CACHE_DIR.
+  That directory is removed at the end of the run.
+- The test database is kept between runs, so a run only applies the
+  migrations it hasn't seen (--no-keepdb starts afresh). The copies are
+  made again from it every run.
+- The slowest tests are listed at the end (--slowest N, 0 for none).
+
+Test cases are handed to the workers whole, so setUpTestData() still runs
+once per class. The workers are daemon processes, which can't start
+processes of their own (e.g. a hashing pool), so tests that do are tagged
+"serial" and run in the main process, on the test database itself.
+"""
+
+import os
+import shutil
+import time
+import unittest
+
+from django.conf import settings
+from django.test import override_settings, runner
+from django.test.runner import DiscoverRunner, default_test_processes
+
+SERIAL = "serial"
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Records the time each test took in ``test_times``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.test_times = {}
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.addTestTime(test, time.perf_counter() - self._started)
+
+    def addTestTime(self, test, seconds):
+        # In a parallel run, this comes after the replayed stopTest() with
+        # the time the test took in its worker
+        self.test_times[test.id()] = seconds
+
+
+class TimedRemoteTestResult(runner.RemoteTestResult):
+    """Sends the time each test took to the parent process."""
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.events.append(
+            ("addTestTime", self.test_index, time.perf_counter() - self._started)
+        )
+
+
+class TimedRemoteTestRunner(runner.RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+def worker_caches(caches, worker_id):
+    """
+    Return the CACHES setting for parallel worker ``worker_id``: file-based
+    caches get a directory of their own inside theirs (the test profile's,
+    under TEST_CACHE_DIR), as the same keys (e.g. user ids) mean different
+    rows in each worker's database.
+    """
+    return {
+        alias: (
+            {
+                **config,
+                "LOCATION": os.path.join(config["LOCATION"], f"worker-{worker_id}"),
+            }
+            if config["BACKEND"].endswith(".FileBasedCache")
+            else config
+        )
+        for alias, config in caches.items()
+    }
+
+
+def _init_worker(counter):
+    runner._init_worker(counter)
+    override_settings(CACHES=worker_caches(settings.CACHES, runner._worker_id)).enable()
+
+
+def is_serial(test):
+    """Return whether ``test`` or its test method is tagged "serial"."""
+    method = getattr(test, getattr(test, "_testMethodName", ""), None)
+    tags = set(getattr(test, "tags", ())) | set(getattr(method, "tags", ()))
+    return SERIAL in tags
+
+
+class TimedParallelTestSuite(runner.ParallelTestSuite):
+    init_worker = _init_worker
+    runner_class = TimedRemoteTestRunner
+
+    def __init__(self, suite, processes, failfast=False):
+        tests = list(suite)
+        self.serial_suite = unittest.TestSuite(filter(is_serial, tests))
+        parallel = [test for test in tests if not is_serial(test)]
+        super().__init__(unittest.TestSuite(parallel), processes, failfast)
+
+    def run(self, result):
+        self.serial_suite.run(result)
+        if not result.shouldStop:
+            super().run(result)
+        return result
+
+    def __iter__(self):
+        yield from self.serial_suite
+        yield from super().__iter__()
+
+
+class TestRunner(DiscoverRunner):
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, parallel=0, slowest=10, **kwargs):
+        if not parallel:
+            # Neither --pdb nor --buffer works with parallel tests
+            serial = kwargs.get("pdb") or kwargs.get("buffer")
+            parallel = 1 if serial else default_test_processes()
+        super().__init__(parallel=parallel, **kwargs)
+        self.slowest = slowest
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--no-keepdb",
+            action="store_false",
+            dest="keepdb",
+            help="Create the test database afresh and destroy it afterwards.",
+        )
+        parser.add_argument(
+            "--slowest",
+            type=int,
+            default=10,
+            metavar="N",
+            help="List the N slowest tests (default: %(default)s).",
+        )
+        # parallel=0 picks one process per core
+        parser.set_defaults(keepdb=True, parallel=0)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        cache_dir = getattr(settings, "TEST_CACHE_DIR", None)
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def suite_result(self, suite, result, **kwargs):
+        test_times = getattr(result, "test_times", {})
+        if self.slowest and test_times:
+            slowest = sorted(test_times.items(), key=lambda item: item[1])
+            print(f"\nSlowest {min(self.slowest, len(slowest))} tests:")
+            for test_id, seconds in reversed(slowest[-self.slowest :]):
+                print(f"{seconds:8.3f}s {test_id}")
+        return super().suite_result(suite, result, **kwargs)
@@ -0,0 +1,30 @@
+"""
+Settings profiles. Each module is a complete settings module built on base:
+
+- dev: DEBUG on, the debug toolbar, templates re-read on every use
+- prod: the base settings, with SECRET_KEY required from the environment
+- test: used by ``manage.py test``
+
+manage.py, wsgi.py and asgi.py call configure(), which points
+DJANGO_SETTINGS_MODULE at the profile named by SETTINGS_PROFILE in the
+environment or .env, unless DJANGO_SETTINGS_MODULE is already set. Without
+SETTINGS_PROFILE, manage.py uses dev (test for ``manage.py test``) and the
+servers, wsgi.py and asgi.py, use prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+
+PROFILES = ("dev", "prod", "test")
+
+
+def configure(default="dev"):
+    """Set DJANGO_SETTINGS_MODULE to the SETTINGS_PROFILE settings module."""
+    load_dotenv()
+    profile = os.environ.get("SETTINGS_PROFILE", default)
+    if profile not in PROFILES:
+        raise ImproperlyConfigured(
+            f"SETTINGS_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}."
+        )
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", f"front_end.settings.{profile}")
@@ -0,0 +1,342 @@
+"""
+Django settings for front_end project, shared by every profile.
+
+The dev, prod and test modules next to this one start from these settings.
+They are production defaults: DEBUG off and nothing debug-only installed.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/3.0/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+from django.contrib.messages import constants as messages
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# See https://docs.djangoproject.com/en/3.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get(
+    "SECRET_KEY", "iyzb4gpshm@pl8!grh1ddv8+o_#omk0taf0*ww09bu_nvwb-o8"
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+
+
+# Application definition
+
+# Run the admin's autodiscovery and import the admin and debug toolbar
+# URLconfs on the first request that needs them rather than at startup, so
+# new workers answer sooner. See front_end/startup.py and
+# `manage.py startup_profile`.
+LAZY_STARTUP = os.environ.get("LAZY_STARTUP", "1") == "1"
+
+INSTALLED_APPS = [
+    "front_end.apps.LazyAdminConfig" if LAZY_STARTUP else "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "front_end.apps.FrontEndStaticFilesConfig",
+    "bootstrap4",
+    "registration.apps.RegistrationConfig",
+    "ledger.apps.LedgerConfig",
+    "jobs.apps.JobsConfig",
+]
+
+# Ordered so that requests answered early skip the most work: static files
+# before anything else runs, HTTPS and PREPEND_WWW redirects before the
+# session is loaded, bearer tokens ahead of the session so they don't load
+# it. Middleware that only applies when a setting is on (STATIC_SERVE,
+# METRICS_SAMPLE_RATE, TEMPLATE_TIMING_HEADER) drops out of the chain when
+# it's off.
+MIDDLEWARE = [
+    "front_end.staticserve.static_files_middleware",
+    "front_end.metrics.metrics_middleware",
+    "front_end.templating.template_timing_middleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "registration.middleware.TokenAuthenticationMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "registration.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "registration.middleware.HashingBackpressureMiddleware",
+]
+
+ROOT_URLCONF = "front_end.urls"
+
+# "debug" re-reads templates on every use, "cached" parses them once per
+# process (all of them at startup, see wsgi.py) and "bundle" does the same from
+# the TEMPLATE_BUNDLE module written by `manage.py build_template_bundle`.
+# See front_end/templating.py.
+TEMPLATE_MODE = os.environ.get("TEMPLATE_MODE", "cached")
+TEMPLATE_BUNDLE = "front_end.template_bundle"
+# Report each template's render time in a Server-Timing response header
+TEMPLATE_TIMING_HEADER = False
+
+# Share of requests whose wall time, SQL queries, template, hashing and cache
+# use are measured (0 for none), served in the Prometheus text format at
+# /metrics/ and, with METRICS_SERVER_TIMING on, in a Server-Timing response
+# header. See front_end/metrics.py and benchmarks/metrics.py for the overhead
+# of each rate. /metrics/ needs "Authorization: Metrics METRICS_TOKEN" when
+# that's set, and is otherwise served to METRICS_ALLOWED_IPS.
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "0.1"))
+METRICS_SERVER_TIMING = False
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+
+TEMPLATE_CONTEXT_PROCESSORS = [
+    "django.template.context_processors.request",
+    "django.contrib.auth.context_processors.auth",
+    "django.contrib.messages.context_processors.messages",
+]
+
+
+def templates(mode, context_processors):
+    """Return the TEMPLATES setting for a TEMPLATE_MODE."""
+    if mode == "bundle":
+        loaders = ["front_end.templating.BundleLoader"]
+    else:
+        loaders = [
+            "front_end.templating.FilesystemLoader",
+            "front_end.templating.AppDirectoriesLoader",
+        ]
+    if mode != "debug":
+        loaders = [("front_end.templating.CachedLoader", loaders)]
+    return [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "DIRS": [Path(BASE_DIR) / "templates"],
+            "OPTIONS": {
+                "loaders": loaders,
+                "context_processors": list(context_processors),
+            },
+        },
+    ]
+
+
+TEMPLATES = templates(TEMPLATE_MODE, TEMPLATE_CONTEXT_PROCESSORS)
+
+WSGI_APPLICATION = "front_end.wsgi.application"
+
+# asgi.py serves the async-native views from this URLconf
+ASGI_URLCONF = "front_end.asgi_urls"
+
+
+# Database
+# https://docs.djangoproject.com/en/3.0/ref/settings/#databases
+
+# Connections come from a per-process pool (front_end/postgresql_pool), so
+# requests don't pay for a TCP and auth handshake. Set POOL to None to open
+# a connection per request instead.
+DATABASES = {
+    'default': {
+        'ENGINE': 'front_end.postgresql_pool',
+        'NAME': 'spdb',
+        'USER': 'spuser',
+        'PASSWORD': '1234',
+        'HOST': '',
+        'PORT': '',
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 20,
+            'MAX_LIFETIME': 30 * 60,
+            'MAX_IDLE': 5 * 60,
+            'TIMEOUT': 10,
+            'CHECK_INTERVAL': 30,
+        },
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+        "OPTIONS": {"min_length": 8},
+    },
+    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",},
+    {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",},
+]
+
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.BCryptPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+# Hash passwords in a bounded process pool rather than on the request worker.
+# Requests get a 503 with Retry-After once max_queue hashes are waiting.
+PASSWORD_HASHING_EXECUTOR = {
+    "BACKEND": "registration.hashing.ProcessPoolHashingExecutor",
+    "OPTIONS": {"max_workers": None, "max_queue": 32, "retry_after": 1},
+}
+
+# Token buckets checked before sign-in and password reset POSTs do any work,
+# per client IP, per submitted email and for everyone together. A rate of
+# "10/m" allows a burst of 10 and refills 10 a minute. The buckets are kept in
+# the RATELIMIT_CACHE_ALIAS cache. See registration/ratelimit.py.
+RATELIMITS = {
+    "login": {"ip": "30/m", "email": "10/m", "global": "100/s"},
+    "reset_password": {"ip": "10/m", "email": "3/h", "global": "20/s"},
+}
+RATELIMIT_CACHE_ALIAS = "ratelimits"
+
+# Addresses or networks of the reverse proxies in front of the app. Requests
+# from them are taken to come from the address they add to X-Forwarded-For.
+TRUSTED_PROXIES = []
+
+# Validated and normalized emails are kept in LRUs of this many entries per
+# process, see registration/emails.py. EMAIL_FOLDING lists the domains that
+# deliver user+tag@ and dotted variants of an address to the same mailbox,
+# which then share the address's rate limit buckets.
+EMAIL_CACHE_SIZE = 10000
+EMAIL_FOLDING = {
+    "gmail.com": ("plus", "dots"),
+    "googlemail.com": ("plus", "dots"),
+    "outlook.com": ("plus",),
+    "hotmail.com": ("plus",),
+    "icloud.com": ("plus",),
+}
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # Shared by every worker process on the host. Written on logins and
+    # session changes, so culled every CULL_EVERY sets like "ratelimits"
+    "sessions": {
+        "BACKEND": "front_end.filecache.FileBasedCache",
+        "LOCATION": Path(BASE_DIR) / "temp" / "cache" / "sessions",
+        "OPTIONS": {"MAX_ENTRIES": 100000, "CULL_EVERY": 100},
+    },
+    "users": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(BASE_DIR) / "temp" / "cache" / "users",
+    },
+    # Written on every allowed attempt, so it's culled every CULL_EVERY sets
+    # rather than on each (see front_end/filecache.py)
+    "ratelimits": {
+        "BACKEND": "front_end.filecache.FileBasedCache",
+        "LOCATION": Path(BASE_DIR) / "temp" / "cache" / "ratelimits",
+        "OPTIONS": {"MAX_ENTRIES": 100000, "CULL_EVERY": 100},
+    },
+}
+
+# Sessions are read from an in-process LRU, then the "sessions" cache, then the
+# database. Unchanged sessions aren't saved, and expiry-only changes are
+# batched into one UPDATE (see registration/touches.py).
+SESSION_ENGINE = "registration.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_LOCAL_CACHE_SIZE = 10000
+SESSION_LOCAL_CACHE_TTL = 5
+SESSION_WRITE_THROUGH = True
+SESSION_TOUCH_INTERVAL = 5 * 60
+TOUCH_BUFFER_SIZE = 100
+TOUCH_BUFFER_DELAY = 5
+
+# Bearer tokens for API clients, see registration/tokens.py. Access tokens are
+# checked by their signature and revocation and live TOKEN_ACCESS_TTL seconds;
+# refresh tokens are single-use and live TOKEN_REFRESH_TTL seconds. Revoked tokens
+# are listed in the database, which processes read at most every
+# TOKEN_REVOCATION_LOCAL_TTL seconds per token.
+TOKEN_ACCESS_TTL = 5 * 60
+TOKEN_REFRESH_TTL = 14 * 24 * 60 * 60
+TOKEN_REVOCATION_LOCAL_SIZE = 10000
+TOKEN_REVOCATION_LOCAL_TTL = 5
+
+# request.user is loaded from registration.usercache, which is invalidated
+# whenever a User is saved or deleted.
+USER_CACHE_ALIAS = "users"
+USER_CACHE_TIMEOUT = 60 * 60
+USER_CACHE_LOCAL_SIZE = 10000
+USER_CACHE_LOCAL_TTL = 5
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.0/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.0/howto/static-files/
+
+STATIC_URL = "/static/"
+STATICFILES_DIRS = [Path(BASE_DIR) / "static"]
+# `manage.py build_static` builds the bundles and collects them here with
+# hashed names and .gz/.br siblings
+STATIC_ROOT = Path(BASE_DIR) / "temp" / "static"
+STATICFILES_STORAGE = "front_end.staticfiles.CompressedManifestStaticFilesStorage"
+# Serve STATIC_ROOT from front_end/staticserve.py. Hashed names are cached for
+# a year, others for STATIC_MAX_AGE seconds.
+STATIC_SERVE = True
+STATIC_MAX_AGE = 60
+
+LOGIN_URL = "/registration/login/"
+LOGIN_REDIRECT_URL = "home"
+LOGOUT_REDIRECT_URL = "/registration/login/"
+
+# Email config. Save them as files in 'sent_emails' directory for now
+EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = "temp/sent_emails"
+
+# Password reset emails are queued here and sent by `manage.py send_queued_mail`.
+# Failed jobs are retried OUTBOX_MAX_ATTEMPTS times, OUTBOX_RETRY_DELAY seconds
+# apart at first and doubling after each attempt, then moved to dead/.
+OUTBOX_DIR = "temp/outbox"
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30
+
+# Background jobs are run by `manage.py run_workers`, with the same retries as
+# the outbox. A user has at most JOBS_PER_USER jobs running at once, and a
+# running job that hasn't reported progress for JOBS_LEASE seconds is taken
+# to have lost its worker and is run again.
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30
+JOBS_PER_USER = 2
+JOBS_LEASE = 10 * 60
+
+# Uploaded statements wait here for their import job
+STATEMENT_UPLOAD_DIR = "temp/statements"
+
+AUTH_USER_MODEL = "registration.User"
+
+AUTHENTICATION_BACKENDS = ["registration.backends.EmailBackend"]
+
+MESSAGE_TAGS = {
+    messages.DEBUG: "alert-info",
+    messages.INFO: "alert-info",
+    messages.SUCCESS: "alert-success",
+    messages.WARNING: "alert-warning",
+    messages.ERROR: "alert-danger",
+}
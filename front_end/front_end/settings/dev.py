@@ -0,0 +1,37 @@
+"""
+Development profile: DEBUG, the debug toolbar and templates re-read on every
+use, with their render times and every request's metrics in a Server-Timing
+header.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import (
+    INSTALLED_APPS,
+    MIDDLEWARE,
+    TEMPLATE_CONTEXT_PROCESSORS,
+    templates,
+)
+
+DEBUG = True
+
+# DEBUG allows localhost
+ALLOWED_HOSTS = []
+
+INTERNAL_IPS = ["127.0.0.1"]
+
+INSTALLED_APPS = INSTALLED_APPS + ["debug_toolbar"]
+
+MIDDLEWARE = MIDDLEWARE + ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+
+TEMPLATE_MODE = os.environ.get("TEMPLATE_MODE", "debug")
+TEMPLATE_TIMING_HEADER = True
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1"))
+METRICS_SERVER_TIMING = True
+TEMPLATE_CONTEXT_PROCESSORS = [
+    "django.template.context_processors.debug"
+] + TEMPLATE_CONTEXT_PROCESSORS
+TEMPLATES = templates(TEMPLATE_MODE, TEMPLATE_CONTEXT_PROCESSORS)
+
+# runserver serves static files itself when DEBUG is on
+STATIC_SERVE = False
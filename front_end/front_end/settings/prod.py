@@ -0,0 +1,19 @@
+"""
+Production profile: the base settings, with the secret key taken from the
+SECRET_KEY environment variable rather than the one committed in base.py,
+and /metrics/ served only with METRICS_TOKEN.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+
+try:
+    SECRET_KEY = os.environ["SECRET_KEY"]
+except KeyError:
+    raise ImproperlyConfigured("Set SECRET_KEY in the environment or .env.") from None
+
+# Behind a reverse proxy on the same host every request comes from
+# 127.0.0.1, so the address alone doesn't keep /metrics/ private
+METRICS_ALLOWED_IPS = []
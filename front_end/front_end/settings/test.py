@@ -0,0 +1,42 @@
+"""
+Test profile, used by ``manage.py test``: the base settings, without serving
+or fingerprinting static files, so tests don't depend on what was collected.
+Templates are read on every use, so tests can swap loaders freely. Passwords
+are hashed with MD5, in the test process, and tests run in parallel on a
+kept database (see front_end/runner.py). The file-based caches are kept in
+a directory of the run's own.
+"""
+import os
+import tempfile
+
+from .base import *  # noqa: F401,F403
+from .base import CACHES, PASSWORD_HASHERS, TEMPLATE_CONTEXT_PROCESSORS, templates
+
+TEMPLATE_MODE = os.environ.get("TEMPLATE_MODE", "debug")
+TEMPLATES = templates(TEMPLATE_MODE, TEMPLATE_CONTEXT_PROCESSORS)
+
+STATIC_SERVE = False
+STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
+
+# New passwords are hashed with MD5 and the base hashers can still check
+# theirs. Tests that are about hashing override both with the base settings.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"] + PASSWORD_HASHERS
+PASSWORD_HASHING_EXECUTOR = {"BACKEND": "registration.hashing.InlineHashingExecutor"}
+
+TEST_RUNNER = "front_end.runner.TestRunner"
+
+# Not BASE_DIR/temp/cache, where a dev server could be served test users
+# cached under the same ids. Passed on to the processes tests start, and
+# removed by the runner at the end of the run.
+TEST_CACHE_DIR = os.environ.setdefault(
+    "TEST_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), f"front_end-tests-{os.getpid()}"),
+)
+CACHES = {
+    alias: (
+        {**config, "LOCATION": os.path.join(TEST_CACHE_DIR, alias)}
+        if config["BACKEND"].endswith(".FileBasedCache")
+        else config
+    )
+    for alias, config in CACHES.items()
+}
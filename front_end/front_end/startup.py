@@ -0,0 +1,252 @@
+"""
+Worker startup: lazily imported URLconfs and the measurements behind
+``manage.py startup_profile``.
+
+With LAZY_STARTUP on, the admin's autodiscovery (which imports every app's
+admin.py, registration.admin included) doesn't run in django.setup(), see
+front_end.apps.LazyAdminConfig, and the admin's and the debug toolbar's
+URLconfs are added with lazy_path(). They're imported by the first request
+that resolves or reverses one of their URLs, so a worker answers its first
+requests without them.
+
+Run as ``python -X importtime -m front_end.startup PATH...``, this module
+starts Django the way wsgi.py does, GETs each path once and prints the time
+taken by each phase as JSON. startup_profile runs it in fresh processes and
+aggregates the importtime output with parse_importtime() and
+imports_by_package().
+"""
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.conf import settings
+from django.urls import URLResolver, get_resolver, include, path
+from django.urls.resolvers import RoutePattern
+
+# One line of -X importtime output: self and cumulative microseconds, then
+# the module indented by its depth in the import tree
+IMPORTTIME = re.compile(r"import time:\s*(\d+) \|\s*(\d+) \| *(\S+)$")
+CLIENT_ADDR = "192.0.2.1"
+
+
+class LazyURLResolver(URLResolver):
+    """
+    A URLResolver that imports its URLconf the first time a URL under it is
+    resolved or one of its names is reversed.
+
+    URLResolver._populate() goes through every nested resolver the first
+    time any URL is reversed, which would import them all. Here it waits
+    until this resolver's own reverse lookups are needed.
+    """
+
+    _loaded = False
+
+    def _populate(self):
+        if self._loaded:
+            super()._populate()
+
+    def _load(self):
+        self._loaded = True
+
+    @property
+    def reverse_dict(self):
+        self._load()
+        return super().reverse_dict
+
+    @property
+    def namespace_dict(self):
+        self._load()
+        return super().namespace_dict
+
+    @property
+    def app_dict(self):
+        self._load()
+        return super().app_dict
+
+
+def lazy_path(route, urlconf, app_name):
+    """
+    Return path(route, include(urlconf)), importing ``urlconf`` on first use
+    when LAZY_STARTUP is on. ``app_name`` must be the app_name the URLconf
+    declares; it's also the instance namespace.
+    """
+    if not getattr(settings, "LAZY_STARTUP", False):
+        return path(route, include(urlconf))
+    return LazyURLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf,
+        app_name=app_name,
+        namespace=app_name,
+    )
+
+
+def parse_importtime(output):
+    """
+    Return (module, self µs, cumulative µs) for every import reported in
+    ``output``, the stderr of a ``python -X importtime`` process.
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            own, cumulative, module = match.groups()
+            imports.append((module, int(own), int(cumulative)))
+    return imports
+
+
+def import_owner(module, packages):
+    """
+    Return the longest of ``packages`` that ``module`` is or is part of,
+    otherwise its top-level package.
+    """
+    for package in sorted(packages, key=len, reverse=True):
+        if module == package or module.startswith(package + "."):
+            return package
+    return module.partition(".")[0]
+
+
+def imports_by_package(imports, packages=()):
+    """
+    Return {owner: (self µs, modules)} for ``imports`` from parse_importtime(),
+    where the owner is given by import_owner(), slowest first.
+    """
+    totals = {}
+    for module, own, _ in imports:
+        owner = import_owner(module, packages)
+        own_total, modules = totals.get(owner, (0, 0))
+        totals[owner] = (own_total + own, modules + 1)
+    return dict(sorted(totals.items(), key=lambda item: item[1][0], reverse=True))
+
+
+class Timings(list):
+    """(phase, app, milliseconds) for each phase timed with ``timings(phase)``."""
+
+    @contextmanager
+    def __call__(self, phase, app=""):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.append((phase, app, (time.perf_counter() - start) * 1000))
+
+
+def _timed(timings, phase, app, func):
+    def wrapper(*args, **kwargs):
+        with timings(phase, app):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _instrument(timings):
+    # Time what wsgi.py runs: django.setup() per app, then the middleware
+    # chain and the template cache
+    import django
+    from django.apps.config import AppConfig
+    from django.core.handlers.base import BaseHandler
+
+    from front_end import templating
+
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        name = app_config.name
+        timings.append(("import", name, (time.perf_counter() - start) * 1000))
+        app_config.import_models = _timed(
+            timings, "models", name, app_config.import_models
+        )
+        app_config.ready = _timed(timings, "ready", name, app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    django.setup = _timed(timings, "django.setup()", "", django.setup)
+    BaseHandler.load_middleware = _timed(
+        timings, "middleware", "", BaseHandler.load_middleware
+    )
+    templating.warm_templates = _timed(
+        timings, "warm templates", "", templating.warm_templates
+    )
+
+
+def _get(application, path):
+    status = []
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "REMOTE_ADDR": CLIENT_ADDR,
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    body = application(environ, lambda s, headers, exc_info=None: status.append(s))
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return int(status[0].split()[0])
+
+
+def profile(paths, started=None):
+    """
+    Start Django the way wsgi.py does and GET each of ``paths``, in this
+    process, which mustn't have set Django up yet. ``started`` is the
+    time.time() the process was started at, if known.
+    """
+    start = time.perf_counter()
+    timings = Timings()
+    with timings("settings"):
+        from front_end.settings import configure
+
+        configure()
+        settings.INSTALLED_APPS
+    with timings("wsgi.py"):
+        _instrument(timings)
+        from front_end.wsgi import application
+    with timings("urlconf"):
+        get_resolver().url_patterns
+
+    first_request_ms = None
+    requests = []
+    for url in paths:
+        request_start = time.perf_counter()
+        status = _get(application, url)
+        requests.append(
+            (
+                url,
+                status,
+                (time.perf_counter() - request_start) * 1000,
+                "registration.admin" in sys.modules,
+            )
+        )
+        if first_request_ms is None:
+            if started is None:
+                first_request_ms = (time.perf_counter() - start) * 1000
+            else:
+                first_request_ms = (time.time() - started) * 1000
+    from django.apps import apps
+
+    return {
+        "lazy": getattr(settings, "LAZY_STARTUP", False),
+        "apps": [app_config.name for app_config in apps.get_app_configs()],
+        "timings": timings,
+        "requests": requests,
+        "first_request_ms": first_request_ms,
+    }
+
+
+if __name__ == "__main__":
+    started = os.environ.get("STARTUP_STARTED")
+    result = profile(sys.argv[1:], float(started) if started else None)
+    print(json.dumps(result))
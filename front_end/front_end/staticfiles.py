@@ -0,0 +1,355 @@
+"""
+Static asset pipeline, run by ``manage.py build_static``.
+
+Third-party assets are vendored under static/vendor/ and checked against
+the Subresource Integrity hashes the CDNs published for them. The build
+compiles base.scss and writes two bundles and one font to static/build/:
+
+- app.css: Bootstrap, the Lato @font-face and base.css
+- app.js: jQuery and Bootstrap, with Popper bundled in
+- lato-latin-400.woff2: Lato subset to the Latin range Google Fonts serves
+
+``collectstatic`` then copies them to STATIC_ROOT under content-hashed
+names through CompressedManifestStaticFilesStorage, which also writes .gz
+and .br siblings of every compressible file. Pages need no third-party
+host, so they load offline.
+"""
+
+import base64
+import gzip
+import hashlib
+import importlib
+import os
+import posixpath
+import re
+import subprocess
+import urllib.request
+from collections import namedtuple
+from html.parser import HTMLParser
+from io import BytesIO
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    StaticFilesStorage,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(settings.BASE_DIR, "static")
+VENDOR_DIR = os.path.join(STATIC_DIR, "vendor")
+BUILD_DIR = os.path.join(STATIC_DIR, "build")
+
+Vendored = namedtuple("Vendored", "path url integrity")
+
+VENDOR = [
+    Vendored(
+        "bootstrap-4.3.1/bootstrap.min.css",
+        "https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css",
+        "sha384-ggOyR0iXCbMQv3Xipma34MD+dH/1fQ784/j6cY/iJTQUOhcWr7x9JvoRxT2MZw1T",
+    ),
+    Vendored(
+        "bootstrap-4.3.1/bootstrap.bundle.min.js",
+        "https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/js/bootstrap.bundle.min.js",
+        "sha384-xrRywqdh3PHs8keKZN+8zzc5TX0GRTLCcmivcbNJWm2rs5C8PRhcEn3czEjhAO9o",
+    ),
+    Vendored(
+        "jquery-3.3.1/jquery.min.js",
+        "https://code.jquery.com/jquery-3.3.1.min.js",
+        "sha384-tsQFqpEReu7ZLhBV2VZlAu7zcOV+rXbYlF2cqB8txI/8aZajjp4Bqd+V6D5IgvKT",
+    ),
+    # Lato 1.104, the version Google Fonts serves, as packaged by font-lato
+    Vendored(
+        "lato-1.104/Lato-Regular.ttf",
+        None,
+        "sha384-LN6g1uQJzUt/iP59aEao2T4nABxb4TmvXcrMRtemwHIwfggnCY9O6GsAZjvVfSvE",
+    ),
+]
+
+# The "latin" subset of Google Fonts
+LATIN = (
+    "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, "
+    "U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, "
+    "U+FEFF, U+FFFD"
+)
+
+CSS_BUNDLE = ["vendor/bootstrap-4.3.1/bootstrap.min.css", "@font-face", "base.scss"]
+JS_BUNDLE = [
+    "vendor/jquery-3.3.1/jquery.min.js",
+    "vendor/bootstrap-4.3.1/bootstrap.bundle.min.js",
+]
+FONT = "vendor/lato-1.104/Lato-Regular.ttf"
+FONT_FAMILY = "Lato"
+FONT_NAME = "lato-latin-400"
+
+# Extensions worth storing compressed; images other than SVG and fonts
+# other than TTF already are
+COMPRESSIBLE = (".css", ".js", ".svg", ".ttf", ".map", ".txt", ".html", ".json")
+
+SOURCE_MAP = re.compile(r"\n?(/\*# sourceMappingURL=.*?\*/|//# sourceMappingURL=.*)")
+CSS_URL = re.compile(r"""url\(\s*(['"]?)(.*?)\1\s*\)""")
+
+
+class VendorError(Exception):
+    pass
+
+
+def integrity(content):
+    """Return the sha384 Subresource Integrity hash of ``content``."""
+    digest = base64.b64encode(hashlib.sha384(content).digest()).decode()
+    return f"sha384-{digest}"
+
+
+def check_vendor(fetch=False, vendor_dir=VENDOR_DIR):
+    """
+    Check every vendored file in ``vendor_dir`` against its integrity hash,
+    downloading the missing or changed ones from their CDN first if
+    ``fetch`` is set.
+    Return the paths checked; raise VendorError for the first bad one.
+    """
+    checked = []
+    for asset in VENDOR:
+        path = os.path.join(vendor_dir, asset.path)
+        content = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                content = f.read()
+        if (
+            fetch
+            and asset.url
+            and (content is None or integrity(content) != asset.integrity)
+        ):
+            with urllib.request.urlopen(asset.url, timeout=30) as response:
+                content = response.read()
+            if integrity(content) == asset.integrity:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(content)
+        if content is None:
+            raise VendorError(f"{asset.path} is missing")
+        if integrity(content) != asset.integrity:
+            raise VendorError(f"{asset.path} doesn't match {asset.integrity}")
+        checked.append(path)
+    return checked
+
+
+# Sass and fontTools are imported by the build steps that use them: every
+# worker loads this module for the storage, and fontTools alone takes ~0.1s
+# to import
+def optional_import(name):
+    """Import and return the module ``name``, or None if it isn't installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def compile_scss(path):
+    """Compile the SCSS file ``path`` to minified CSS."""
+    sass = optional_import("sass")
+    if sass is not None:
+        return sass.compile(filename=path, output_style="compressed")
+    result = subprocess.run(
+        ["sass", "--style=compressed", "--no-source-map", path],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout
+
+
+def subset_font(path, unicodes=LATIN):
+    """
+    Return (content, format) of the font at ``path`` cut down to ``unicodes``,
+    as woff2 if brotli is installed and woff otherwise. Without fontTools the
+    font is returned whole.
+    """
+    font_subset = optional_import("fontTools.subset")
+    if font_subset is None:
+        with open(path, "rb") as f:
+            return f.read(), "truetype"
+    options = font_subset.Options()
+    options.flavor = "woff2" if brotli is not None else "woff"
+    font = font_subset.load_font(path, options)
+    subsetter = font_subset.Subsetter(options)
+    ranges = unicodes.replace("U+", "").replace(" ", "")
+    subsetter.populate(unicodes=font_subset.parse_unicodes(ranges))
+    subsetter.subset(font)
+    out = BytesIO()
+    font_subset.save_font(font, out, options)
+    return out.getvalue(), options.flavor
+
+
+def strip_source_map(content):
+    return SOURCE_MAP.sub("", content).strip()
+
+
+def font_face(family, url, font_format, unicodes=LATIN):
+    return (
+        f"@font-face{{font-family:'{family}';font-style:normal;font-weight:400;"
+        f"font-display:swap;src:url({url}) format('{font_format}');"
+        f"unicode-range:{unicodes}}}"
+    )
+
+
+def build(static_dir=STATIC_DIR, build_dir=BUILD_DIR):
+    """
+    Write app.css, app.js and the subset font to ``build_dir`` and return
+    {name: size in bytes} of the files written.
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    font, font_format = subset_font(os.path.join(static_dir, FONT))
+    extension = {"truetype": "ttf"}.get(font_format, font_format)
+    font_file = f"{FONT_NAME}.{extension}"
+
+    css = []
+    for source in CSS_BUNDLE:
+        if source == "@font-face":
+            css.append(font_face(FONT_FAMILY, font_file, font_format))
+        elif source.endswith(".scss"):
+            css.append(compile_scss(os.path.join(static_dir, source)))
+        else:
+            with open(os.path.join(static_dir, source), encoding="utf-8") as f:
+                css.append(f.read())
+    js = []
+    for source in JS_BUNDLE:
+        with open(os.path.join(static_dir, source), encoding="utf-8") as f:
+            js.append(f.read())
+
+    files = {
+        "app.css": "\n".join(strip_source_map(part) for part in css).encode(),
+        # Separated so a bundle missing its trailing semicolon can't run on
+        "app.js": ";\n".join(strip_source_map(part) for part in js).encode(),
+        font_file: font,
+    }
+    for name, content in files.items():
+        with open(os.path.join(build_dir, name), "wb") as f:
+            f.write(content)
+    return {name: len(content) for name, content in files.items()}
+
+
+def compress(content):
+    """Return {extension: compressed content} for the available encoders."""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes .gz and .br siblings of the hashed
+    files, where compressing them saves space.
+
+    Without a manifest, e.g. before the first collectstatic or in tests,
+    URLs are those of StaticFilesStorage.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # hashed_files maps every collected name to its final hashed name
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                self.write_compressed(name)
+
+    def write_compressed(self, name):
+        with self.open(name) as f:
+            content = f.read()
+        for extension, compressed in compress(content).items():
+            if len(compressed) >= len(content):
+                continue
+            path = self.path(name + extension)
+            with open(path, "wb") as f:
+                f.write(compressed)
+
+    def url(self, name, force=False):
+        if not self.hashed_files:
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force)
+
+
+class _AssetParser(HTMLParser):
+    """Collect the URLs a page loads stylesheets, scripts and images from."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "link" and "stylesheet" in (attrs.get("rel") or "").split():
+            self.urls.append(attrs.get("href"))
+        elif tag in ("script", "img") and attrs.get("src"):
+            self.urls.append(attrs["src"])
+
+
+def _static_path(url):
+    """Return the local file behind a static URL, or None."""
+    path = unquote(urlsplit(url).path)
+    if not path.startswith(settings.STATIC_URL):
+        return None
+    name = path[len(settings.STATIC_URL) :]
+    root = settings.STATIC_ROOT
+    if root and os.path.exists(os.path.join(root, name)):
+        return os.path.join(root, name)
+    return finders.find(name)
+
+
+def page_assets(html):
+    """
+    Return the URLs ``html`` loads, in order, including those the local
+    stylesheets reference with url().
+    """
+    parser = _AssetParser()
+    parser.feed(html)
+    urls = []
+    for url in parser.urls:
+        urls.append(url)
+        path = _static_path(url) if url.endswith(".css") else None
+        if path is None:
+            continue
+        with open(path, encoding="utf-8") as f:
+            css = f.read()
+        base = posixpath.dirname(urlsplit(url).path) + "/"
+        for _, ref in CSS_URL.findall(css):
+            if ref.startswith(("data:", "#")):
+                continue
+            urls.append(posixpath.normpath(posixpath.join(base, urlsplit(ref).path)))
+    return list(dict.fromkeys(urls))
+
+
+AssetWeight = namedtuple("AssetWeight", "url raw gzip brotli")
+
+
+def weigh(url, content):
+    """
+    Return the AssetWeight of ``content``. Compressed sizes are those of the
+    smaller of each encoding and no encoding, as the storage would serve.
+    """
+    variants = compress(content)
+    gzipped = min(len(content), len(variants[".gz"]))
+    brotlied = min(len(content), len(variants.get(".br", content)))
+    return AssetWeight(url, len(content), gzipped, brotlied)
+
+
+def page_weight(html):
+    """
+    Return an AssetWeight for every asset ``html`` loads. Sizes of assets
+    that aren't local static files are None.
+    """
+    weights = []
+    for url in page_assets(html):
+        path = _static_path(url) if not urlsplit(url).netloc else None
+        if path is None:
+            weights.append(AssetWeight(url, None, None, None))
+            continue
+        with open(path, "rb") as f:
+            weights.append(weigh(url, f.read()))
+    return weights
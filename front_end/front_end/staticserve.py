@@ -0,0 +1,285 @@
+"""
+Serve the collected static files from STATIC_ROOT in production.
+
+STATIC_ROOT is indexed once, when the middleware is created, so a request
+for a static file is a dict lookup: no URL resolving, no other middleware
+and no filesystem access besides opening the file. Full responses are
+FileResponses, which WSGI servers with wsgi.file_wrapper (e.g. gunicorn)
+send with sendfile().
+
+- The .br or .gz sibling written by ``manage.py build_static`` is sent
+  when Accept-Encoding allows it.
+- Every representation has an ETag, so If-None-Match gets a 304.
+- A single byte range of the uncompressed file gets a 206.
+- Hashed names from the manifest are cached for a year as immutable, the
+  rest for STATIC_MAX_AGE seconds.
+- Files under an archive/ directory are never served.
+
+The middleware goes first in MIDDLEWARE and is off unless STATIC_SERVE is
+set. With DEBUG on, runserver serves static files itself.
+"""
+import asyncio
+import mimetypes
+import os
+import re
+from collections import namedtuple
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.decorators import sync_and_async_middleware
+
+# Not known to the mimetypes module of older Pythons
+mimetypes.add_type("font/woff2", ".woff2")
+
+# Accept-Encoding name -> file extension, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+# Source files kept next to the assets they were exported to
+PRIVATE_DIRS = {"archive"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+BLOCK_SIZE = 64 * 1024
+
+Representation = namedtuple("Representation", "path size etag")
+StaticFile = namedtuple("StaticFile", "content_type cache_control representations")
+
+
+def _etag(stat, encoding=None):
+    tag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def _content_type(name):
+    content_type, _ = mimetypes.guess_type(name)
+    if content_type is None:
+        return "application/octet-stream"
+    if content_type.startswith("text/") or content_type in (
+        "application/javascript",
+        "application/json",
+        "image/svg+xml",
+    ):
+        return f"{content_type}; charset=utf-8"
+    return content_type
+
+
+def index_files(root, immutable=(), max_age=60, exclude=()):
+    """
+    Return {name: StaticFile} for the files under ``root``, except the names
+    in ``exclude``. Names in ``immutable`` are cached for a year, the rest
+    for ``max_age`` seconds.
+    """
+    immutable = set(immutable)
+    files = {}
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in PRIVATE_DIRS]
+        names = set(names)
+        for file in names:
+            original, extension = os.path.splitext(file)
+            if extension in ENCODINGS.values() and original in names:
+                continue
+            path = os.path.join(directory, file)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            if name in exclude:
+                continue
+            stat = os.stat(path)
+            representations = {None: Representation(path, stat.st_size, _etag(stat))}
+            for encoding, extension in ENCODINGS.items():
+                if file + extension in names:
+                    variant = os.stat(path + extension)
+                    representations[encoding] = Representation(
+                        path + extension, variant.st_size, _etag(variant, encoding)
+                    )
+            if name in immutable:
+                cache_control = IMMUTABLE
+            else:
+                cache_control = f"public, max-age={max_age}"
+            files[name] = StaticFile(
+                _content_type(name), cache_control, representations
+            )
+    return files
+
+
+def accepted_encodings(header):
+    """Return the content codings an Accept-Encoding header allows."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def _etag_matches(header, etag):
+    # If-None-Match uses the weak comparison
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in tags
+    )
+
+
+def byte_range(header, size):
+    """
+    Return (start, end) of the single range in a Range header, None if the
+    header doesn't ask for one, or False if it can't be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # The last ``last`` bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve(request, static_file):
+    """Return the response to a request for ``static_file``."""
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    representations = static_file.representations
+    identity = representations[None]
+
+    selected = byte_range(request.META.get("HTTP_RANGE", ""), identity.size)
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if selected is not None and if_range and if_range != identity.etag:
+        selected = None
+
+    encoding = None
+    if selected is None and len(representations) > 1:
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        encoding = next(
+            (e for e in ENCODINGS if e in representations and e in accepted), None
+        )
+    representation = representations[encoding]
+
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and _etag_matches(if_none_match, representation.etag):
+        response = HttpResponseNotModified()
+    elif selected is False:
+        response = HttpResponse(status=416, content_type=static_file.content_type)
+        response["Content-Range"] = f"bytes */{identity.size}"
+    elif selected:
+        start, end = selected
+        length = end - start + 1
+        if request.method == "HEAD":
+            response = HttpResponse(status=206)
+        else:
+            response = StreamingHttpResponse(
+                _read_range(identity.path, start, length), status=206
+            )
+        response["Content-Range"] = f"bytes {start}-{end}/{identity.size}"
+        response["Content-Length"] = str(length)
+    else:
+        if request.method == "HEAD":
+            response = HttpResponse()
+        else:
+            response = FileResponse(open(representation.path, "rb"))
+            # Fewer reads where the server can't use sendfile()
+            response.block_size = BLOCK_SIZE
+            # FileResponse names the file, which could be the .br or .gz
+            del response["Content-Disposition"]
+        response["Content-Length"] = str(representation.size)
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    if response.status_code != 416:
+        response["ETag"] = representation.etag
+    if response.status_code in (200, 206, 304):
+        response["Cache-Control"] = static_file.cache_control
+    if response.status_code != 304:
+        response["Content-Type"] = static_file.content_type
+    response["Accept-Ranges"] = "bytes"
+    if len(representations) > 1:
+        response["Vary"] = "Accept-Encoding"
+    return response
+
+
+def not_found():
+    return HttpResponse("Not found.", content_type="text/plain", status=404)
+
+
+@sync_and_async_middleware
+def static_files_middleware(get_response):
+    """
+    Answer requests under STATIC_URL from the files in STATIC_ROOT, when
+    STATIC_SERVE is on.
+    """
+    if not getattr(settings, "STATIC_SERVE", False):
+        raise MiddlewareNotUsed
+    prefix = settings.STATIC_URL
+    if not settings.STATIC_ROOT or not prefix.startswith("/"):
+        # Nothing collected, or static files live on another host
+        raise MiddlewareNotUsed
+    files = index_files(
+        settings.STATIC_ROOT,
+        immutable=getattr(staticfiles_storage, "hashed_files", {}).values(),
+        max_age=getattr(settings, "STATIC_MAX_AGE", 60),
+        exclude={getattr(staticfiles_storage, "manifest_name", None)},
+    )
+
+    def static_response(request):
+        if not request.path.startswith(prefix):
+            return None
+        static_file = files.get(unquote(request.path[len(prefix) :]))
+        if static_file is None:
+            return not_found()
+        return serve(request, static_file)
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            response = static_response(request)
+            if response is None:
+                response = await get_response(request)
+            return response
+
+    else:
+
+        def middleware(request):
+            response = static_response(request)
+            if response is None:
+                response = get_response(request)
+            return response
+
+    return middleware
@@ -0,0 +1,285 @@
+"""
+Template loaders for the TEMPLATE_MODE setting, and per-template timings.
+
+- "debug" reads and parses a template every time it's used, so edits show
+  up straight away.
+- "cached" parses each template once per process. CachedLoader.warm() (run
+  by wsgi.py and asgi.py) parses the whole tree at startup, so no request
+  pays for it or touches the template directories.
+- "bundle" is "cached" reading from a module written by
+  ``manage.py build_template_bundle`` instead of the template directories.
+
+Parsed templates are plain Python objects that can't be written out, so the
+bundle holds the sources of every template, in the order Django would find
+them. Importing it is one read of a .pyc rather than a lookup per template
+per directory.
+
+Every render is timed. template_timings() returns totals per template for
+this process, and template_timing_middleware reports a request's timings in
+a Server-Timing header when TEMPLATE_TIMING_HEADER is on.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template import (
+    Origin,
+    Template,
+    TemplateDoesNotExist,
+    TemplateSyntaxError,
+    engines,
+)
+from django.template.loaders import app_directories, base, cached, filesystem
+from django.template.utils import get_app_template_dirs
+from django.utils.decorators import sync_and_async_middleware
+
+from front_end import metrics
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Template name -> [renders, seconds] for this process
+_totals = {}
+# Template name -> seconds for the current request, if it's being timed
+_request_timings = contextvars.ContextVar("request_template_timings", default=None)
+
+
+def _record(name, seconds):
+    with _lock:
+        totals = _totals.setdefault(name, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def template_timings():
+    """
+    Return {template name: (renders, total seconds)} since the last reset.
+    A template's time includes the templates it extends and includes.
+    """
+    with _lock:
+        return {name: tuple(totals) for name, totals in _totals.items()}
+
+
+def reset_template_timings():
+    with _lock:
+        _totals.clear()
+
+
+class TimedTemplate(Template):
+    def _render(self, context):
+        start = time.perf_counter()
+        try:
+            with metrics.timed("template"):
+                return super()._render(context)
+        finally:
+            _record(self.name, time.perf_counter() - start)
+
+
+class TimedLoader(base.Loader):
+    """
+    Load templates as TimedTemplate. Listed after Django's loader classes in
+    the loaders below, so it sits under them in the MRO.
+    """
+
+    def get_template(self, template_name, skip=None):
+        tried = []
+        for origin in self.get_template_sources(template_name):
+            if skip is not None and origin in skip:
+                tried.append((origin, "Skipped"))
+                continue
+            try:
+                contents = self.get_contents(origin)
+            except TemplateDoesNotExist:
+                tried.append((origin, "Source does not exist"))
+                continue
+            return TimedTemplate(contents, origin, origin.template_name, self.engine)
+        raise TemplateDoesNotExist(template_name, tried=tried)
+
+
+def _walk(template_dir):
+    """Yield (template name, path) for every file under ``template_dir``."""
+    for root, dirs, files in os.walk(template_dir):
+        dirs.sort()
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            yield os.path.relpath(path, template_dir).replace(os.sep, "/"), path
+
+
+class DirectoryTemplatesMixin:
+    def template_names(self):
+        """Yield the name of every file in the loader's directories."""
+        for template_dir in self.get_dirs():
+            for name, _ in _walk(template_dir):
+                yield name
+
+
+class FilesystemLoader(DirectoryTemplatesMixin, filesystem.Loader, TimedLoader):
+    pass
+
+
+class AppDirectoriesLoader(
+    DirectoryTemplatesMixin, app_directories.Loader, TimedLoader
+):
+    pass
+
+
+def template_sources(dirs, charset="utf-8"):
+    """
+    Return {name: [source, ...]} for every template in ``dirs``, with the
+    sources of each name in the order of ``dirs``.
+    """
+    sources = {}
+    for template_dir in dirs:
+        for name, path in _walk(template_dir):
+            try:
+                with open(path, encoding=charset) as f:
+                    source = f.read()
+            except UnicodeDecodeError:
+                continue
+            sources.setdefault(name, []).append(source)
+    return sources
+
+
+def write_bundle(path, dirs, charset="utf-8"):
+    """
+    Write the templates in ``dirs`` to ``path`` as a bundle module and
+    return the number of template names in it.
+    """
+    sources = template_sources(dirs, charset)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Generated by `manage.py build_template_bundle`, don't edit.\n")
+        f.write("TEMPLATES = {\n")
+        for name in sorted(sources):
+            f.write(f"    {name!r}: {sources[name]!r},\n")
+        f.write("}\n")
+    return len(sources)
+
+
+def bundle_dirs(engine):
+    """The directories an engine's bundle is built from, in lookup order."""
+    dirs = list(engine.dirs)
+    dirs.extend(get_app_template_dirs("templates"))
+    return dirs
+
+
+class BundleLoader(TimedLoader):
+    """
+    Load templates from the bundle module named by ``module`` (the
+    TEMPLATE_BUNDLE setting by default).
+    """
+
+    def __init__(self, engine, module=None):
+        super().__init__(engine)
+        self.module = module or settings.TEMPLATE_BUNDLE
+        self.templates = import_module(self.module).TEMPLATES
+
+    def get_template_sources(self, template_name):
+        # One origin per directory the template was found in, so templates
+        # that extend one of the same name still resolve
+        for index in range(len(self.templates.get(template_name, ()))):
+            yield Origin(
+                name=f"{self.module}:{index}:{template_name}",
+                template_name=template_name,
+                loader=self,
+            )
+
+    def get_contents(self, origin):
+        index = int(origin.name.split(":", 2)[1])
+        return self.templates[origin.template_name][index]
+
+    def template_names(self):
+        return iter(self.templates)
+
+
+class CachedLoader(cached.Loader, TimedLoader):
+    def warm(self, exclude=()):
+        """
+        Parse and cache every template the child loaders can list, except
+        names starting with one of ``exclude``. Return the number of
+        templates cached.
+        """
+        names = {}
+        for loader in self.loaders:
+            if hasattr(loader, "template_names"):
+                names.update(dict.fromkeys(loader.template_names()))
+        count = 0
+        for name in names:
+            if name.startswith(tuple(exclude)):
+                continue
+            try:
+                self.get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist) as e:
+                # Not every file in a template directory is a template
+                logger.debug("Not caching template %s: %s", name, e)
+            else:
+                count += 1
+        return count
+
+
+def warm_templates():
+    """
+    Warm every CachedLoader of the configured Django template engines and
+    return the number of templates cached. With LAZY_STARTUP on, the admin's
+    templates are left to its first request, like the rest of the admin.
+    """
+    exclude = ("admin/",) if getattr(settings, "LAZY_STARTUP", False) else ()
+    count = 0
+    for engine in engines.all():
+        # Only the Django backend wraps an Engine with loaders
+        loaders = getattr(getattr(engine, "engine", None), "template_loaders", ())
+        for loader in loaders:
+            if isinstance(loader, CachedLoader):
+                count += loader.warm(exclude)
+    return count
+
+
+def _server_timing(response, timings):
+    if timings:
+        response["Server-Timing"] = ", ".join(
+            f'tpl{index};desc="{name}";dur={seconds * 1000:.2f}'
+            for index, (name, seconds) in enumerate(timings.items())
+        )
+    return response
+
+
+@sync_and_async_middleware
+def template_timing_middleware(get_response):
+    """
+    Add a Server-Timing header with the render time of each template used
+    by the request, when TEMPLATE_TIMING_HEADER is on.
+    """
+    if not getattr(settings, "TEMPLATE_TIMING_HEADER", False):
+        raise MiddlewareNotUsed
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            timings = {}
+            token = _request_timings.set(timings)
+            try:
+                response = await get_response(request)
+            finally:
+                _request_timings.reset(token)
+            return _server_timing(response, timings)
+
+    else:
+
+        def middleware(request):
+            timings = {}
+            token = _request_timings.set(timings)
+            try:
+                response = get_response(request)
+            finally:
+                _request_timings.reset(token)
+            return _server_timing(response, timings)
+
+    return middleware
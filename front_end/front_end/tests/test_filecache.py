@@ -0,0 +1,32 @@
+import tempfile
+
+from django.test import SimpleTestCase
+
+from front_end.filecache import FileBasedCache
+
+
+class TestFileBasedCache(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = FileBasedCache(
+            directory.name,
+            {"OPTIONS": {"MAX_ENTRIES": 4, "CULL_FREQUENCY": 2, "CULL_EVERY": 5}},
+        )
+
+    def entries(self):
+        return len(self.cache._list_cache_files())
+
+    def test_culls_every_few_sets(self):
+        for i in range(4):
+            self.cache.set(f"key{i}", i)
+        self.assertEqual(self.entries(), 4)
+        # The fifth set finds four entries and halves them first
+        self.cache.set("key4", 4)
+        self.assertEqual(self.entries(), 3)
+        for i in range(5, 9):
+            self.cache.set(f"key{i}", i)
+        self.assertEqual(self.entries(), 7)
+        self.cache.set("key9", 9)
+        self.assertEqual(self.entries(), 5)
+        self.assertEqual(self.cache.get("key9"), 9)
@@ -0,0 +1,163 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    AsyncClient,
+    Client,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from front_end import metrics
+from registration.tests.utils import FreshRateLimitsMixin
+
+
+class TestRequestMetrics(SimpleTestCase):
+    def test_histogram(self):
+        histogram = metrics.Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(0.1, 2), (1, 3), ("+Inf", 4)])
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+    def test_nothing_recorded_outside_sampled_requests(self):
+        with metrics.timed("template"):
+            metrics.count("cache_hits")
+        self.assertIsNone(metrics.current())
+
+    def test_nested_blocks_are_timed_once(self):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics._current.set(request_metrics)
+        self.addCleanup(metrics._current.reset, token)
+        with mock.patch(
+            "front_end.metrics.time.perf_counter", side_effect=[0, 1, 1, 3]
+        ):
+            with metrics.timed("template"):
+                with metrics.timed("template"):
+                    with metrics.timed("hash"):
+                        pass
+        self.assertEqual(request_metrics.seconds["template"], 3)
+        self.assertEqual(request_metrics.seconds["hash"], 0)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1, METRICS_SERVER_TIMING=True)
+class TestMetricsMiddleware(FreshRateLimitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "metrics@example.com"
+        cls.password = "abcd12efgh"
+        get_user_model().objects.create_user(email=cls.email, password=cls.password)
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset_metrics()
+        self.measured = []
+        metrics.request_measured.connect(self.receiver)
+        self.addCleanup(metrics.request_measured.disconnect, self.receiver)
+
+    def receiver(self, view, metrics, **kwargs):
+        self.measured.append((view, metrics))
+
+    def get(self, path):
+        # A new client, so its middleware is loaded with the current settings
+        return Client().get(path)
+
+    def test_signin(self):
+        response = self.client.get(reverse("registration:login"))
+        self.assertIn("total;dur=", response["Server-Timing"])
+        ((view, get),) = self.measured
+        self.assertEqual(view, "registration:login")
+        self.assertGreater(get.seconds["template"], 0)
+        self.assertEqual(get.seconds["hash"], 0)
+
+        self.client.post(
+            reverse("registration:login"),
+            {"username": self.email, "password": self.password},
+        )
+        _, post = self.measured[1]
+        self.assertGreater(post.seconds["hash"], 0)
+        self.assertGreater(post.counts["db_queries"], 0)
+        self.assertGreater(post.seconds["db"], 0)
+
+        self.client.get(reverse("home"))
+        view, home = self.measured[2]
+        self.assertEqual(view, "home")
+        self.assertGreater(home.counts["cache_hits"], 0)
+
+    def test_server_timing(self):
+        with override_settings(TEMPLATE_TIMING_HEADER=True):
+            response = self.get(reverse("registration:login"))
+        timing = response["Server-Timing"]
+        # The template timings come first
+        self.assertTrue(timing.startswith("tpl0;"))
+        for entry in ("total;dur=", "db;dur=", "tpl;dur=", "hash;dur=", "sql;"):
+            self.assertIn(entry, timing)
+        self.assertIn('cache;desc="0 hit(s), 0 miss(es)"', timing)
+
+        with override_settings(METRICS_SERVER_TIMING=False):
+            response = self.get(reverse("registration:login"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(len(self.measured), 2)
+
+    def test_sampling(self):
+        with override_settings(METRICS_SAMPLE_RATE=0):
+            response = self.get(reverse("registration:login"))
+        self.assertNotIn("Server-Timing", response)
+        with override_settings(METRICS_SAMPLE_RATE=0.5):
+            for value in (0.4, 0.6):
+                with mock.patch("front_end.metrics.random.random", return_value=value):
+                    self.get(reverse("registration:login"))
+        self.assertEqual(len(self.measured), 1)
+
+    @override_settings(ROOT_URLCONF="front_end.asgi_urls")
+    async def test_async(self):
+        response = await AsyncClient().get(reverse("registration:login"))
+        self.assertIn("tpl;dur=", response["Server-Timing"])
+        ((view, get),) = self.measured
+        self.assertEqual(view, "registration:login")
+        self.assertGreater(get.seconds["template"], 0)
+
+    def test_metrics_view(self):
+        self.client.get(reverse("registration:login"))
+        self.client.get("/not-a-page/")
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(
+            response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8"
+        )
+        text = response.content.decode()
+        self.assertIn("front_end_metrics_sample_rate 1\n", text)
+        self.assertIn("# TYPE front_end_request_duration_seconds histogram\n", text)
+        self.assertIn(
+            'front_end_request_duration_seconds_bucket{view="registration:login",'
+            'le="+Inf"} 1\n',
+            text,
+        )
+        self.assertIn(
+            'front_end_request_template_seconds_count{view="<unresolved>"} 1\n', text
+        )
+        self.assertIn(
+            'front_end_request_db_queries_total{view="registration:login"}', text
+        )
+
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="192.0.2.1")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TRUSTED_PROXIES=["127.0.0.1"])
+    def test_metrics_behind_a_proxy(self):
+        response = self.client.get(reverse("metrics"), HTTP_X_FORWARDED_FOR="192.0.2.1")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="scrape-me", METRICS_ALLOWED_IPS=[])
+    def test_metrics_token(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Metrics wrong")
+        self.assertEqual(response.status_code, 404)
+        # Not an API client's bearer token
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer scrape-me")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Metrics scrape-me")
+        self.assertEqual(response.status_code, 200)
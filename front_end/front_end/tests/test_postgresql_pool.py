@@ -0,0 +1,102 @@
+import threading
+import time
+
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from front_end.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class TestConnectionPool(SimpleTestCase):
+    def setUp(self):
+        self.conn_params = connection.get_connection_params()
+        self.pool = ConnectionPool(
+            lambda: psycopg2.connect(**self.conn_params),
+            {"MIN_SIZE": 1, "MAX_SIZE": 2, "TIMEOUT": 0.1},
+        )
+
+    def tearDown(self):
+        self.pool.close_all()
+
+    def test_connection_reused(self):
+        first = self.pool.getconn()
+        self.pool.putconn(first)
+        second = self.pool.getconn()
+        self.assertIs(first, second)
+        self.pool.putconn(second)
+        stats = self.pool.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["idle"], 1)
+
+    def test_max_size_timeout(self):
+        connections = [self.pool.getconn(), self.pool.getconn()]
+        with self.assertRaises(PoolTimeout):
+            self.pool.getconn()
+        stats = self.pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["in_use"], 2)
+        for conn in connections:
+            self.pool.putconn(conn)
+
+    def test_waiting_checkout(self):
+        self.pool.timeout = 1
+        connections = [self.pool.getconn(), self.pool.getconn()]
+        # Hand one back shortly after the third checkout starts waiting
+        threading.Timer(0.05, self.pool.putconn, [connections.pop()]).start()
+        conn = self.pool.getconn()
+        stats = self.pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_time_max"], 0)
+        self.pool.putconn(conn)
+        self.pool.putconn(connections.pop())
+
+    def test_open_transaction_rolled_back(self):
+        conn = self.pool.getconn()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.pool.putconn(conn)
+        self.assertEqual(
+            conn.info.transaction_status, psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+
+    def test_closed_connection_discarded(self):
+        conn = self.pool.getconn()
+        conn.close()
+        self.pool.putconn(conn)
+        self.assertEqual(self.pool.stats()["size"], 0)
+        self.assertIsNot(self.pool.getconn(), conn)
+
+    def test_expired_connection_discarded(self):
+        self.pool.max_lifetime = 0
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+        self.assertEqual(self.pool.stats()["connections_closed"], 1)
+
+    def test_health_check(self):
+        self.pool.check_interval = 0
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+        # Kill the session behind the pool's back
+        with psycopg2.connect(**self.conn_params) as killer:
+            with killer.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_terminate_backend(%s)", [conn.get_backend_pid()]
+                )
+        killer.close()
+        time.sleep(0.05)
+
+        healthy = self.pool.getconn()
+        self.assertFalse(healthy.closed)
+        self.assertEqual(self.pool.stats()["health_check_failures"], 1)
+        self.pool.putconn(healthy)
+
+
+class TestPooledDatabaseWrapper(TestCase):
+    def test_wrapper_uses_pool(self):
+        self.assertIsNotNone(connection.pool)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+        self.assertGreaterEqual(connection.pool.stats()["checkouts"], 1)
@@ -0,0 +1,82 @@
+import argparse
+import io
+import unittest
+
+from django.test import SimpleTestCase, tag
+
+from front_end.runner import (
+    TestRunner,
+    TimedParallelTestSuite,
+    TimedTextTestResult,
+    is_serial,
+    worker_caches,
+)
+
+
+class Example(unittest.TestCase):
+    def test_one(self):
+        pass
+
+    @tag("serial")
+    def test_serial(self):
+        pass
+
+
+@tag("serial")
+class SerialExample(unittest.TestCase):
+    def test_one(self):
+        pass
+
+
+class TestTestRunner(SimpleTestCase):
+    def parse(self, *args):
+        parser = argparse.ArgumentParser()
+        TestRunner.add_arguments(parser)
+        return vars(parser.parse_args(args))
+
+    def test_defaults(self):
+        options = self.parse()
+        self.assertTrue(options["keepdb"])
+        self.assertEqual(options["slowest"], 10)
+        self.assertGreaterEqual(TestRunner(**options).parallel, 1)
+        self.assertFalse(self.parse("--no-keepdb")["keepdb"])
+        self.assertEqual(TestRunner(**self.parse("--parallel", "3")).parallel, 3)
+        self.assertEqual(TestRunner(**self.parse("--pdb")).parallel, 1)
+
+    def test_worker_caches(self):
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "users": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/cache/users",
+            },
+        }
+        self.assertEqual(
+            worker_caches(caches, 2),
+            {
+                "default": caches["default"],
+                "users": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": "/tmp/cache/users/worker-2",
+                },
+            },
+        )
+
+    def test_serial_tests_stay_in_this_process(self):
+        self.assertFalse(is_serial(Example("test_one")))
+        self.assertTrue(is_serial(Example("test_serial")))
+        self.assertTrue(is_serial(SerialExample("test_one")))
+
+        tests = [Example("test_one"), Example("test_serial"), SerialExample("test_one")]
+        suite = TimedParallelTestSuite(unittest.TestSuite(tests), processes=2)
+        self.assertEqual(list(suite.serial_suite), tests[1:])
+        self.assertEqual([list(subsuite) for subsuite in suite.subsuites], [tests[:1]])
+
+    def test_timed_result(self):
+        result = TimedTextTestResult(io.StringIO(), True, 0)
+        unittest.TestSuite([Example("test_one")]).run(result)
+        test_id = Example("test_one").id()
+        self.assertEqual(list(result.test_times), [test_id])
+        # The time a parallel worker reports replaces the replayed one
+        result.addTestTime(Example("test_one"), 1.5)
+        self.assertEqual(result.test_times[test_id], 1.5)
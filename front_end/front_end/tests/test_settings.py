@@ -0,0 +1,95 @@
+import importlib
+import os
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from front_end.settings import configure
+
+TOOLBAR = "debug_toolbar.middleware.DebugToolbarMiddleware"
+DEBUG_PROCESSOR = "django.template.context_processors.debug"
+
+
+def load(profile, **environ):
+    """Import the ``profile`` settings module afresh with ``environ``."""
+    with mock.patch.dict(os.environ, environ):
+        module = importlib.import_module(f"front_end.settings.{profile}")
+        return importlib.reload(module)
+
+
+class TestProfiles(SimpleTestCase):
+    def context_processors(self, settings):
+        return settings.TEMPLATES[0]["OPTIONS"]["context_processors"]
+
+    def test_dev(self):
+        dev = load("dev")
+        self.assertTrue(dev.DEBUG)
+        self.assertIn("debug_toolbar", dev.INSTALLED_APPS)
+        self.assertEqual(dev.MIDDLEWARE[-1], TOOLBAR)
+        self.assertIn(DEBUG_PROCESSOR, self.context_processors(dev))
+        self.assertFalse(dev.STATIC_SERVE)
+
+    def test_prod(self):
+        prod = load("prod", SECRET_KEY="from-the-environment")
+        self.assertFalse(prod.DEBUG)
+        self.assertEqual(prod.SECRET_KEY, "from-the-environment")
+        self.assertNotIn("debug_toolbar", prod.INSTALLED_APPS)
+        self.assertNotIn(TOOLBAR, prod.MIDDLEWARE)
+        self.assertNotIn(DEBUG_PROCESSOR, self.context_processors(prod))
+        self.assertEqual(
+            prod.MIDDLEWARE[0], "front_end.staticserve.static_files_middleware"
+        )
+        self.assertTrue(prod.STATIC_SERVE)
+        self.assertEqual(prod.METRICS_ALLOWED_IPS, [])
+        self.assertEqual(
+            prod.TEMPLATES[0]["OPTIONS"]["loaders"][0][0],
+            "front_end.templating.CachedLoader",
+        )
+
+    def test_prod_needs_secret_key(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("SECRET_KEY", None)
+            with self.assertRaisesMessage(ImproperlyConfigured, "SECRET_KEY"):
+                load("prod")
+
+    def test_test_caches_are_the_runs_own(self):
+        from django.conf import settings
+
+        for alias, config in settings.CACHES.items():
+            if config["BACKEND"].endswith(".FileBasedCache"):
+                self.assertTrue(
+                    str(config["LOCATION"]).startswith(settings.TEST_CACHE_DIR),
+                    alias,
+                )
+
+    def test_middleware_order(self):
+        middleware = load("prod", SECRET_KEY="x").MIDDLEWARE
+        self.assertLess(
+            middleware.index("django.middleware.common.CommonMiddleware"),
+            middleware.index("django.contrib.sessions.middleware.SessionMiddleware"),
+        )
+        self.assertLess(
+            middleware.index("registration.middleware.TokenAuthenticationMiddleware"),
+            middleware.index("django.contrib.sessions.middleware.SessionMiddleware"),
+        )
+
+    def test_configure(self):
+        with mock.patch.dict(os.environ, {"SETTINGS_PROFILE": "prod"}):
+            os.environ.pop("DJANGO_SETTINGS_MODULE")
+            configure()
+            self.assertEqual(
+                os.environ["DJANGO_SETTINGS_MODULE"], "front_end.settings.prod"
+            )
+        with mock.patch.dict(os.environ):
+            os.environ.pop("SETTINGS_PROFILE", None)
+            os.environ.pop("DJANGO_SETTINGS_MODULE")
+            configure(default="test")
+            self.assertEqual(
+                os.environ["DJANGO_SETTINGS_MODULE"], "front_end.settings.test"
+            )
+
+    def test_configure_unknown_profile(self):
+        with mock.patch.dict(os.environ, {"SETTINGS_PROFILE": "staging"}):
+            with self.assertRaisesMessage(ImproperlyConfigured, "'staging'"):
+                configure()
@@ -0,0 +1,131 @@
+import io
+
+from django.contrib import admin
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import URLResolver, path, resolve, reverse
+from django.urls.resolvers import RoutePattern
+
+from front_end.apps import check_admin_app
+from front_end.startup import (
+    LazyURLResolver,
+    import_owner,
+    imports_by_package,
+    lazy_path,
+    parse_importtime,
+)
+from registration.models import User
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   registration.changelist
+import time:      1500 |       1620 | registration.admin
+import time:        80 |         80 |     django.contrib.admin.helpers
+import time:      2000 |       2080 |   django.contrib.admin
+import time:       400 |       2480 | django.contrib
+Not an import
+"""
+
+
+def page(request):
+    return HttpResponse()
+
+
+class URLconf:
+    def __init__(self, urlpatterns):
+        self.urlpatterns = urlpatterns
+
+
+class TestLazyURLResolver(SimpleTestCase):
+    def setUp(self):
+        self.lazy = LazyURLResolver(
+            RoutePattern("lazy-admin/", is_endpoint=False),
+            "front_end.admin_urls",
+            app_name="admin",
+            namespace="admin",
+        )
+        self.urlconf = URLconf([path("page/", page, name="page"), self.lazy])
+
+    def imported(self):
+        return "urlconf_module" in self.lazy.__dict__
+
+    def test_other_urls_dont_import(self):
+        self.assertEqual(reverse("page", urlconf=self.urlconf), "/page/")
+        self.assertEqual(resolve("/page/", urlconf=self.urlconf).url_name, "page")
+        self.assertFalse(self.imported())
+
+    def test_reverse_imports(self):
+        reverse("page", urlconf=self.urlconf)
+        self.assertEqual(reverse("admin:index", urlconf=self.urlconf), "/lazy-admin/")
+        self.assertTrue(self.imported())
+
+    def test_resolve_imports(self):
+        match = resolve("/lazy-admin/", urlconf=self.urlconf)
+        self.assertEqual(match.view_name, "admin:index")
+        self.assertTrue(self.imported())
+
+    def test_lazy_path(self):
+        with override_settings(LAZY_STARTUP=True):
+            self.assertIsInstance(
+                lazy_path("admin/", "front_end.admin_urls", "admin"),
+                LazyURLResolver,
+            )
+        with override_settings(LAZY_STARTUP=False):
+            resolver = lazy_path("admin/", "front_end.admin_urls", "admin")
+        self.assertNotIsInstance(resolver, LazyURLResolver)
+        self.assertIsInstance(resolver, URLResolver)
+        self.assertEqual(resolver.namespace, "admin")
+
+    def test_admin_checks_register_model_admins(self):
+        self.assertIsInstance(check_admin_app(None), list)
+        self.assertTrue(admin.site.is_registered(User))
+
+
+class TestImportTimes(SimpleTestCase):
+    def test_parse_importtime(self):
+        self.assertEqual(
+            parse_importtime(IMPORTTIME),
+            [
+                ("registration.changelist", 120, 120),
+                ("registration.admin", 1500, 1620),
+                ("django.contrib.admin.helpers", 80, 80),
+                ("django.contrib.admin", 2000, 2080),
+                ("django.contrib", 400, 2480),
+            ],
+        )
+
+    def test_import_owner(self):
+        apps = ["django.contrib.admin", "registration"]
+        self.assertEqual(
+            import_owner("django.contrib.admin.helpers", apps), "django.contrib.admin"
+        )
+        self.assertEqual(import_owner("django.contrib.adminx", apps), "django")
+        self.assertEqual(import_owner("registration", apps), "registration")
+        self.assertEqual(import_owner("json.decoder", apps), "json")
+
+    def test_imports_by_package(self):
+        imports = parse_importtime(IMPORTTIME)
+        self.assertEqual(
+            imports_by_package(imports, ["django.contrib.admin", "registration"]),
+            {
+                "django.contrib.admin": (2080, 2),
+                "registration": (1620, 2),
+                "django": (400, 1),
+            },
+        )
+        self.assertEqual(list(imports_by_package(imports)), ["django", "registration"])
+
+
+class TestStartupProfile(SimpleTestCase):
+    def test_command(self):
+        out = io.StringIO()
+        with override_settings(LAZY_STARTUP=True):
+            call_command("startup_profile", "--repeat", "0", stdout=out)
+        output = out.getvalue()
+        self.assertIn("LAZY_STARTUP=on", output)
+        self.assertIn("GET /registration/login/ (200)", output)
+        self.assertIn("time to first response", output)
+        self.assertIn("registration.admin imported by: /admin/login/", output)
+        self.assertIn("django.contrib.admin", output)
+        self.assertIn("slowest modules", output)
@@ -0,0 +1,207 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from front_end import staticfiles
+
+STORAGE = "front_end.staticfiles.CompressedManifestStaticFilesStorage"
+
+
+class TestVendor(SimpleTestCase):
+    def setUp(self):
+        self.vendor_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.vendor_dir)
+        shutil.copytree(staticfiles.VENDOR_DIR, self.vendor_dir, dirs_exist_ok=True)
+
+    def test_integrity(self):
+        self.assertEqual(
+            staticfiles.integrity(b"alert('Hello, world.');"),
+            "sha384-H8BRh8j48O9oYatfu5AZzq6A9RINhZO5H16dQZngK7T62em8MUt1FLm52t+eX6xO",
+        )
+
+    def test_vendored_assets_match(self):
+        self.assertEqual(
+            len(staticfiles.check_vendor(vendor_dir=self.vendor_dir)),
+            len(staticfiles.VENDOR),
+        )
+
+    def test_changed_asset(self):
+        path = os.path.join(self.vendor_dir, staticfiles.VENDOR[0].path)
+        with open(path, "a") as f:
+            f.write("\n")
+        with self.assertRaisesMessage(staticfiles.VendorError, "doesn't match"):
+            staticfiles.check_vendor(vendor_dir=self.vendor_dir)
+
+    def test_missing_asset(self):
+        os.remove(os.path.join(self.vendor_dir, staticfiles.VENDOR[-1].path))
+        with self.assertRaisesMessage(staticfiles.VendorError, "is missing"):
+            staticfiles.check_vendor(vendor_dir=self.vendor_dir)
+
+
+@unittest.skipIf(
+    staticfiles.optional_import("sass") is None and shutil.which("sass") is None,
+    "needs Sass",
+)
+class TestBuild(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.build_dir = tempfile.mkdtemp()
+        cls.sizes = staticfiles.build(build_dir=cls.build_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.build_dir)
+        super().tearDownClass()
+
+    def read(self, name):
+        with open(os.path.join(self.build_dir, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_css_bundle(self):
+        css = self.read("app.css")
+        self.assertTrue(css.startswith("/*!\n * Bootstrap v4.3.1"))
+        self.assertIn("@font-face{font-family:'Lato'", css)
+        self.assertIn("unicode-range:U+0000-00FF", css)
+        # base.scss, compiled and minified
+        self.assertIn('font-family:"Lato",sans-serif', css)
+        self.assertNotIn("$colour-blue", css)
+        self.assertNotIn("sourceMappingURL", css)
+
+    def test_js_bundle(self):
+        js = self.read("app.js")
+        self.assertTrue(js.startswith("/*! jQuery v3.3.1"))
+        self.assertIn("Bootstrap v4.3.1", js)
+        self.assertLess(js.index("jQuery v3.3.1"), js.index("Bootstrap v4.3.1"))
+        self.assertNotIn("sourceMappingURL", js)
+
+    def test_font_subset(self):
+        font = [name for name in self.sizes if name.startswith("lato-latin-400.")]
+        self.assertEqual(len(font), 1)
+        self.assertIn(f"url({font[0]})", self.read("app.css"))
+        if staticfiles.optional_import("fontTools.subset") is not None:
+            original = os.path.getsize(
+                os.path.join(staticfiles.STATIC_DIR, staticfiles.FONT)
+            )
+            self.assertLess(self.sizes[font[0]], original / 2)
+
+    def test_build_static(self):
+        out = io.StringIO()
+        call_command("build_static", "--no-collect", stdout=out)
+        self.assertIn("Checked 4 vendored asset(s).", out.getvalue())
+        self.assertIn("/static/build/app.", out.getvalue())
+        self.assertIn("request(s), 0 to other hosts", out.getvalue())
+
+
+class TestStorage(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        for directory in (self.source, self.root):
+            self.addCleanup(shutil.rmtree, directory)
+        self.css = "body{background:url(bg.svg)}" + " " * 2000
+        self.write("app.css", self.css)
+        self.write("bg.svg", "<svg></svg>")
+        self.write("app.scss", "$a: 1;")
+        self.write("vendor/lib.js", "lib();")
+
+    def write(self, name, content):
+        path = os.path.join(self.source, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def collect(self):
+        with override_settings(
+            STATICFILES_DIRS=[self.source],
+            STATIC_ROOT=self.root,
+            STATICFILES_STORAGE=STORAGE,
+            INSTALLED_APPS=["front_end.apps.FrontEndStaticFilesConfig"],
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+        with open(os.path.join(self.root, "staticfiles.json")) as f:
+            return json.load(f)["paths"]
+
+    def test_collect(self):
+        paths = self.collect()
+        self.assertEqual(sorted(paths), ["app.css", "bg.svg"])
+        hashed = os.path.join(self.root, paths["app.css"])
+        with open(hashed) as f:
+            content = f.read()
+        self.assertIn(f'url("{paths["bg.svg"]}")', content)
+        with gzip.open(hashed + ".gz", "rt") as f:
+            self.assertEqual(f.read(), content)
+        if staticfiles.brotli is not None:
+            with open(hashed + ".br", "rb") as f:
+                self.assertEqual(
+                    staticfiles.brotli.decompress(f.read()).decode(), content
+                )
+        # Compressing the tiny SVG would only make it bigger
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, paths["bg.svg"] + ".gz"))
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.root, "vendor")))
+
+    def test_url(self):
+        paths = self.collect()
+        with override_settings(
+            STATIC_ROOT=self.root, STATICFILES_STORAGE=STORAGE, STATIC_URL="/assets/"
+        ):
+            self.assertEqual(
+                staticfiles_storage.url("app.css"), f"/assets/{paths['app.css']}"
+            )
+
+    def test_url_without_manifest(self):
+        with override_settings(
+            STATIC_ROOT=self.root, STATICFILES_STORAGE=STORAGE, STATIC_URL="/assets/"
+        ):
+            self.assertEqual(staticfiles_storage.url("app.css"), "/assets/app.css")
+
+
+class TestPageWeight(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        os.makedirs(os.path.join(self.source, "css", "fonts"))
+        with open(os.path.join(self.source, "css", "site.css"), "w") as f:
+            f.write(
+                "@font-face{src:url('fonts/f.woff2')}"
+                'a{background:url("data:image/svg+xml,%3csvg/%3e")}'
+            )
+        with open(os.path.join(self.source, "css", "fonts", "f.woff2"), "wb") as f:
+            f.write(b"wOF2")
+
+    def test_page_weight(self):
+        html = (
+            '<link rel="stylesheet" href="/static/css/site.css">'
+            '<link rel="icon" href="/static/favicon.ico">'
+            '<script src="https://cdn.example.com/lib.js"></script>'
+            '<img src="/static/css/fonts/f.woff2">'
+        )
+        with override_settings(STATICFILES_DIRS=[self.source], STATIC_ROOT=None):
+            weights = staticfiles.page_weight(html)
+        self.assertEqual(
+            [(weight.url, weight.raw) for weight in weights],
+            [
+                ("/static/css/site.css", 86),
+                ("/static/css/fonts/f.woff2", 4),
+                ("https://cdn.example.com/lib.js", None),
+            ],
+        )
+        # Never bigger than the file itself
+        self.assertEqual(weights[1].gzip, 4)
+
+    def test_pages_load_nothing_from_other_hosts(self):
+        response = self.client.get("/registration/login/")
+        assets = staticfiles.page_assets(response.content.decode())
+        # Hashed names if a manifest was collected
+        self.assertTrue(any(url.startswith("/static/build/app.") for url in assets))
+        self.assertEqual([url for url in assets if "//" in url], [])
@@ -0,0 +1,212 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from front_end.staticserve import (
+    accepted_encodings,
+    byte_range,
+    index_files,
+    static_files_middleware,
+)
+
+CSS = b"body{color:red}" * 100
+HASHED = "build/app.0123456789ab.css"
+
+
+class TestHeaders(SimpleTestCase):
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings("gzip, deflate, br"), {"gzip", "deflate", "br"}
+        )
+        self.assertEqual(accepted_encodings("br;q=0, gzip;q=0.5"), {"gzip"})
+        self.assertEqual(accepted_encodings("*"), {"*", "br", "gzip"})
+        self.assertEqual(accepted_encodings(""), set())
+
+    def test_byte_range(self):
+        self.assertEqual(byte_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(byte_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(byte_range("bytes=90-200", 100), (90, 99))
+        self.assertEqual(byte_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(byte_range("bytes=-200", 100), (0, 99))
+        self.assertIs(byte_range("bytes=100-", 100), False)
+        self.assertIs(byte_range("bytes=-0", 100), False)
+        # Not a single range of bytes: the whole file is sent
+        self.assertIsNone(byte_range("", 100))
+        self.assertIsNone(byte_range("bytes=0-1,5-9", 100))
+        self.assertIsNone(byte_range("items=0-9", 100))
+        self.assertIsNone(byte_range("bytes=9-0", 100))
+
+
+class TestStaticFilesMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.write(HASHED, CSS)
+        self.write(HASHED + ".gz", gzip.compress(CSS))
+        self.write(HASHED + ".br", b"brotli")
+        self.write("brand/logo/logo.svg", b"<svg></svg>")
+        self.write("brand/logo/archive/logo_v1.psd", b"8BPS")
+        self.write("brand/logo/archive/logo_v1.svg", b"<svg></svg>")
+        manifest = {"paths": {"build/app.css": HASHED}, "version": "1.0"}
+        self.write("staticfiles.json", json.dumps(manifest).encode())
+        settings = override_settings(
+            STATIC_SERVE=True,
+            STATIC_ROOT=self.root,
+            STATIC_URL="/static/",
+            STATIC_MAX_AGE=60,
+            STATICFILES_STORAGE=(
+                "front_end.staticfiles.CompressedManifestStaticFilesStorage"
+            ),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = static_files_middleware(
+            lambda request: HttpResponse("From the view")
+        )
+        self.factory = RequestFactory()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def get(self, path, method="get", **headers):
+        return self.middleware(getattr(self.factory, method)(path, **headers))
+
+    def content(self, response):
+        content = b"".join(response.streaming_content)
+        response.close()
+        return content
+
+    def test_off_by_default(self):
+        with override_settings(STATIC_SERVE=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                static_files_middleware(lambda request: None)
+
+    def test_other_paths_reach_the_view(self):
+        self.assertEqual(self.get("/registration/login/").content, b"From the view")
+
+    def test_hashed_file(self):
+        response = self.get(f"/static/{HASHED}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), CSS)
+        self.assertEqual(response["Content-Type"], "text/css; charset=utf-8")
+        self.assertEqual(response["Content-Length"], str(len(CSS)))
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotIn("Content-Disposition", response)
+
+    def test_unhashed_file(self):
+        response = self.get("/static/brand/logo/logo.svg")
+        self.assertEqual(self.content(response), b"<svg></svg>")
+        self.assertEqual(response["Content-Type"], "image/svg+xml; charset=utf-8")
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+        self.assertNotIn("Vary", response)
+
+    def test_precompressed(self):
+        response = self.get(f"/static/{HASHED}", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(self.content(response), b"brotli")
+        self.assertEqual(response["Content-Length"], "6")
+
+        response = self.get(f"/static/{HASHED}", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(self.content(response)), CSS)
+        self.assertEqual(response["Content-Type"], "text/css; charset=utf-8")
+
+    def test_etags(self):
+        etags = set()
+        for accept_encoding in ("", "gzip", "br"):
+            response = self.get(
+                f"/static/{HASHED}", HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            response.close()
+            etags.add(response["ETag"])
+            revalidated = self.get(
+                f"/static/{HASHED}",
+                HTTP_ACCEPT_ENCODING=accept_encoding,
+                HTTP_IF_NONE_MATCH=f'"other", W/{response["ETag"]}',
+            )
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated["ETag"], response["ETag"])
+            self.assertEqual(revalidated.content, b"")
+        self.assertEqual(len(etags), 3)
+
+        response = self.get(f"/static/{HASHED}", HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_range(self):
+        response = self.get(
+            f"/static/{HASHED}", HTTP_RANGE="bytes=15-29", HTTP_ACCEPT_ENCODING="br"
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.content(response), CSS[15:30])
+        self.assertEqual(response["Content-Range"], f"bytes 15-29/{len(CSS)}")
+        self.assertEqual(response["Content-Length"], "15")
+        self.assertNotIn("Content-Encoding", response)
+
+        response = self.get(f"/static/{HASHED}", HTTP_RANGE="bytes=-5")
+        self.assertEqual(self.content(response), CSS[-5:])
+
+    def test_range_not_satisfiable(self):
+        response = self.get(f"/static/{HASHED}", HTTP_RANGE=f"bytes={len(CSS)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CSS)}")
+
+    def test_if_range(self):
+        response = self.get(f"/static/{HASHED}")
+        response.close()
+        etag = response["ETag"]
+        response = self.get(
+            f"/static/{HASHED}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag
+        )
+        self.assertEqual(response.status_code, 206)
+        response.close()
+        response = self.get(
+            f"/static/{HASHED}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"changed"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), CSS)
+
+    def test_head(self):
+        response = self.get(f"/static/{HASHED}", method="head")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["Content-Length"], str(len(CSS)))
+
+    def test_method_not_allowed(self):
+        response = self.get(f"/static/{HASHED}", method="post")
+        self.assertEqual(response.status_code, 405)
+
+    def test_not_published(self):
+        for path in (
+            "brand/logo/archive/logo_v1.psd",
+            "brand/logo/archive/logo_v1.svg",
+            "staticfiles.json",
+            f"{HASHED}.gz",
+            "../settings.py",
+            "missing.css",
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(f"/static/{path}").status_code, 404)
+
+    def test_index_files(self):
+        files = index_files(self.root, immutable=[HASHED], max_age=5)
+        self.assertEqual(
+            sorted(files), ["brand/logo/logo.svg", HASHED, "staticfiles.json"]
+        )
+        self.assertEqual(set(files[HASHED].representations), {None, "br", "gzip"})
+        self.assertEqual(
+            files["brand/logo/logo.svg"].cache_control, "public, max-age=5"
+        )
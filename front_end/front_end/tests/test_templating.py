@@ -0,0 +1,143 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+from django.core.management import call_command
+from django.template import Context, Engine
+from django.test import SimpleTestCase, override_settings
+
+from front_end.templating import (
+    reset_template_timings,
+    template_timings,
+    warm_templates,
+    write_bundle,
+)
+
+FILESYSTEM = "front_end.templating.FilesystemLoader"
+CACHED = "front_end.templating.CachedLoader"
+BUNDLE = "front_end.templating.BundleLoader"
+
+
+class TemplateDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for template_dir in self.dirs:
+            self.addCleanup(shutil.rmtree, template_dir, ignore_errors=True)
+        self.write(0, "base.html", "<h1>{% block title %}{% endblock %}</h1>")
+        self.write(
+            0,
+            "pages/page.html",
+            '{% extends "base.html" %}{% block title %}{{ name }}'
+            '{% include "pages/part.html" %}{% endblock %}',
+        )
+        self.write(0, "pages/part.html", "!")
+        self.write(0, "broken.html", "{% not_a_tag %}")
+        # Overrides the template of the same name in the second directory
+        self.write(0, "x.html", '{% extends "x.html" %}{% block b %}1{% endblock %}')
+        self.write(1, "x.html", "[{% block b %}2{% endblock %}]")
+
+    def write(self, index, name, source):
+        path = os.path.join(self.dirs[index], name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+
+    def engine(self, loaders):
+        return Engine(dirs=self.dirs, loaders=loaders)
+
+
+class TestLoaders(TemplateDirMixin, SimpleTestCase):
+    def render(self, engine, name):
+        return engine.get_template(name).render(Context({"name": "Hi"}))
+
+    def test_debug_rereads_templates(self):
+        engine = self.engine([FILESYSTEM])
+        self.assertEqual(self.render(engine, "pages/page.html"), "<h1>Hi!</h1>")
+        self.write(0, "pages/part.html", "?")
+        self.assertEqual(self.render(engine, "pages/page.html"), "<h1>Hi?</h1>")
+        self.assertEqual(self.render(engine, "x.html"), "[1]")
+
+    def test_cached_warm(self):
+        engine = self.engine([(CACHED, [FILESYSTEM])])
+        self.assertEqual(engine.template_loaders[0].warm(), 4)
+        self.assertEqual(self.render(engine, "x.html"), "[1]")
+        for template_dir in self.dirs:
+            shutil.rmtree(template_dir)
+        self.assertEqual(self.render(engine, "pages/page.html"), "<h1>Hi!</h1>")
+        self.assertEqual(self.render(engine, "x.html"), "[1]")
+
+    def test_bundle(self):
+        bundle_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, bundle_dir)
+        count = write_bundle(os.path.join(bundle_dir, "test_bundle.py"), self.dirs)
+        self.assertEqual(count, 5)
+        sys.path.insert(0, bundle_dir)
+        self.addCleanup(sys.path.remove, bundle_dir)
+        self.addCleanup(sys.modules.pop, "test_bundle", None)
+
+        with override_settings(TEMPLATE_BUNDLE="test_bundle"):
+            engine = self.engine([(CACHED, [BUNDLE])])
+            loader = engine.template_loaders[0]
+        for template_dir in self.dirs:
+            shutil.rmtree(template_dir)
+        self.assertEqual(loader.warm(), 4)
+        self.assertEqual(self.render(engine, "pages/page.html"), "<h1>Hi!</h1>")
+        self.assertEqual(self.render(engine, "x.html"), "[1]")
+
+    def test_timings(self):
+        engine = self.engine([FILESYSTEM])
+        reset_template_timings()
+        self.render(engine, "pages/page.html")
+        timings = template_timings()
+        self.assertEqual(
+            sorted(timings), ["base.html", "pages/page.html", "pages/part.html"]
+        )
+        renders, seconds = timings["pages/page.html"]
+        self.assertEqual(renders, 1)
+        self.assertGreaterEqual(seconds, timings["base.html"][1])
+
+
+class TestProjectTemplates(SimpleTestCase):
+    def test_warm_templates(self):
+        cached = [(CACHED, [FILESYSTEM, "front_end.templating.AppDirectoriesLoader"])]
+        with override_settings(
+            TEMPLATES=[
+                {
+                    "BACKEND": "django.template.backends.django.DjangoTemplates",
+                    "DIRS": [],
+                    "OPTIONS": {"loaders": cached},
+                }
+            ]
+        ):
+            with override_settings(LAZY_STARTUP=True):
+                self.assertLess(warm_templates(), 50)
+            with override_settings(LAZY_STARTUP=False):
+                self.assertGreater(warm_templates(), 30)
+        self.assertEqual(warm_templates(), 0)
+
+    def test_build_template_bundle(self):
+        bundle_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, bundle_dir)
+        output = os.path.join(bundle_dir, "bundle.py")
+        out = io.StringIO()
+        call_command("build_template_bundle", "--output", output, stdout=out)
+        self.assertIn("Bundled", out.getvalue())
+        namespace = {}
+        with open(output) as f:
+            exec(f.read(), namespace)
+        self.assertIn("registration/login.html", namespace["TEMPLATES"])
+        self.assertIn("admin/base.html", namespace["TEMPLATES"])
+
+    @override_settings(TEMPLATE_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        response = self.client.get("/registration/login/")
+        self.assertIn('desc="registration/login.html";dur=', response["Server-Timing"])
+        self.assertIn('desc="base.html"', response["Server-Timing"])
+
+    @override_settings(TEMPLATE_TIMING_HEADER=False)
+    def test_server_timing_header_off(self):
+        response = self.client.get("/registration/login/")
+        self.assertNotIn("Server-Timing", response)
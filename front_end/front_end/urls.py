@@ -13,19 +13,21 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-import debug_toolbar
 from django.conf import settings
-from django.contrib import admin
 from django.urls import include, path
 
 from front_end import views
+from front_end.startup import lazy_path
 
 urlpatterns = [
     path("", views.HomePage.as_view(), name="home"),
-    path("admin/", admin.site.urls),
+    lazy_path("admin/", "front_end.admin_urls", "admin"),
+    path("metrics/", views.metrics, name="metrics"),
     path("registration/", include("registration.urls", namespace="registration")),
-    path("registration/", include("django.contrib.auth.urls")),
+    path("ledger/", include("ledger.urls", namespace="ledger")),
+    path("jobs/", include("jobs.urls", namespace="jobs")),
 ]
 
-if settings.DEBUG:
-    urlpatterns.append(path("__debug__/", include(debug_toolbar.urls)))
+# Only the dev profile installs the toolbar
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(lazy_path("__debug__/", "debug_toolbar.toolbar", "djdt"))
@@ -1,7 +1,45 @@
+import hmac
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.shortcuts import resolve_url
 from django.views.generic import TemplateView
 
+from front_end.metrics import metrics_text
+from registration.async_views import aget_user, arender
+from registration.ratelimit import client_ip
+
 
 class HomePage(LoginRequiredMixin, TemplateView):
     template_name = "index.html"
     redirect_field_name = None
+
+
+async def home(request):
+    """Async counterpart of HomePage for the ASGI entry point."""
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return HttpResponseRedirect(resolve_url(settings.LOGIN_URL))
+    return await arender(request, HomePage.template_name)
+
+
+def metrics_allowed(request):
+    """
+    Whether ``request`` bears METRICS_TOKEN, when that's set, or else comes
+    from one of METRICS_ALLOWED_IPS (through TRUSTED_PROXIES).
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        return hmac.compare_digest(authorization.encode(), f"Metrics {token}".encode())
+    return client_ip(request) in settings.METRICS_ALLOWED_IPS
+
+
+def metrics(request):
+    """This process's request metrics, for Prometheus to scrape."""
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        metrics_text(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
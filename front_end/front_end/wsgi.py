@@ -7,10 +7,15 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/wsgi/
 """
 
-import os
-
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "front_end.settings")
+from front_end.settings import configure
+from front_end.templating import warm_templates
+
+# A server started without SETTINGS_PROFILE must not run with DEBUG on
+configure(default="prod")
 
 application = get_wsgi_application()
+
+# Parse every template now rather than on the first requests to use them
+warm_templates()
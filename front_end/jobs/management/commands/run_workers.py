@@ -0,0 +1,58 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Run the queued background jobs in one or more worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes, each running one job at a time (default: 1).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait when there are no due jobs (default: 1).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there are no more due jobs instead of polling.",
+        )
+
+    def handle(self, *args, processes, interval, once, **options):
+        if processes < 1:
+            raise CommandError("--processes must be a positive integer.")
+        if processes == 1:
+            queue.work(interval, once, out=self.stdout)
+            return
+
+        # Each process opens its own connections after the fork
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(
+                target=queue.work,
+                args=(interval, once),
+                kwargs={"out": self.stdout},
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # From a terminal the workers got the interrupt too, and put
+            # their running jobs back in the queue before exiting
+            for worker in workers:
+                worker.join()
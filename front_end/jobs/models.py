@@ -0,0 +1,99 @@
+"""
+Background jobs, queued by requests and run by ``manage.py run_workers``
+(see jobs/queue.py).
+"""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+    # Dotted path of a function taking the job and its kwargs
+    handler = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict)
+    # Set by the caller so that queuing the same work again is a no-op
+    key = models.CharField(max_length=100, null=True, blank=True)
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by report(); a running job whose worker stops refreshing it
+    # is requeued after JOBS_LEASE seconds
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    progress = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+    errors = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [
+            # What claim() scans, in the order it takes jobs
+            models.Index(
+                fields=["-priority", "run_after", "id"],
+                condition=models.Q(status="queued"),
+                name="jobs_job_queued",
+            ),
+            # The running jobs counted against JOBS_PER_USER
+            models.Index(
+                fields=["user"],
+                condition=models.Q(status="running"),
+                name="jobs_job_running_user",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"],
+                condition=models.Q(key__isnull=False),
+                name="jobs_job_user_key_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.handler} #{self.pk}"
+
+    @property
+    def last_attempt(self):
+        return self.attempts >= settings.JOBS_MAX_ATTEMPTS
+
+    def report(self, **progress):
+        """Save the handler's progress, for the status endpoint."""
+        self.progress = progress
+        Job.objects.filter(pk=self.pk).update(
+            progress=progress, heartbeat_at=timezone.now()
+        )
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "status": self.status,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "result": self.result,
+            "errors": self.errors,
+        }
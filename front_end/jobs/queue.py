@@ -0,0 +1,239 @@
+"""
+A queue of background jobs in the jobs_job table, worked by the
+``run_workers`` management command. No broker is needed: workers claim
+jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of them, in any
+number of processes, take different jobs without waiting on each other.
+
+Requests call enqueue() with the dotted path of a handler and the arguments
+to call it with, like outbox.enqueue(). The handler is called with the job
+and its kwargs and returns a JSON-serializable result. Jobs are taken by
+priority, highest first, then by when they're due.
+
+A user has at most JOBS_PER_USER jobs running at once. claim() takes a
+transaction-level advisory lock on the user of the job it picks before
+counting their running jobs, so two workers can't both take a user's last
+slot; jobs of users at their limit are left for later. So are those of a
+user whose lock another worker holds: claim() only tries the lock, as
+waiting on it while holding another user's could deadlock two workers.
+
+A worker that hits a database error, e.g. a lost connection, logs it and
+keeps polling. A job it had claimed is recovered by its heartbeat. One
+interrupted with Ctrl-C (SIGINT) puts the job it's running back in the
+queue, as if it hadn't claimed it, and exits.
+
+A failed job is retried with exponential backoff, and fails for good after
+JOBS_MAX_ATTEMPTS attempts, so handlers must be idempotent: a retry may
+find some of the work done. A job whose worker died is found by its
+heartbeat, which Job.report() refreshes, and run again in the same way.
+
+As jobs may run again anyway, the queue's own updates are committed without
+waiting for the WAL to be flushed (synchronous_commit = off). A crash can
+lose the last of them, which puts a job back a step: a claimed job is
+claimed again, a finished one runs again. That takes two disk flushes off
+every job, most of a short job's cost.
+"""
+import collections
+import contextlib
+import datetime
+import logging
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from psycopg2.extras import Json
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# The first key of claim()'s advisory locks, "jobs" in ASCII
+LOCK_CLASS = 0x6A6F6273
+
+# claim() and finishing a job use SQL of their own, as the ORM's query
+# building would cost a short job about as much as the queries themselves
+CLAIM = (
+    "SELECT id, user_id FROM jobs_job "
+    "WHERE status = 'queued' AND run_after <= statement_timestamp() "
+    "AND (user_id IS NULL OR user_id <> ALL(%s)) "
+    "ORDER BY priority DESC, run_after, id "
+    "LIMIT 1 FOR UPDATE SKIP LOCKED"
+)
+RUNNING = "SELECT count(*) FROM jobs_job WHERE user_id = %s AND status = 'running'"
+START = (
+    "UPDATE jobs_job SET status = 'running', attempts = attempts + 1, "
+    "started_at = now(), heartbeat_at = now(), worker = %s "
+    "WHERE id = %s RETURNING *"
+)
+FINISH = (
+    "UPDATE jobs_job SET status = %s, result = %s, errors = %s, run_after = %s, "
+    "finished_at = CASE WHEN %s THEN now() END, worker = %s "
+    "WHERE id = %s AND status = 'running' AND attempts = %s"
+)
+REQUEUE = (
+    "UPDATE jobs_job SET status = 'queued', attempts = attempts - 1, worker = '' "
+    "WHERE id = %s AND status = 'running' AND attempts = %s"
+)
+
+
+def enqueue(handler, user=None, priority=0, key=None, **kwargs):
+    """
+    Queue a job for the workers. ``handler`` is the dotted path of a
+    function taking the job and ``kwargs``, which must be JSON serializable.
+    If ``user`` already has a job with ``key``, that job is returned rather
+    than another queued.
+    """
+    fields = {"handler": handler, "kwargs": kwargs, "priority": priority}
+    if key is None:
+        return Job.objects.create(user=user, **fields)
+    job, _ = Job.objects.get_or_create(user=user, key=key, defaults=fields)
+    return job
+
+
+@contextlib.contextmanager
+def _unflushed():
+    """A transaction that commits without waiting for the WAL flush."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL synchronous_commit = off")
+        yield cursor
+
+
+def claim(worker):
+    """
+    Mark the next due job that's within its user's limit as running by
+    ``worker`` and return it, or return None if there's none.
+    """
+    limit = settings.JOBS_PER_USER
+    full = []
+    with _unflushed() as cursor:
+        while True:
+            cursor.execute(CLAIM, [full])
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            pk, user_id = row
+            if user_id is not None:
+                # Held until commit, when the job counts as running
+                cursor.execute(
+                    "SELECT pg_try_advisory_xact_lock(%s, %s)", [LOCK_CLASS, user_id]
+                )
+                if not cursor.fetchone()[0]:
+                    full.append(user_id)
+                    continue
+                cursor.execute(RUNNING, [user_id])
+                if cursor.fetchone()[0] >= limit:
+                    full.append(user_id)
+                    continue
+            return next(iter(Job.objects.raw(START, [worker, pk])))
+
+
+def _finish(job, status, result=None, run_after=None):
+    """
+    Record the outcome of ``job``'s attempt, unless it was recovered and
+    claimed again meanwhile, and return ``status``.
+    """
+    queued = status == Job.QUEUED
+    with _unflushed() as cursor:
+        cursor.execute(
+            FINISH,
+            [
+                status,
+                Json(result),
+                Json(job.errors),
+                run_after or job.run_after,
+                not queued,
+                "" if queued else job.worker,
+                job.pk,
+                job.attempts,
+            ],
+        )
+    return status
+
+
+def _failed(job, error):
+    job.errors.append(f"{type(error).__name__}: {error}")
+    if job.last_attempt:
+        return _finish(job, Job.FAILED)
+    delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+    _finish(
+        job, Job.QUEUED, run_after=timezone.now() + datetime.timedelta(seconds=delay)
+    )
+    return "retried"
+
+
+def run(job):
+    """
+    Run a claimed job and record the outcome, which is returned. If it's
+    interrupted, it's put back in the queue and the interrupt raised again.
+    """
+    try:
+        result = import_string(job.handler)(job, **job.kwargs)
+    except Exception as e:
+        return _failed(job, e)
+    except KeyboardInterrupt:
+        # Not counted as an attempt, so its handler still gets its last one
+        with _unflushed() as cursor:
+            cursor.execute(REQUEUE, [job.pk, job.attempts])
+        raise
+    return _finish(job, Job.DONE, result)
+
+
+def recover(older_than=None):
+    """
+    Requeue running jobs whose heartbeat is more than ``older_than``
+    seconds (JOBS_LEASE by default) old, i.e. whose worker died, or fail
+    them if that was their last attempt. Return how many were found.
+    """
+    older_than = settings.JOBS_LEASE if older_than is None else older_than
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=timezone.now() - datetime.timedelta(seconds=older_than),
+    )
+    failed = stale.filter(attempts__gte=settings.JOBS_MAX_ATTEMPTS).update(
+        status=Job.FAILED, finished_at=Now()
+    )
+    return failed + stale.update(status=Job.QUEUED, worker="")
+
+
+def work(interval=1, once=False, name=None, out=None):
+    """
+    Claim and run jobs until interrupted, waiting ``interval`` seconds when
+    there's nothing to do, or until then if ``once``. Database errors are
+    logged and polling goes on. Return a Counter of jobs done, retried and
+    failed.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    counts = collections.Counter()
+    idle = True
+    try:
+        while True:
+            try:
+                if idle:
+                    recover()
+                job = claim(name)
+                idle = job is None
+                if job is not None:
+                    counts[run(job)] += 1
+                    continue
+            except DatabaseError:
+                logger.exception("Worker %s hit a database error", name)
+                idle = True
+            if once:
+                break
+            # As at the end of a request, but only when idle, as
+            # CONN_MAX_AGE = 0 would reconnect for every job
+            close_old_connections()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not None:
+            out.write(
+                f"Worker {name}: {counts['done']} done, "
+                f"{counts['retried']} retried, {counts['failed']} failed."
+            )
+    return counts
@@ -0,0 +1,170 @@
+import datetime
+import io
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings, tag
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+from registration.models import User
+
+ADD = "jobs.tests.test_queue.add"
+FAIL = "jobs.tests.test_queue.fail"
+INTERRUPT = "jobs.tests.test_queue.interrupt"
+
+
+def add(job, a, b):
+    job.report(step=1)
+    return a + b
+
+
+def fail(job):
+    raise ValueError("nope")
+
+
+def interrupt(job):
+    raise KeyboardInterrupt
+
+
+@override_settings(JOBS_PER_USER=1, JOBS_MAX_ATTEMPTS=2, JOBS_RETRY_DELAY=30)
+class TestQueue(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="jobs@example.com", password="abcd12efgh"
+        )
+        cls.other = User.objects.create_user(
+            email="otherjobs@example.com", password="abcd12efgh"
+        )
+
+    def test_enqueue_with_a_key_queues_once(self):
+        first = queue.enqueue(ADD, user=self.user, key="sum", a=1, b=2)
+        second = queue.enqueue(ADD, user=self.user, key="sum", a=3, b=4)
+        self.assertEqual(first, second)
+        self.assertEqual(second.kwargs, {"a": 1, "b": 2})
+        self.assertNotEqual(queue.enqueue(ADD, user=self.other, key="sum"), first)
+
+    def test_claim_by_priority(self):
+        low = queue.enqueue(ADD, a=1, b=1)
+        high = queue.enqueue(ADD, priority=5, a=1, b=1)
+        later = queue.enqueue(ADD, priority=9, a=1, b=1)
+        Job.objects.filter(pk=later.pk).update(
+            run_after=timezone.now() + datetime.timedelta(hours=1)
+        )
+        self.assertEqual(queue.claim("test"), high)
+        job = queue.claim("test")
+        self.assertEqual(job, low)
+        self.assertEqual((job.status, job.attempts, job.worker), ("running", 1, "test"))
+        self.assertIsNone(queue.claim("test"))
+
+    def test_claim_per_user_limit(self):
+        first = queue.enqueue(ADD, user=self.user, priority=2, a=1, b=1)
+        queue.enqueue(ADD, user=self.user, priority=2, a=1, b=1)
+        others = queue.enqueue(ADD, user=self.other, a=1, b=1)
+        self.assertEqual(queue.claim("test"), first)
+        # The user's second job waits for the first
+        self.assertEqual(queue.claim("test"), others)
+        self.assertIsNone(queue.claim("test"))
+        queue.run(Job.objects.get(pk=first.pk))
+        self.assertEqual(queue.claim("test").user, self.user)
+
+    def test_claim_skips_users_locked_by_another_worker(self):
+        locked = queue.enqueue(ADD, user=self.user, priority=2, a=1, b=1)
+        others = queue.enqueue(ADD, user=self.other, a=1, b=1)
+        # Another worker in the middle of claiming one of the user's jobs
+        worker = connection.copy()
+        self.addCleanup(worker.close)
+        with worker.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_lock(%s, %s)", [queue.LOCK_CLASS, self.user.pk]
+            )
+        self.assertEqual(queue.claim("test"), others)
+        self.assertIsNone(queue.claim("test"))
+        with worker.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s, %s)", [queue.LOCK_CLASS, self.user.pk]
+            )
+        self.assertEqual(queue.claim("test"), locked)
+
+    def test_work_survives_database_errors(self):
+        claim = mock.patch.object(
+            queue, "claim", side_effect=[DatabaseError, KeyboardInterrupt]
+        )
+        # Which would close the test case's connection
+        idle = mock.patch.object(queue, "close_old_connections")
+        with claim as claimed, idle, self.assertLogs("jobs.queue", "ERROR") as logs:
+            queue.work(interval=0, name="test")
+        self.assertEqual(claimed.call_count, 2)
+        self.assertIn("Worker test hit a database error", logs.output[0])
+
+    def test_interrupted_job_is_requeued(self):
+        job = queue.enqueue(INTERRUPT)
+        counts = queue.work(once=True, name="test")
+        self.assertEqual(sum(counts.values()), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.worker), ("queued", 0, ""))
+        self.assertEqual(queue.claim("test"), job)
+
+    def test_run(self):
+        queue.enqueue(ADD, a=1, b=2)
+        self.assertEqual(queue.run(queue.claim("test")), "done")
+        job = Job.objects.get()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.result, 3)
+        self.assertEqual(job.progress, {"step": 1})
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retries_then_fails(self):
+        queue.enqueue(FAIL)
+        self.assertEqual(queue.run(queue.claim("test")), "retried")
+        job = Job.objects.get()
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.errors, ["ValueError: nope"])
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(queue.claim("test"))
+
+        Job.objects.update(run_after=timezone.now())
+        self.assertEqual(queue.run(queue.claim("test")), "failed")
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertEqual(len(job.errors), 2)
+
+    def test_recover(self):
+        queue.enqueue(ADD, a=1, b=1)
+        queue.enqueue(ADD, a=1, b=1)
+        first, second = queue.claim("test"), queue.claim("test")
+        Job.objects.filter(pk=second.pk).update(attempts=2)
+        self.assertEqual(queue.recover(), 0)
+        Job.objects.update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(queue.recover(), 2)
+        self.assertEqual(Job.objects.get(pk=first.pk).status, "queued")
+        self.assertEqual(Job.objects.get(pk=second.pk).status, "failed")
+        # A recovered job's first worker can't record an outcome any more
+        queue.claim("another")
+        queue.run(first)
+        self.assertEqual(Job.objects.get(pk=first.pk).worker, "another")
+
+
+# Tagged "serial" as the workers are processes of their own, which need to
+# see the jobs committed
+@tag("serial")
+class TestRunWorkers(TransactionTestCase):
+    def test_run_workers(self):
+        for i in range(20):
+            queue.enqueue(ADD, a=i, b=1)
+        queue.enqueue(FAIL)
+        call_command("run_workers", processes=3, once=True, stdout=io.StringIO())
+        self.assertEqual(
+            sorted(Job.objects.filter(status="done").values_list("result", flat=True)),
+            list(range(1, 21)),
+        )
+        self.assertEqual(Job.objects.get(handler=FAIL).status, "queued")
+
+        out = io.StringIO()
+        call_command("run_workers", once=True, stdout=out)
+        self.assertIn("0 done, 0 retried, 0 failed.", out.getvalue())
+        with self.assertRaisesMessage(CommandError, "--processes must be"):
+            call_command("run_workers", processes=0)
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs import queue
+from registration.models import User
+
+
+class TestJobViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="jobviews@example.com", password="abcd12efgh"
+        )
+        cls.other = User.objects.create_user(
+            email="otherjobviews@example.com", password="abcd12efgh"
+        )
+        cls.job = queue.enqueue("jobs.tests.test_queue.add", user=cls.user, a=1, b=2)
+        cls.others = queue.enqueue("jobs.tests.test_queue.add", user=cls.other)
+
+    def test_status(self):
+        url = reverse("jobs:status", args=[self.job.pk])
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertEqual(response.json()["status"], "queued")
+
+        queue.run(queue.claim("test"))
+        status = self.client.get(url).json()
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["result"], 3)
+        self.assertEqual(status["attempts"], 1)
+        # Other users' jobs aren't found
+        url = reverse("jobs:status", args=[self.others.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_list(self):
+        self.assertEqual(self.client.get(reverse("jobs:list")).status_code, 401)
+        self.client.force_login(self.user)
+        jobs = self.client.get(reverse("jobs:list")).json()["jobs"]
+        self.assertEqual([job["id"] for job in jobs], [self.job.pk])
@@ -0,0 +1,33 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from jobs.models import Job
+from registration.views import token_error
+
+# Jobs listed by job_list, newest first
+LIST_LENGTH = 50
+
+
+def _unauthorized():
+    return token_error("unauthorized", "Sign in first.", status=401)
+
+
+@require_GET
+@never_cache
+def job_list(request):
+    """The signed-in user's latest jobs, for polling by session or token."""
+    if not request.user.is_authenticated:
+        return _unauthorized()
+    jobs = request.user.jobs.order_by("-created_at", "-id")[:LIST_LENGTH]
+    return JsonResponse({"jobs": [job.as_dict() for job in jobs]})
+
+
+@require_GET
+@never_cache
+def job_status(request, pk):
+    if not request.user.is_authenticated:
+        return _unauthorized()
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return JsonResponse(job.as_dict())
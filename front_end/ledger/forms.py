@@ -0,0 +1,54 @@
+from django import forms
+
+from ledger.models import Account
+from ledger.statements import FORMATS
+from registration.forms import field_attrs
+
+
+class StatementImportForm(forms.Form):
+    statement = forms.FileField(widget=forms.ClearableFileInput(attrs=field_attrs()))
+    format = forms.ChoiceField(
+        choices=[("", "Format from the file name")]
+        + [(format, format.upper()) for format in FORMATS],
+        required=False,
+        widget=forms.Select(attrs={"class": "input_form"}),
+    )
+    account = forms.ModelChoiceField(
+        queryset=Account.objects.none(),
+        required=False,
+        empty_label="Into a new account",
+        widget=forms.Select(attrs={"class": "input_form"}),
+    )
+    new_account = forms.CharField(
+        max_length=Account._meta.get_field("name").max_length,
+        required=False,
+        widget=forms.TextInput(
+            attrs={"class": "input_form", "placeholder": "New account name"}
+        ),
+    )
+
+    def __init__(self, user, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        self.fields["account"].queryset = user.accounts.order_by("name")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        name = cleaned_data.get("new_account", "").strip()
+        if cleaned_data.get("account") is None:
+            if not name:
+                self.add_error("new_account", "Choose an account or name a new one.")
+            elif self.user.accounts.filter(name=name).exists():
+                self.add_error(
+                    "new_account", "You already have an account by that name."
+                )
+        return cleaned_data
+
+    def get_account(self):
+        """The chosen account, or the new one, created now."""
+        account = self.cleaned_data["account"]
+        if account is None:
+            account = Account.objects.create(
+                user=self.user, name=self.cleaned_data["new_account"].strip()
+            )
+        return account
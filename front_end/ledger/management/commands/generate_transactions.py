@@ -0,0 +1,162 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ledger import partitions
+from ledger.models import Account, Category, Transaction
+from registration.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Give the users made by generate_users --accounts accounts each and "
+        "insert transactions into them, spread over the last --months months, "
+        "until they have --count in total, for benchmarking large ledgers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, required=True)
+        parser.add_argument(
+            "--prefix",
+            default="generated",
+            help="Email prefix of the generated users (default: generated).",
+        )
+        parser.add_argument(
+            "--accounts",
+            type=int,
+            default=3,
+            help="Accounts per generated user (default: 3).",
+        )
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=24,
+            help="Months up to now the transactions are booked in (default: 24).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000000,
+            help="Number of transactions inserted per statement (default: 1000000).",
+        )
+        parser.add_argument(
+            "--categorized",
+            action="store_true",
+            help="Put each transaction in one of its user's categories, if any.",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the generated accounts, and so their transactions, instead.",
+        )
+
+    def handle(
+        self,
+        *args,
+        count,
+        prefix,
+        accounts,
+        months,
+        batch_size,
+        categorized,
+        delete,
+        **options,
+    ):
+        if count < 0 or accounts < 1 or months < 1 or batch_size < 1:
+            raise CommandError(
+                "--count, --accounts, --months and --batch-size must be positive."
+            )
+        users = User.objects.filter(
+            email__lower__startswith=prefix.lower(),
+            email__lower__endswith="@example.com",
+        )
+        users_sql, users_params = users.values("pk").query.sql_with_params()
+        account_table = connection.ops.quote_name(Account._meta.db_table)
+        generated = Account.objects.filter(
+            user__in=users, name__startswith="Generated "
+        )
+        accounts_sql, accounts_params = generated.values("pk").query.sql_with_params()
+        if delete:
+            # The database cascades to the transactions
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {account_table} WHERE id IN ({accounts_sql})",
+                    accounts_params,
+                )
+                deleted = cursor.rowcount
+            self.stdout.write(f"Deleted {deleted} generated account(s).")
+            return
+        if not users.exists():
+            raise CommandError(
+                f"There are no users generated with the prefix '{prefix}', see "
+                "manage.py generate_users."
+            )
+
+        start = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {account_table} (user_id, name, currency, created_at) "
+                "SELECT u.id, 'Generated ' || a, 'GBP', now() "
+                f"FROM ({users_sql}) AS u, generate_series(1, %s) AS a "
+                "ON CONFLICT DO NOTHING",
+                [*users_params, accounts],
+            )
+        now = timezone.now()
+        first = partitions.month_start(now - datetime.timedelta(days=31 * (months - 1)))
+        partitions.create_partitions(first, now)
+
+        existing = Transaction.objects.filter(account__in=generated).count()
+        span = (now - first) / max(count, 1)
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        # Each user's categories, for --categorized
+        categories, category, category_join, category_params = "", "NULL", "", []
+        if categorized:
+            category_table = connection.ops.quote_name(Category._meta.db_table)
+            categories = (
+                ", c AS (SELECT user_id, array_agg(id ORDER BY id) AS ids, "
+                f"count(*) AS n FROM {category_table} "
+                f"WHERE user_id IN ({users_sql}) GROUP BY user_id)"
+            )
+            category = "c.ids[1 + i * 40503 %% c.n]"
+            category_join = " LEFT JOIN c ON c.user_id = a.users[k]"
+            category_params = users_params
+        for first_row in range(existing + 1, count + 1, batch_size):
+            last_row = min(first_row + batch_size - 1, count)
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Booked in row order, as a live ledger fills up, which is what
+                # the BRIN index relies on. Accounts and amounts are spread by
+                # multiplicative hashing of the row number, and so are
+                # categories.
+                cursor.execute(
+                    "WITH a AS ("
+                    "SELECT array_agg(id ORDER BY id) AS ids, "
+                    "array_agg(user_id ORDER BY id) AS users, count(*) AS n "
+                    f"FROM {account_table} WHERE id IN ({accounts_sql})){categories} "
+                    f"INSERT INTO {table} "
+                    "(user_id, account_id, category_id, booked_at, amount, description) "
+                    f"SELECT a.users[k], a.ids[k], {category}, %s + i * %s, "
+                    "CASE WHEN i %% 50 = 0 THEN 250000 "
+                    "ELSE -(100 + i * 7919 %% 15000) END, 'Generated' "
+                    "FROM a CROSS JOIN generate_series(%s::bigint, %s::bigint) AS i "
+                    "CROSS JOIN LATERAL (SELECT (1 + i * 2654435761 %% a.n)::int AS k) "
+                    f"AS pick{category_join}",
+                    [
+                        *accounts_params,
+                        *category_params,
+                        first,
+                        span,
+                        first_row,
+                        last_row,
+                    ],
+                )
+            self.stdout.write(f"Inserted transactions {first_row}-{last_row}.")
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {account_table}, {table}")
+        added = max(count - existing, 0)
+        self.stdout.write(
+            f"Added {added} transaction(s) in {time.perf_counter() - start:.1f}s, "
+            f"{max(count, existing)} generated in total."
+        )
@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ledger import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of ledger_transaction from this month "
+        "to --months-ahead months from now. Run it at least monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Months after this one to create partitions for (default: 3).",
+        )
+        parser.add_argument(
+            "--since",
+            help="Also create partitions from this month (YYYY-MM) on.",
+        )
+
+    def handle(self, *args, months_ahead, since, **options):
+        if months_ahead < 0:
+            raise CommandError("--months-ahead must not be negative.")
+        last = first = partitions.month_start(timezone.now())
+        for _ in range(months_ahead):
+            last = partitions.next_month(last)
+        if since:
+            try:
+                since = datetime.datetime.strptime(since, "%Y-%m").date()
+            except ValueError:
+                raise CommandError(f"--since must be YYYY-MM, not '{since}'.")
+            first = min(first, partitions.month_start(since))
+        created = partitions.create_partitions(first, last)
+        for name in created:
+            self.stdout.write(f"Created {name}.")
+        self.stdout.write(f"{len(created)} partition(s) created.")
@@ -0,0 +1,142 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Written by hand: Django can't declare a partitioned table or a composite
+# foreign key, so the schema is SQL and the models are state only. Every
+# foreign key cascades in the database (see ledger/models.py).
+SCHEMA = """
+CREATE TABLE ledger_account (
+    id serial PRIMARY KEY,
+    user_id integer NOT NULL
+        REFERENCES registration_user (id) ON DELETE CASCADE
+        DEFERRABLE INITIALLY DEFERRED,
+    name varchar(100) NOT NULL,
+    currency varchar(3) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    CONSTRAINT ledger_account_user_name_uniq UNIQUE (user_id, name),
+    CONSTRAINT ledger_account_user_id_uniq UNIQUE (user_id, id)
+);
+
+CREATE TABLE ledger_transaction (
+    id bigserial NOT NULL,
+    user_id integer NOT NULL,
+    account_id integer NOT NULL,
+    booked_at timestamp with time zone NOT NULL,
+    amount bigint NOT NULL,
+    description varchar(200) NOT NULL,
+    PRIMARY KEY (id, booked_at),
+    CONSTRAINT ledger_transaction_account_fk FOREIGN KEY (user_id, account_id)
+        REFERENCES ledger_account (user_id, id) ON DELETE CASCADE
+        DEFERRABLE INITIALLY DEFERRED
+) PARTITION BY RANGE (booked_at);
+
+CREATE TABLE ledger_transaction_default PARTITION OF ledger_transaction DEFAULT;
+
+CREATE INDEX ledger_tx_user_account_booked
+    ON ledger_transaction (user_id, account_id, booked_at);
+CREATE INDEX ledger_tx_booked_brin ON ledger_transaction USING brin (booked_at);
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    SCHEMA, "DROP TABLE ledger_transaction; DROP TABLE ledger_account;"
+                ),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="Account",
+                    fields=[
+                        (
+                            "id",
+                            models.AutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        ("name", models.CharField(max_length=100)),
+                        ("currency", models.CharField(default="GBP", max_length=3)),
+                        ("created_at", models.DateTimeField(auto_now_add=True)),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                db_index=False,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="accounts",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                ),
+                migrations.CreateModel(
+                    name="Transaction",
+                    fields=[
+                        ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                        ("booked_at", models.DateTimeField()),
+                        ("amount", models.BigIntegerField()),
+                        ("description", models.CharField(blank=True, max_length=200)),
+                        (
+                            "account",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                db_index=False,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="transactions",
+                                to="ledger.account",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                db_index=False,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="transactions",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                ),
+                migrations.AddConstraint(
+                    model_name="account",
+                    constraint=models.UniqueConstraint(
+                        fields=("user", "name"), name="ledger_account_user_name_uniq"
+                    ),
+                ),
+                migrations.AddConstraint(
+                    model_name="account",
+                    constraint=models.UniqueConstraint(
+                        fields=("user", "id"), name="ledger_account_user_id_uniq"
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="transaction",
+                    index=models.Index(
+                        fields=["user", "account", "booked_at"],
+                        name="ledger_tx_user_account_booked",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="transaction",
+                    index=django.contrib.postgres.indexes.BrinIndex(
+                        fields=["booked_at"], name="ledger_tx_booked_brin"
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='import_hash',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(import_hash__isnull=False), fields=('account', 'import_hash', 'booked_at'), name='ledger_tx_import_hash_uniq'),
+        ),
+    ]
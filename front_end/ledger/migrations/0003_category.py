@@ -0,0 +1,149 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Written by hand like 0001: a category's parent is a composite foreign key,
+# so a tree never spans users. Categories cascade to their subtrees and set
+# their transactions' category to null, in the database.
+SCHEMA = """
+CREATE TABLE ledger_category (
+    id serial PRIMARY KEY,
+    user_id integer NOT NULL
+        REFERENCES registration_user (id) ON DELETE CASCADE
+        DEFERRABLE INITIALLY DEFERRED,
+    parent_id integer NULL,
+    name varchar(100) NOT NULL,
+    path text NOT NULL,
+    CONSTRAINT ledger_category_user_id_uniq UNIQUE (user_id, id),
+    CONSTRAINT ledger_category_parent_fk FOREIGN KEY (user_id, parent_id)
+        REFERENCES ledger_category (user_id, id) ON DELETE CASCADE
+        DEFERRABLE INITIALLY DEFERRED
+);
+
+CREATE UNIQUE INDEX ledger_category_root_name_uniq
+    ON ledger_category (user_id, name) WHERE parent_id IS NULL;
+CREATE UNIQUE INDEX ledger_category_child_name_uniq
+    ON ledger_category (parent_id, name) WHERE parent_id IS NOT NULL;
+CREATE INDEX ledger_category_path ON ledger_category (path text_pattern_ops);
+
+ALTER TABLE ledger_transaction ADD COLUMN category_id integer NULL
+    CONSTRAINT ledger_transaction_category_fk
+    REFERENCES ledger_category (id) ON DELETE SET NULL
+    DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX ledger_tx_category_booked ON ledger_transaction (category_id, booked_at)
+    WHERE category_id IS NOT NULL;
+"""
+
+UNDO = """
+DROP INDEX ledger_tx_category_booked;
+ALTER TABLE ledger_transaction DROP COLUMN category_id;
+DROP TABLE ledger_category;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("ledger", "0002_transaction_import_hash"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(SCHEMA, UNDO)],
+            state_operations=[
+                migrations.CreateModel(
+                    name="Category",
+                    fields=[
+                        (
+                            "id",
+                            models.AutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        ("name", models.CharField(max_length=100)),
+                        ("path", models.TextField(editable=False)),
+                        (
+                            "parent",
+                            models.ForeignKey(
+                                blank=True,
+                                db_constraint=False,
+                                db_index=False,
+                                null=True,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="children",
+                                to="ledger.category",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                db_index=False,
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="categories",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "verbose_name_plural": "categories",
+                    },
+                ),
+                migrations.AddField(
+                    model_name="transaction",
+                    name="category",
+                    field=models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="transactions",
+                        to="ledger.category",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="category",
+                    index=models.Index(
+                        fields=["path"],
+                        name="ledger_category_path",
+                        opclasses=["text_pattern_ops"],
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="transaction",
+                    index=models.Index(
+                        condition=models.Q(category__isnull=False),
+                        fields=["category", "booked_at"],
+                        name="ledger_tx_category_booked",
+                    ),
+                ),
+                migrations.AddConstraint(
+                    model_name="category",
+                    constraint=models.UniqueConstraint(
+                        fields=("user", "id"), name="ledger_category_user_id_uniq"
+                    ),
+                ),
+                migrations.AddConstraint(
+                    model_name="category",
+                    constraint=models.UniqueConstraint(
+                        condition=models.Q(parent__isnull=True),
+                        fields=("user", "name"),
+                        name="ledger_category_root_name_uniq",
+                    ),
+                ),
+                migrations.AddConstraint(
+                    model_name="category",
+                    constraint=models.UniqueConstraint(
+                        condition=models.Q(parent__isnull=False),
+                        fields=("parent", "name"),
+                        name="ledger_category_child_name_uniq",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Written by hand like 0001: a transaction's category is a composite foreign
+# key, so it's always one of its user's. Deleting the category sets only
+# category_id to null, which needs Postgres 15.
+MIN_VERSION = 150000
+SCHEMA = """
+ALTER TABLE ledger_transaction DROP CONSTRAINT ledger_transaction_category_fk;
+ALTER TABLE ledger_transaction ADD CONSTRAINT ledger_transaction_category_fk
+    FOREIGN KEY (user_id, category_id)
+    REFERENCES ledger_category (user_id, id) ON DELETE SET NULL (category_id)
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+UNDO = """
+ALTER TABLE ledger_transaction DROP CONSTRAINT ledger_transaction_category_fk;
+ALTER TABLE ledger_transaction ADD CONSTRAINT ledger_transaction_category_fk
+    FOREIGN KEY (category_id)
+    REFERENCES ledger_category (id) ON DELETE SET NULL
+    DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+def check_server_version(apps, schema_editor):
+    version = schema_editor.connection.pg_version
+    if version < MIN_VERSION:
+        raise RuntimeError(
+            "The ledger needs PostgreSQL 15 or newer, for ON DELETE SET NULL of "
+            f"one column, but the server runs {version // 10000}.{version % 10000}."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ledger", "0003_category"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_server_version, migrations.RunPython.noop),
+        migrations.RunSQL(SCHEMA, UNDO),
+    ]
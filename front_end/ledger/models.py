@@ -0,0 +1,299 @@
+"""
+Accounts and their transactions.
+
+Amounts are whole numbers of the currency's minor unit (pence for GBP), so
+sums are exact and a row stores a bigint rather than a numeric.
+
+The transaction table is partitioned by month on booked_at (see
+ledger/partitions.py), with a (user, account, booked_at) index and a BRIN
+index on booked_at in each partition. Queries that bound booked_at only
+touch the months in range, which keeps a user's range query fast however
+many transactions there are in total. Its primary key is (id, booked_at),
+as PostgreSQL requires of a partitioned table; ids are still unique.
+
+Imported transactions keep a hash of the statement line they came from
+(see ledger/statements.py). It's unique per account, so importing an
+overlapping statement again skips the lines already in the ledger.
+
+Categories form a tree per user, stored as a materialized path: a
+category's path is its ancestors' ids and its own, each followed by "/",
+e.g. "12/57/903/". Everything under a category is then the rows whose path
+starts with its path, a range scan of the text_pattern_ops index on path,
+so the transactions under a category are one join however deep the tree
+is (see TransactionQuerySet.under). Category.move() rewrites a subtree's
+paths with a single UPDATE.
+
+The foreign keys are declared by the migrations and cascade in the
+database: a transaction's (user, account) references the account's
+(user, id), so a transaction always belongs to its account's user and
+deleting an account finds its transactions through the composite index.
+Django is told to do nothing, so it doesn't scan for them itself.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connection, models, transaction
+from django.db.models import Case, F, Func, IntegerField, Sum, Value, When
+from django.db.models.functions import Cast, Concat, NullIf, Substr
+
+# The first key of the advisory lock that orders changes to a user's tree,
+# "tree" in ASCII
+TREE_LOCK = 0x74726565
+
+
+class Account(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="accounts",
+    )
+    name = models.CharField(max_length=100)
+    currency = models.CharField(max_length=3, default="GBP")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves the user's accounts
+            models.UniqueConstraint(
+                fields=["user", "name"], name="ledger_account_user_name_uniq"
+            ),
+            # Referenced by ledger_transaction's (user_id, account_id)
+            models.UniqueConstraint(
+                fields=["user", "id"], name="ledger_account_user_id_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+def lock_tree(user_id):
+    """
+    Take the transaction-level lock on ``user_id``'s category tree, so a
+    category isn't added under a subtree while its paths are rewritten.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [TREE_LOCK, user_id])
+
+
+class CategoryQuerySet(models.QuerySet):
+    def subtree(self, category):
+        """``category`` and every category under it."""
+        return self.filter(path__startswith=category.path)
+
+
+class Category(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="categories",
+    )
+    # The database deletes a category's subtree with it. Change it with
+    # move(), which keeps the paths in step, rather than save().
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        related_name="children",
+    )
+    name = models.CharField(max_length=100)
+    # Set when the category is created, see the module docstring
+    path = models.TextField(editable=False)
+
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "categories"
+        indexes = [
+            models.Index(
+                fields=["path"],
+                opclasses=["text_pattern_ops"],
+                name="ledger_category_path",
+            ),
+        ]
+        constraints = [
+            # Referenced by the parent's (user_id, parent_id), so a tree
+            # never spans users
+            models.UniqueConstraint(
+                fields=["user", "id"], name="ledger_category_user_id_uniq"
+            ),
+            models.UniqueConstraint(
+                fields=["user", "name"],
+                condition=models.Q(parent__isnull=True),
+                name="ledger_category_root_name_uniq",
+            ),
+            # Also serves the children of a category
+            models.UniqueConstraint(
+                fields=["parent", "name"],
+                condition=models.Q(parent__isnull=False),
+                name="ledger_category_child_name_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def depth(self):
+        """0 for a top-level category, 1 for its children and so on."""
+        return self.path.count("/") - 1
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            return super().save(*args, **kwargs)
+        # The path ends with the id, which the insert assigns
+        with transaction.atomic():
+            lock_tree(self.user_id)
+            prefix = ""
+            if self.parent_id is not None:
+                prefix = Category.objects.values_list("path", flat=True).get(
+                    pk=self.parent_id
+                )
+            self.path = ""
+            super().save(*args, **kwargs)
+            self.path = f"{prefix}{self.pk}/"
+            Category.objects.filter(pk=self.pk).update(path=self.path)
+
+    def move(self, parent):
+        """
+        Move this category, and everything under it, under ``parent``, or
+        to the top of the tree if ``parent`` is None.
+        """
+        if parent is not None and parent.user_id != self.user_id:
+            raise ValueError("Categories can only move within their user's tree.")
+        with transaction.atomic():
+            lock_tree(self.user_id)
+            old = Category.objects.values_list("path", flat=True).get(pk=self.pk)
+            prefix = ""
+            if parent is not None:
+                prefix = Category.objects.values_list("path", flat=True).get(
+                    pk=parent.pk
+                )
+                if prefix.startswith(old):
+                    raise ValueError(f"{parent} is under {self}.")
+            self.path = f"{prefix}{self.pk}/"
+            Category.objects.filter(path__startswith=old).update(
+                path=Concat(Value(self.path), Substr("path", len(old) + 1)),
+                parent=Case(
+                    When(pk=self.pk, then=Value(parent and parent.pk)),
+                    default=F("parent"),
+                ),
+            )
+        self.parent = parent
+
+
+class TransactionQuerySet(models.QuerySet):
+    def booked_between(self, user, start, end, account=None):
+        """
+        ``user``'s transactions booked from ``start`` up to (not including)
+        ``end``, in one ``account`` if given, newest first.
+        """
+        transactions = self.filter(user=user, booked_at__gte=start, booked_at__lt=end)
+        if account is not None:
+            transactions = transactions.filter(account=account)
+        return transactions.order_by("-booked_at", "-id")
+
+    def under(self, category):
+        """The transactions in ``category`` or any category under it."""
+        return self.filter(
+            user=category.user_id, category__path__startswith=category.path
+        )
+
+    def rollup(self, category):
+        """
+        Total the amounts of the transactions under ``category`` by which of
+        its children they're under, in one query. Returns a dict of totals
+        by category id, where ``category``'s own id totals the transactions
+        in ``category`` itself.
+        """
+        # The id after category's own in a path, "" for category itself
+        branch = Cast(
+            NullIf(
+                Func(
+                    F("category__path"),
+                    Value("/"),
+                    Value(category.depth + 2),
+                    function="split_part",
+                ),
+                Value(""),
+            ),
+            IntegerField(),
+        )
+        totals = (
+            self.under(category)
+            .order_by()
+            .values_list(branch)
+            .annotate(total=Sum("amount"))
+        )
+        return {(pk or category.pk): total for pk, total in totals}
+
+
+class Transaction(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    # The account's user, repeated so a user's range query needs no join
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="transactions",
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        related_name="transactions",
+    )
+    # One of the user's categories, set to null when it's deleted
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        related_name="transactions",
+    )
+    booked_at = models.DateTimeField()
+    # In minor units of the account's currency, negative for spending
+    amount = models.BigIntegerField()
+    description = models.CharField(max_length=200, blank=True)
+    import_hash = models.UUIDField(null=True, blank=True, editable=False)
+
+    objects = TransactionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "account", "booked_at"],
+                name="ledger_tx_user_account_booked",
+            ),
+            BrinIndex(fields=["booked_at"], name="ledger_tx_booked_brin"),
+            # A category's transactions, for rollups and for setting them
+            # to null when the category is deleted
+            models.Index(
+                fields=["category", "booked_at"],
+                condition=models.Q(category__isnull=False),
+                name="ledger_tx_category_booked",
+            ),
+        ]
+        constraints = [
+            # A unique index on a partitioned table must include booked_at,
+            # which the hash covers anyway
+            models.UniqueConstraint(
+                fields=["account", "import_hash", "booked_at"],
+                condition=models.Q(import_hash__isnull=False),
+                name="ledger_tx_import_hash_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.booked_at:%Y-%m-%d} {self.amount}"
@@ -0,0 +1,91 @@
+"""
+Monthly partitions of ledger_transaction.
+
+Each calendar month (UTC) of booked_at has a partition named
+ledger_transaction_YYYYMM. Rows outside the months created so far land in
+ledger_transaction_default, so inserts never fail, but queries on those
+months can't be pruned. ``manage.py ledger_partitions`` creates the coming
+months ahead of time and moves rows out of the default partition into the
+months it creates.
+"""
+
+import datetime
+
+from django.db import connections, transaction
+
+TABLE = "ledger_transaction"
+DEFAULT = f"{TABLE}_default"
+
+
+def month_start(moment):
+    """The first instant of the UTC month of ``moment`` (a date or datetime)."""
+    if isinstance(moment, datetime.datetime):
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(datetime.timezone.utc)
+        moment = moment.date()
+    return datetime.datetime(moment.year, moment.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def next_month(start):
+    return (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def months(first, last):
+    """The starts of the months from ``first``'s to ``last``'s, inclusive."""
+    start, last = month_start(first), month_start(last)
+    while start <= last:
+        yield start
+        start = next_month(start)
+
+
+def partition_name(start):
+    return f"{TABLE}_{start:%Y%m}"
+
+
+def existing_partitions(using="default"):
+    """The names of ledger_transaction's partitions, default included."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        return {name for (name,) in cursor.fetchall()}
+
+
+def create_partitions(first, last, using="default"):
+    """
+    Create the missing partitions for the months from ``first``'s to
+    ``last``'s and return their names. Rows of those months in the default
+    partition are moved into them.
+    """
+    existing = existing_partitions(using)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    created = []
+    for start in months(first, last):
+        name = partition_name(start)
+        if name in existing:
+            continue
+        end = next_month(start)
+        # Attaching checks that the default partition has no rows for the
+        # month, so they are moved into the new table first
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} "
+                f"(LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(DEFAULT)} "
+                "WHERE booked_at >= %s AND booked_at < %s RETURNING *) "
+                f"INSERT INTO {quote(name)} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(name)} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        created.append(name)
+    return created
@@ -0,0 +1,372 @@
+"""
+Streaming import of bank statements in CSV, OFX and QIF. The upload view
+saves the file with save_upload() and queues an import_file() job.
+
+The readers are generators yielding one line's raw fields at a time, and
+the importer copies them into the ledger a batch at a time, so memory use
+doesn't grow with the size of the statement. Each batch is copied into a
+temporary table and inserted from there with ON CONFLICT DO NOTHING.
+
+Each line gets a content hash of its date, amount and description, plus how
+many identical lines came before it on that day, so two identical coffees
+are both imported but importing the same or an overlapping statement again
+skips what's already there. The ledger_tx_import_hash_uniq index does the
+comparison, not a set of the hashes seen. A statement sorted by posting
+date can list a transaction date's lines apart, so the counts are kept for
+every day within OCCURRENCE_WINDOW of the line being read, in either
+direction. A line of a day whose counts were dropped is reported as invalid
+rather than risk taking it for a duplicate.
+
+Amounts have up to two decimal places after a point, in the account's
+currency; one with a decimal comma is reported rather than read as a
+hundred times as much. Dates are ISO (2026-01-31) or day first (31/01/2026,
+31/01/26, 31/01'26 in QIF).
+"""
+import csv
+import datetime
+import decimal
+import functools
+import hashlib
+import io
+import itertools
+import os
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ledger import partitions
+from ledger.models import Account, Transaction
+from registration.userio import batched, max_rss
+
+IMPORT_TABLE = "ledger_transaction_import"
+FORMATS = ("csv", "ofx", "qif")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%Y%m%d")
+DESCRIPTION_LENGTH = Transaction._meta.get_field("description").max_length
+# Unreadable lines listed in an import's result; the rest are only counted
+MAX_ERRORS = 5
+# How far apart in date a day's lines can be in a statement
+OCCURRENCE_WINDOW = datetime.timedelta(days=31)
+
+# Header names a bank might use for each column of a CSV statement
+CSV_COLUMNS = {
+    "date": ("date", "transaction date", "booked", "posting date"),
+    "amount": ("amount", "value"),
+    "description": ("description", "payee", "name", "narrative", "memo"),
+}
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+# Currency signs and spaces in an amount
+AMOUNT_NOISE = re.compile(r"[^\d.,+-]")
+# A comma before the last one or two digits, as in 12,50, is a decimal
+# comma rather than a thousands separator
+DECIMAL_COMMA = re.compile(r",\d{1,2}$")
+
+
+def infer_format(name):
+    extension = name.rpartition(".")[2].lower()
+    return extension if extension in FORMATS else "csv"
+
+
+def read_csv(file):
+    """Yield the line number and fields of each row of a CSV with a header."""
+    reader = csv.reader(file, skipinitialspace=True)
+    header = [name.strip().lower() for name in next(reader, [])]
+    columns = {}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in header:
+                columns[field] = header.index(name)
+                break
+    missing = set(CSV_COLUMNS) - set(columns)
+    if missing:
+        raise ValueError(f"The header has no {' or '.join(sorted(missing))} column.")
+    for row in reader:
+        if any(row):
+            fields = {
+                field: row[index] if index < len(row) else ""
+                for field, index in columns.items()
+            }
+            yield reader.line_num, fields
+
+
+def _chunks(file, size=65536):
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_ofx(file):
+    """
+    Yield the number and fields of each <STMTTRN> of an OFX statement,
+    either SGML (OFX 1, where closing tags are optional) or XML (OFX 2).
+    The file is read in chunks, as some banks put it all on one line.
+    """
+    number, fields, partial = 0, None, ""
+    for text in itertools.chain(_chunks(file), [None]):
+        if text is None:
+            text, partial = partial, ""
+        else:
+            # Keep an unfinished tag, and its value, for the next chunk
+            text = partial + text
+            cut = max(text.rfind("<"), 0)
+            text, partial = text[:cut], text[cut:]
+        for closing, tag, value in OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if fields is not None:
+                    yield number, _ofx_fields(fields)
+                    fields = None
+                if not closing:
+                    number += 1
+                    fields = {}
+            elif fields is not None and not closing:
+                fields[tag] = value.strip()
+    if fields is not None:
+        yield number, _ofx_fields(fields)
+
+
+def _ofx_fields(fields):
+    return {
+        # DTPOSTED is YYYYMMDD, optionally followed by a time and zone
+        "date": fields.get("DTPOSTED", "")[:8],
+        "amount": fields.get("TRNAMT", "").replace(",", "."),
+        "description": fields.get("NAME") or fields.get("MEMO", ""),
+    }
+
+
+def read_qif(file):
+    """
+    Yield the first line number and the fields of each record of a QIF
+    statement. Records end with a ^ line, the last one optionally.
+    """
+    start, fields = None, {}
+    for number, line in enumerate(file, 1):
+        code, value = line[:1], line[1:].strip()
+        if code == "^":
+            if fields:
+                yield start, _qif_fields(fields)
+            start, fields = None, {}
+        elif code and code in "DTUPM":
+            start = start or number
+            fields.setdefault(code, value)
+    if fields:
+        yield start, _qif_fields(fields)
+
+
+def _qif_fields(fields):
+    return {
+        "date": fields.get("D", "").replace("'", "/").replace(" ", ""),
+        "amount": fields.get("T") or fields.get("U", ""),
+        "description": fields.get("P") or fields.get("M", ""),
+    }
+
+
+READERS = {"csv": read_csv, "ofx": read_ofx, "qif": read_qif}
+
+
+def read_statement(file, format):
+    return READERS[format](file)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text):
+    """A statement spans few days, so most lines' dates are in the cache."""
+    text = text.strip()
+    for format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"'{text}' is not a date")
+
+
+def parse_amount(text):
+    """Parse an amount such as -1,234.56 or £12 into minor units (pence)."""
+    number = AMOUNT_NOISE.sub("", text)
+    if DECIMAL_COMMA.search(number):
+        raise ValueError(f"'{text.strip()}' has a decimal comma, not a point")
+    try:
+        amount = decimal.Decimal(number.replace(",", "")) * 100
+    except decimal.InvalidOperation:
+        raise ValueError(f"'{text.strip()}' is not an amount") from None
+    if amount != amount.to_integral_value():
+        raise ValueError(f"'{text.strip()}' has more than two decimal places")
+    return int(amount)
+
+
+def line_hash(date, amount, description, occurrence):
+    """A 128-bit hash of a line, as the hex digits of an import_hash uuid."""
+    content = f"{date.isoformat()}\x1f{amount}\x1f{description}\x1f{occurrence}"
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class StatementImporter:
+    """
+    Import the lines of a statement into ``account``, ``batch_size`` lines
+    per COPY. Missing monthly partitions are created for the months a batch
+    covers, so a years-long statement doesn't fill the default partition.
+    """
+
+    def __init__(self, account, batch_size=10000, on_error=None, on_batch=None):
+        self.account = account
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.on_batch = on_batch
+        self.stats = dict.fromkeys(["read", "imported", "duplicates", "invalid"], 0)
+        self.months = set()
+        self.day = None
+        # Per day, how many of each (amount, description) were read
+        self.occurrences = {}
+        self.forgotten = set()
+
+    def run(self, lines):
+        start = time.perf_counter()
+        self._create_import_table()
+        for batch in batched(lines, self.batch_size):
+            self._import_batch(batch)
+            if self.on_batch is not None:
+                self.on_batch(self.stats)
+        self.stats["seconds"] = time.perf_counter() - start
+        self.stats["max_rss"] = max_rss()
+        return self.stats
+
+    def _error(self, line, message):
+        self.stats["invalid"] += 1
+        if self.on_error is not None:
+            self.on_error(line, message)
+
+    def _clean(self, batch):
+        cleaned = []
+        for number, fields in batch:
+            self.stats["read"] += 1
+            try:
+                date = parse_date(fields.get("date", ""))
+                amount = parse_amount(fields.get("amount", ""))
+            except ValueError as e:
+                self._error(number, str(e))
+                continue
+            description = " ".join(fields.get("description", "").split())
+            description = description[:DESCRIPTION_LENGTH]
+            if date != self.day:
+                self.day = date
+                self._forget_days_apart_from(date)
+            if date in self.forgotten:
+                self._error(
+                    number,
+                    f"{date.isoformat()} is more than {OCCURRENCE_WINDOW.days} days "
+                    "apart from lines before it, sort the statement by date",
+                )
+                continue
+            counts = self.occurrences.setdefault(date, {})
+            key = (amount, description)
+            occurrence = counts.get(key, 0)
+            counts[key] = occurrence + 1
+            cleaned.append(
+                (
+                    date,
+                    amount,
+                    description,
+                    line_hash(date, amount, description, occurrence),
+                )
+            )
+        return cleaned
+
+    def _forget_days_apart_from(self, date):
+        for day in list(self.occurrences):
+            if abs(day - date) > OCCURRENCE_WINDOW:
+                del self.occurrences[day]
+                self.forgotten.add(day)
+
+    def _create_partitions(self, cleaned):
+        first = min(date for date, *_ in cleaned)
+        last = max(date for date, *_ in cleaned)
+        first, last = (
+            timezone.make_aware(datetime.datetime.combine(day, datetime.time()))
+            for day in (first, last)
+        )
+        needed = set(partitions.months(first, last))
+        if not needed <= self.months:
+            partitions.create_partitions(first, last)
+            self.months |= needed
+
+    def _import_batch(self, batch):
+        cleaned = self._clean(batch)
+        if not cleaned:
+            return
+        self._create_partitions(cleaned)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(cleaned)
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {IMPORT_TABLE}")
+            cursor.copy_expert(
+                f"COPY {IMPORT_TABLE} FROM STDIN "
+                "WITH (FORMAT csv, FORCE_NOT_NULL (description))",
+                buffer,
+            )
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(user_id, account_id, booked_at, amount, description, import_hash) "
+                "SELECT %s, %s, booked_on::timestamp AT TIME ZONE %s, amount, "
+                f"description, import_hash FROM {IMPORT_TABLE} "
+                "ON CONFLICT DO NOTHING",
+                [self.account.user_id, self.account.pk, settings.TIME_ZONE],
+            )
+            imported = cursor.rowcount
+        self.stats["imported"] += imported
+        self.stats["duplicates"] += len(cleaned) - imported
+
+    def _create_import_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {IMPORT_TABLE} ("
+                "booked_on date, amount bigint, description varchar(200), "
+                "import_hash uuid)"
+            )
+
+
+def save_upload(upload, format):
+    """Save an uploaded statement in STATEMENT_UPLOAD_DIR and return its path."""
+    directory = os.path.abspath(settings.STATEMENT_UPLOAD_DIR)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.{format}")
+    with open(path, "wb") as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    return path
+
+
+def import_file(job, account_id, path, format):
+    """
+    Job handler importing a statement saved by save_upload(). Retrying it
+    is safe, as the lines imported so far are skipped. The file is removed
+    once it's imported, or after the job's last attempt.
+    """
+    account = Account.objects.get(pk=account_id)
+    errors = []
+
+    def on_error(line, message):
+        if len(errors) < MAX_ERRORS:
+            errors.append([line, message])
+
+    importer = StatementImporter(
+        account, on_error=on_error, on_batch=lambda stats: job.report(**stats)
+    )
+    try:
+        with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+            stats = importer.run(read_statement(f, format))
+    except Exception:
+        if job.last_attempt:
+            os.remove(path)
+        raise
+    os.remove(path)
+    return {**stats, "errors": errors}
@@ -0,0 +1,174 @@
+import datetime
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+
+from ledger import partitions
+from ledger.models import Account, Category, Transaction
+from registration.models import User
+
+UTC = datetime.timezone.utc
+
+
+def moment(year, month, day=1):
+    return datetime.datetime(year, month, day, 12, tzinfo=UTC)
+
+
+class TestCategories(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        partitions.create_partitions(moment(2026, 2), moment(2026, 4))
+        cls.user = User.objects.create_user(
+            email="categories@example.com", password="abcd12efgh"
+        )
+        cls.other = User.objects.create_user(
+            email="othercategories@example.com", password="abcd12efgh"
+        )
+        cls.account = Account.objects.create(user=cls.user, name="Current")
+        cls.food = Category.objects.create(user=cls.user, name="Food")
+        cls.groceries = Category.objects.create(
+            user=cls.user, parent=cls.food, name="Groceries"
+        )
+        cls.eating_out = Category.objects.create(
+            user=cls.user, parent=cls.food, name="Eating out"
+        )
+        cls.coffee = Category.objects.create(
+            user=cls.user, parent=cls.eating_out, name="Coffee"
+        )
+        cls.travel = Category.objects.create(user=cls.user, name="Travel")
+        spending = [
+            (cls.food, -100),
+            (cls.groceries, -2000),
+            (cls.coffee, -350),
+            (cls.coffee, -300),
+            (cls.eating_out, 1000),
+            (cls.travel, -5000),
+            (None, -7),
+        ]
+        for month in (2, 3, 4):
+            for category, amount in spending:
+                Transaction.objects.create(
+                    user=cls.user,
+                    account=cls.account,
+                    category=category,
+                    booked_at=moment(2026, month, 15),
+                    amount=amount,
+                )
+
+    def in_march(self):
+        return Transaction.objects.filter(
+            booked_at__gte=moment(2026, 3), booked_at__lt=moment(2026, 4)
+        )
+
+    def test_paths(self):
+        self.assertEqual(self.food.path, f"{self.food.pk}/")
+        self.assertEqual(
+            self.coffee.path,
+            f"{self.food.pk}/{self.eating_out.pk}/{self.coffee.pk}/",
+        )
+        self.assertEqual((self.food.depth, self.coffee.depth), (0, 2))
+        self.assertEqual(
+            set(Category.objects.subtree(self.eating_out)),
+            {self.eating_out, self.coffee},
+        )
+
+    def test_spent_under_a_category_in_a_month(self):
+        spent = self.in_march().under(self.food).filter(amount__lt=0)
+        with self.assertNumQueries(1):
+            total = spent.aggregate(total=Sum("amount"))["total"]
+        self.assertEqual(total, -2750)
+        self.assertEqual(
+            self.in_march().under(self.coffee).aggregate(Sum("amount")),
+            {"amount__sum": -650},
+        )
+
+    def test_subtree_queries_use_the_path_index(self):
+        connection.cursor().execute("SET LOCAL enable_seqscan = off")
+        plan = self.in_march().under(self.food).explain()
+        self.assertIn("ledger_category_path", plan)
+
+    def test_rollup(self):
+        with self.assertNumQueries(1):
+            totals = self.in_march().rollup(self.food)
+        self.assertEqual(
+            totals,
+            {self.food.pk: -100, self.groceries.pk: -2000, self.eating_out.pk: 350},
+        )
+        self.assertEqual(self.in_march().rollup(self.coffee), {self.coffee.pk: -650})
+
+    def test_move(self):
+        # Fetched again, as move() updates the instance
+        eating_out = Category.objects.get(pk=self.eating_out.pk)
+        # The lock, both paths and one UPDATE, however big the subtree, in a
+        # savepoint
+        with self.assertNumQueries(6):
+            eating_out.move(self.travel)
+        self.assertEqual(eating_out.parent, self.travel)
+        coffee = Category.objects.get(pk=self.coffee.pk)
+        self.assertEqual(coffee.path, f"{self.travel.pk}/{eating_out.pk}/{coffee.pk}/")
+        self.assertEqual(
+            Category.objects.get(pk=eating_out.pk).parent_id, self.travel.pk
+        )
+        self.assertEqual(
+            self.in_march().rollup(self.travel),
+            {self.travel.pk: -5000, eating_out.pk: 350},
+        )
+
+        eating_out.move(None)
+        self.assertEqual(
+            Category.objects.get(pk=coffee.pk).path, f"{eating_out.pk}/{coffee.pk}/"
+        )
+        self.assertIsNone(Category.objects.get(pk=eating_out.pk).parent)
+
+    def test_move_under_itself(self):
+        with self.assertRaisesMessage(ValueError, "Coffee is under Eating out."):
+            self.eating_out.move(self.coffee)
+        with self.assertRaisesMessage(ValueError, "within their user's tree"):
+            self.food.move(Category.objects.create(user=self.other, name="Food"))
+
+    def test_sibling_names_are_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Category.objects.create(user=self.user, name="Food")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Category.objects.create(user=self.user, parent=self.food, name="Groceries")
+        Category.objects.create(user=self.user, parent=self.travel, name="Groceries")
+        Category.objects.create(user=self.other, name="Food")
+
+    def test_deletes_cascade_in_the_database(self):
+        owned = Transaction.objects.filter(user=self.user).count()
+        Category.objects.filter(pk=self.eating_out.pk).delete()
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        self.assertFalse(Category.objects.filter(pk=self.coffee.pk).exists())
+        self.assertEqual(Transaction.objects.filter(category__isnull=True).count(), 12)
+        self.assertEqual(Transaction.objects.count(), 21)
+        # Only the category is cleared
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), owned)
+
+    def test_transaction_category_must_be_the_users(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=Category.objects.create(user=self.other, name="Food"),
+                booked_at=moment(2026, 3, 5),
+                amount=-100,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+class TestCategoryMigration(SimpleTestCase):
+    def test_needs_postgres_15(self):
+        migration = import_module("ledger.migrations.0004_transaction_category_fk")
+
+        def check(version):
+            connection = SimpleNamespace(pg_version=version)
+            migration.check_server_version(None, SimpleNamespace(connection=connection))
+
+        check(150000)
+        with self.assertRaisesMessage(RuntimeError, "the server runs 14.10"):
+            check(140010)
@@ -0,0 +1,89 @@
+import datetime
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from ledger import partitions
+from ledger.models import Account, Transaction
+from registration.models import User
+
+UTC = datetime.timezone.utc
+
+
+def moment(year, month, day=1):
+    return datetime.datetime(year, month, day, 12, tzinfo=UTC)
+
+
+class TestLedger(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        partitions.create_partitions(moment(2026, 1), moment(2026, 6))
+        cls.user = User.objects.create_user(
+            email="ledger@example.com", password="abcd12efgh"
+        )
+        cls.other = User.objects.create_user(
+            email="other@example.com", password="abcd12efgh"
+        )
+        cls.current = Account.objects.create(user=cls.user, name="Current")
+        cls.savings = Account.objects.create(user=cls.user, name="Savings")
+        cls.others = Account.objects.create(user=cls.other, name="Current")
+        for month in range(1, 7):
+            for account in (cls.current, cls.savings, cls.others):
+                Transaction.objects.create(
+                    user=account.user,
+                    account=account,
+                    booked_at=moment(2026, month, 10),
+                    amount=-1250 * month,
+                )
+
+    def test_booked_between(self):
+        transactions = Transaction.objects.booked_between(
+            self.user, moment(2026, 2), moment(2026, 4)
+        )
+        with self.assertNumQueries(1):
+            rows = list(transactions)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row.booked_at.month for row in rows], [3, 3, 2, 2])
+        self.assertEqual(
+            Transaction.objects.booked_between(
+                self.user, moment(2026, 1), moment(2026, 7), account=self.savings
+            ).count(),
+            6,
+        )
+
+    def test_range_queries_prune_partitions(self):
+        transactions = Transaction.objects.booked_between(
+            self.user, moment(2026, 2, 15), moment(2026, 3, 15)
+        )
+        plan = transactions.explain()
+        self.assertIn("ledger_transaction_202602", plan)
+        self.assertIn("ledger_transaction_202603", plan)
+        self.assertNotIn("ledger_transaction_202601", plan)
+        self.assertNotIn("ledger_transaction_default", plan)
+
+    def test_amounts_are_integers(self):
+        transaction_ = Transaction.objects.filter(account=self.current).first()
+        self.assertIsInstance(transaction_.amount, int)
+
+    def test_transaction_user_must_own_the_account(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Transaction.objects.create(
+                user=self.other,
+                account=self.current,
+                booked_at=moment(2026, 1, 5),
+                amount=100,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    def test_deletes_cascade_in_the_database(self):
+        # Fetched again, as delete() clears the primary key of the instance
+        Account.objects.get(pk=self.savings.pk).delete()
+        self.assertFalse(
+            Transaction.objects.filter(account_id=self.savings.pk).exists()
+        )
+        self.assertTrue(Transaction.objects.filter(account=self.current).exists())
+        User.objects.get(pk=self.user.pk).delete()
+        self.assertFalse(Account.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(Transaction.objects.filter(user_id=self.user.pk).exists())
+        self.assertEqual(Transaction.objects.count(), 6)
@@ -0,0 +1,109 @@
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+
+from ledger import partitions
+from ledger.models import Account, Category, Transaction
+from registration.models import User
+
+UTC = datetime.timezone.utc
+
+
+class TestPartitions(TestCase):
+    def test_months(self):
+        self.assertEqual(
+            [
+                f"{start:%Y-%m}"
+                for start in partitions.months(
+                    datetime.date(2025, 11, 30),
+                    datetime.datetime(2026, 2, 1, tzinfo=UTC),
+                )
+            ],
+            ["2025-11", "2025-12", "2026-01", "2026-02"],
+        )
+
+    def test_create_partitions_moves_rows_out_of_the_default(self):
+        user = User.objects.create_user(
+            email="parts@example.com", password="abcd12efgh"
+        )
+        account = Account.objects.create(user=user, name="Current")
+        booked_at = datetime.datetime(2030, 5, 17, tzinfo=UTC)
+        Transaction.objects.create(
+            user=user, account=account, booked_at=booked_at, amount=-500
+        )
+
+        created = partitions.create_partitions(booked_at, booked_at)
+        self.assertEqual(created, ["ledger_transaction_203005"])
+        self.assertIn("ledger_transaction_203005", partitions.existing_partitions())
+        self.assertEqual(partitions.create_partitions(booked_at, booked_at), [])
+        self.assertEqual(Transaction.objects.get().booked_at, booked_at)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command("ledger_partitions", since="2020-11", stdout=stdout)
+        existing = partitions.existing_partitions()
+        now = partitions.month_start(timezone.now())
+        for start in partitions.months(datetime.date(2020, 11, 1), now):
+            self.assertIn(partitions.partition_name(start), existing)
+        self.assertIn(f"{len(existing) - 1} partition(s) created", stdout.getvalue())
+        with self.assertRaisesMessage(CommandError, "YYYY-MM"):
+            call_command("ledger_partitions", since="November")
+
+
+class TestGenerateTransactions(TestCase):
+    def test_generate_and_delete(self):
+        with self.assertRaisesMessage(CommandError, "generate_users"):
+            call_command("generate_transactions", count=10, prefix="ledgergen")
+        call_command("generate_users", count=4, prefix="ledgergen", stdout=StringIO())
+        call_command(
+            "generate_transactions",
+            count=100,
+            prefix="ledgergen",
+            accounts=2,
+            months=3,
+            batch_size=40,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Account.objects.count(), 8)
+        self.assertEqual(Transaction.objects.count(), 100)
+        # Spread over the accounts, each booked by the account's user
+        self.assertEqual(Transaction.objects.values("account").distinct().count(), 8)
+        self.assertFalse(Transaction.objects.exclude(user=F("account__user")).exists())
+        self.assertFalse(
+            Transaction.objects.filter(
+                booked_at__lt=partitions.month_start(
+                    Transaction.objects.latest("booked_at").booked_at
+                )
+                - datetime.timedelta(days=93)
+            ).exists()
+        )
+
+        self.assertFalse(Transaction.objects.filter(category__isnull=False).exists())
+
+        # Users with categories get their transactions spread over them
+        user = User.objects.filter(email__startswith="ledgergen").first()
+        food = Category.objects.create(user=user, name="Food")
+        Category.objects.create(user=user, parent=food, name="Coffee")
+        call_command(
+            "generate_transactions",
+            count=150,
+            prefix="ledgergen",
+            categorized=True,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Transaction.objects.count(), 150)
+        categorized = Transaction.objects.filter(category__isnull=False)
+        self.assertEqual(categorized.values("category").distinct().count(), 2)
+        self.assertFalse(categorized.exclude(user=user).exists())
+        call_command(
+            "generate_transactions",
+            count=0,
+            prefix="ledgergen",
+            delete=True,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Transaction.objects.count(), 0)
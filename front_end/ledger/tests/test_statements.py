@@ -0,0 +1,303 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+from ledger import partitions, statements
+from ledger.models import Account, Transaction
+from registration.models import User
+
+CSV = """Date,Description,Amount
+2026-01-30,Coffee,-2.50
+30/01/2026,Coffee,-2.50
+31/01/2026,  Salary  , "1,500.00"
+31/01/2026,Broken,twelve
+01/02/26,Rent,-750
+"""
+
+OFX = (
+    "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>"
+    "<BANKTRANLIST><STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260130120000[0:GMT]"
+    "<TRNAMT>-2,50<FITID>1<NAME>Coffee</STMTTRN>"
+    "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260131<TRNAMT>1500.00<FITID>2"
+    "<MEMO>Salary</STMTTRN></BANKTRANLIST></STMTRS></STMTTRNRS>"
+    "</BANKMSGSRSV1></OFX>"
+)
+
+QIF = """!Type:Bank
+D30/01'26
+T-2.50
+PCoffee
+^
+D31/01/2026
+T1,500.00
+MSalary
+^
+"""
+
+
+class SmallReads(io.StringIO):
+    """A file whose reads return a few characters, splitting tags."""
+
+    def read(self, size=-1):
+        return super().read(7)
+
+
+class TestReaders(SimpleTestCase):
+    def test_csv(self):
+        lines = list(statements.read_statement(io.StringIO(CSV), "csv"))
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(
+            lines[2],
+            (
+                4,
+                {
+                    "date": "31/01/2026",
+                    "amount": "1,500.00",
+                    "description": "Salary  ",
+                },
+            ),
+        )
+
+    def test_csv_needs_the_columns(self):
+        with self.assertRaisesMessage(ValueError, "no amount or date column"):
+            list(statements.read_csv(io.StringIO("Payee,Balance\nx,1\n")))
+
+    def test_ofx(self):
+        expected = [
+            (1, {"date": "20260130", "amount": "-2.50", "description": "Coffee"}),
+            (2, {"date": "20260131", "amount": "1500.00", "description": "Salary"}),
+        ]
+        self.assertEqual(list(statements.read_ofx(io.StringIO(OFX))), expected)
+        self.assertEqual(list(statements.read_ofx(SmallReads(OFX))), expected)
+
+    def test_qif(self):
+        self.assertEqual(
+            list(statements.read_qif(io.StringIO(QIF))),
+            [
+                (2, {"date": "30/01/26", "amount": "-2.50", "description": "Coffee"}),
+                (
+                    6,
+                    {
+                        "date": "31/01/2026",
+                        "amount": "1,500.00",
+                        "description": "Salary",
+                    },
+                ),
+            ],
+        )
+
+    def test_parse(self):
+        self.assertEqual(statements.parse_amount("£-1,234.5"), -123450)
+        self.assertEqual(statements.parse_amount("+12"), 1200)
+        self.assertEqual(statements.parse_amount("1,234,567"), 123456700)
+        for amount in ("", "twelve", "1.234"):
+            with self.assertRaises(ValueError):
+                statements.parse_amount(amount)
+        # Not 125000 or 1234560 pence
+        for amount in ("12,50", "-1.234,56 €", "3,5"):
+            with self.assertRaisesMessage(ValueError, "has a decimal comma"):
+                statements.parse_amount(amount)
+        for date in ("2026-01-31", "31/01/2026", "31/01/26", "20260131"):
+            self.assertEqual(statements.parse_date(date), datetime.date(2026, 1, 31))
+        with self.assertRaisesMessage(ValueError, "not a date"):
+            statements.parse_date("01/31/2026")
+
+    def test_infer_format(self):
+        self.assertEqual(statements.infer_format("2026.OFX"), "ofx")
+        self.assertEqual(statements.infer_format("export.txt"), "csv")
+
+
+class TestStatementImporter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="statements@example.com", password="abcd12efgh"
+        )
+        cls.account = Account.objects.create(user=cls.user, name="Current")
+
+    def run_import(self, data, format="csv", **options):
+        errors = []
+        importer = statements.StatementImporter(
+            self.account, on_error=lambda *error: errors.append(error), **options
+        )
+        stats = importer.run(statements.read_statement(io.StringIO(data), format))
+        return stats, errors
+
+    def test_import(self):
+        stats, errors = self.run_import(CSV, batch_size=2)
+        self.assertEqual(stats["read"], 5)
+        self.assertEqual(stats["imported"], 4)
+        self.assertEqual(stats["duplicates"], 0)
+        self.assertEqual(errors, [(5, "'twelve' is not an amount")])
+        # Identical lines on a day are different transactions
+        self.assertEqual(
+            list(
+                Transaction.objects.filter(account=self.account)
+                .order_by("booked_at", "id")
+                .values_list("amount", "description")
+            ),
+            [(-250, "Coffee"), (-250, "Coffee"), (150000, "Salary"), (-75000, "Rent")],
+        )
+        salary = Transaction.objects.get(description="Salary")
+        self.assertEqual(
+            salary.booked_at,
+            datetime.datetime(2026, 1, 31, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(salary.user, self.user)
+        self.assertIsNotNone(salary.import_hash)
+        self.assertLessEqual(
+            {"ledger_transaction_202601", "ledger_transaction_202602"},
+            partitions.existing_partitions(),
+        )
+
+    def test_import_again_skips_imported_lines(self):
+        self.run_import(CSV)
+        stats, _ = self.run_import(CSV + "02/02/2026,Coffee,-2.50\n")
+        self.assertEqual(stats["imported"], 1)
+        self.assertEqual(stats["duplicates"], 4)
+        # The same lines from another format are the same transactions
+        stats, _ = self.run_import(OFX, "ofx")
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 5)
+
+    def test_identical_lines_apart_are_counted(self):
+        # Sorted by posting date, showing transaction dates
+        data = (
+            "Date,Description,Amount\n"
+            "2026-01-01,Coffee,-2.50\n"
+            "2026-01-02,Bus,-1.80\n"
+            "2026-01-01,Coffee,-2.50\n"
+            "2026-03-01,Rent,-750\n"
+            "2026-01-01,Coffee,-2.50\n"
+        )
+        stats, errors = self.run_import(data, batch_size=2)
+        self.assertEqual(stats["imported"], 4)
+        self.assertEqual(stats["duplicates"], 0)
+        self.assertEqual(
+            errors,
+            [
+                (
+                    6,
+                    "2026-01-01 is more than 31 days apart from lines before it, "
+                    "sort the statement by date",
+                )
+            ],
+        )
+        self.assertEqual(Transaction.objects.filter(description="Coffee").count(), 2)
+        stats, _ = self.run_import(data)
+        self.assertEqual(stats["duplicates"], 4)
+
+    def test_another_account_imports_the_same_lines(self):
+        self.run_import(QIF, "qif")
+        other = statements.StatementImporter(
+            Account.objects.create(user=self.user, name="Joint")
+        )
+        stats = other.run(statements.read_qif(io.StringIO(QIF)))
+        self.assertEqual(stats["imported"], 2)
+
+
+class TestStatementImportView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="upload@example.com", password="abcd12efgh"
+        )
+        cls.account = Account.objects.create(user=cls.user, name="Current")
+
+    def setUp(self):
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        override = self.settings(STATEMENT_UPLOAD_DIR=upload_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_login(self.user)
+
+    def upload(self, data, name="statement.csv", **fields):
+        statement = SimpleUploadedFile(name, data.encode("utf-8-sig"))
+        return self.client.post(
+            reverse("ledger:import_statement"),
+            {"statement": statement, **fields},
+            follow=True,
+        )
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(reverse("ledger:import_statement"))
+        self.assertRedirects(
+            response,
+            reverse("registration:login")
+            + "?next="
+            + reverse("ledger:import_statement"),
+        )
+
+    def test_import(self):
+        response = self.upload(CSV, account=self.account.pk)
+        self.assertRedirects(response, reverse("ledger:import_statement"))
+        job = Job.objects.get(user=self.user)
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            [
+                "statement.csv is queued for import into Current. "
+                f'<a href="/jobs/{job.pk}/">Follow its progress</a>.'
+            ],
+        )
+        self.assertFalse(Transaction.objects.exists())
+
+        self.assertEqual(queue.run(queue.claim("test")), "done")
+        job.refresh_from_db()
+        self.assertEqual(job.result["imported"], 4)
+        self.assertEqual(job.result["errors"], [[5, "'twelve' is not an amount"]])
+        self.assertEqual(job.progress["read"], 5)
+        self.assertEqual(self.account.transactions.count(), 4)
+        self.assertFalse(os.path.exists(job.kwargs["path"]))
+
+    def test_failed_import_keeps_the_file_until_the_last_attempt(self):
+        self.upload(CSV, account=self.account.pk)
+        job = Job.objects.get(user=self.user)
+        with mock.patch.object(
+            statements.StatementImporter, "run", side_effect=OSError("disk")
+        ):
+            with self.settings(JOBS_MAX_ATTEMPTS=2):
+                self.assertEqual(queue.run(queue.claim("test")), "retried")
+                self.assertTrue(os.path.exists(job.kwargs["path"]))
+                Job.objects.update(run_after=timezone.now())
+                self.assertEqual(queue.run(queue.claim("test")), "failed")
+        self.assertFalse(os.path.exists(job.kwargs["path"]))
+
+    # Read from the temporary file Django spools large uploads to
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_import_into_new_account(self):
+        response = self.upload(QIF, "2026.qif", new_account=" Savings ")
+        self.assertEqual(response.status_code, 200)
+        queue.run(queue.claim("test"))
+        savings = Account.objects.get(user=self.user, name="Savings")
+        self.assertEqual(savings.transactions.count(), 2)
+
+    def test_invalid(self):
+        response = self.upload(CSV)
+        self.assertFormError(
+            response, "form", "new_account", "Choose an account or name a new one."
+        )
+        response = self.upload(CSV, new_account="Current")
+        self.assertFormError(
+            response, "form", "new_account", "You already have an account by that name."
+        )
+        response = self.upload("Payee\nx\n", account=self.account.pk)
+        self.assertFormError(
+            response,
+            "form",
+            "statement",
+            "The header has no amount or date column.",
+        )
+        self.assertFalse(Transaction.objects.exists())
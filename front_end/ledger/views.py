@@ -0,0 +1,65 @@
+import io
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.urls import reverse, reverse_lazy
+from django.utils.html import format_html
+from django.views.generic import FormView
+
+from jobs import queue
+from ledger import statements
+from ledger.forms import StatementImportForm
+
+
+class StatementImportView(LoginRequiredMixin, FormView):
+    """
+    Check an uploaded statement's header and queue its import, which runs
+    in a worker (see ledger.statements.import_file). The job's status and
+    result are polled at jobs:status.
+    """
+
+    form_class = StatementImportForm
+    template_name = "ledger/import_statement.html"
+    success_url = reverse_lazy("ledger:import_statement")
+
+    def get_form_kwargs(self):
+        return {"user": self.request.user, **super().get_form_kwargs()}
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["statement"]
+        format = form.cleaned_data["format"] or statements.infer_format(upload.name)
+        file = io.TextIOWrapper(
+            upload.file, encoding="utf-8-sig", errors="replace", newline=""
+        )
+        try:
+            # Read up to the first line, which checks a CSV's header
+            next(statements.read_statement(file, format))
+        except StopIteration:
+            form.add_error("statement", "The statement has no transactions.")
+            return self.form_invalid(form)
+        except ValueError as e:
+            form.add_error("statement", str(e))
+            return self.form_invalid(form)
+        finally:
+            # Leave the upload open to be saved
+            file.detach()
+        upload.seek(0)
+
+        account = form.get_account()
+        job = queue.enqueue(
+            "ledger.statements.import_file",
+            user=self.request.user,
+            account_id=account.pk,
+            path=statements.save_upload(upload, format),
+            format=format,
+        )
+        messages.success(
+            self.request,
+            format_html(
+                '{} is queued for import into {}. <a href="{}">Follow its progress</a>.',
+                upload.name,
+                account,
+                reverse("jobs:status", args=[job.pk]),
+            ),
+        )
+        return super().form_valid(form)
@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
-import os
 import sys
 
 
 def main():
-    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "front_end.settings")
+    from front_end.settings import configure
+
+    configure(default="test" if sys.argv[1:2] == ["test"] else "dev")
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -4,9 +4,10 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.contrib.auth.models import Group
 
+from . import emails
+from .changelist import EstimatedCountPaginator, KeysetChangeList, cached_count
 from .models import User
 
-
 """
 This was copied from https://docs.djangoproject.com/en/3.0/topics/auth/customizing/#a-full-example
 According to documentation, this model would be compatible with all the built-in auth forms and views,
@@ -66,6 +67,32 @@ class UserChangeForm(forms.ModelForm):
         return self.initial["password"]
 
 
+class IsAdminFilter(admin.SimpleListFilter):
+    """
+    is_admin filter showing how many users each choice matches. The counts
+    are cached for a few minutes, and the (large) non-admin one is estimated.
+    """
+
+    title = "is admin"
+    parameter_name = "is_admin"
+
+    def lookups(self, request, model_admin):
+        admins = cached_count(
+            "registration:admin-count", User.objects.filter(is_admin=True)
+        )
+        others = cached_count(
+            "registration:non-admin-count",
+            User.objects.filter(is_admin=False),
+            threshold=EstimatedCountPaginator.threshold,
+        )
+        return (("1", f"Yes ({admins})"), ("0", f"No ({others})"))
+
+    def queryset(self, request, queryset):
+        if self.value() in ("0", "1"):
+            return queryset.filter(is_admin=self.value() == "1")
+        return queryset
+
+
 class UserAdmin(BaseUserAdmin):
     # The forms to add and change user instances
     form = UserChangeForm
@@ -75,7 +102,7 @@ class UserAdmin(BaseUserAdmin):
     # These override the definitions on the base UserAdmin
     # that reference specific fields on auth.User.
     list_display = ("email", "is_admin")
-    list_filter = ("is_admin",)
+    list_filter = (IsAdminFilter,)
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         ("Permissions", {"fields": ("is_admin",)}),
@@ -84,13 +111,46 @@ class UserAdmin(BaseUserAdmin):
     # add_fieldsets is not a standard ModelAdmin attribute. UserAdmin
     # overrides get_fieldsets to use this attribute when creating a user.
     add_fieldsets = (
-        (None, {"classes": ("wide",), "fields": ("email", "password1", "password2"),}),
+        (
+            None,
+            {
+                "classes": ("wide",),
+                "fields": ("email", "password1", "password2"),
+            },
+        ),
     )
 
     search_fields = ("email",)
     ordering = ("email",)
     filter_horizontal = ()
 
+    # Large result sets get estimated counts and, while ordered by email,
+    # keyset pagination (see registration/changelist.py)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    keyset_field = "email"
+    keyset_threshold = 10000
+
+    class Media:
+        js = ("registration/admin_search.js",)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match every word against lower(email): words of three or more
+        characters anywhere (covered by the trigram index), shorter ones as
+        a prefix (covered by the lower(email) index). Words are normalized
+        like stored emails, so "@bücher.de" finds "@xn--bcher-kva.de".
+        """
+        for word in map(emails.lookup_key, search_term.split()):
+            if len(word) >= 3:
+                queryset = queryset.filter(email__lower__contains=word)
+            else:
+                queryset = queryset.filter(email__lower__startswith=word)
+        return queryset, False
+
 
 # Now register the new UserAdmin...
 admin.site.register(User, UserAdmin)
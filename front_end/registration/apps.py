@@ -3,3 +3,19 @@ from django.apps import AppConfig
 
 class RegistrationConfig(AppConfig):
     name = "registration"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import User
+        from .touches import buffer_last_login
+        from .usercache import invalidate_user
+
+        # Replace the per-login UPDATE that django.contrib.auth connects
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        user_logged_in.connect(buffer_last_login, dispatch_uid="buffer_last_login")
+        post_save.connect(invalidate_user, sender=User, dispatch_uid="invalidate_user")
+        post_delete.connect(
+            invalidate_user, sender=User, dispatch_uid="invalidate_deleted_user"
+        )
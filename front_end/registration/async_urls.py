@@ -0,0 +1,22 @@
+from django.urls import path
+
+from registration import async_views, views
+
+app_name = "registration"
+
+urlpatterns = [
+    path("login/", async_views.signin, name="login"),
+    path("logout/", async_views.signout, name="logout"),
+    path("signup/", async_views.signup, name="signup"),
+    path("change_password/", async_views.change_password, name="change_password"),
+    path("reset_password/", async_views.reset_password, name="reset_password"),
+    path(
+        "reset/<uidb64>/<token>/",
+        async_views.reset_password_confirm,
+        name="password_reset_confirm",
+    ),
+    path("token/", views.obtain_token, name="token"),
+    path("token/refresh/", views.refresh_token, name="token_refresh"),
+    path("token/revoke/", views.revoke_token, name="token_revoke"),
+    path("me/", views.me, name="me"),
+]
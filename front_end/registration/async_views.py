@@ -0,0 +1,148 @@
+"""
+Async-native versions of the registration views, routed by the ASGI entry
+point through front_end.asgi_urls.
+
+The session and the user are resolved in a single thread hop up front, so
+templates render on the event loop without touching the database. Password
+hashing is awaited on the hashing executor and never blocks the loop.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import get_user
+from django.contrib.auth import login as auth_login
+from django.contrib.auth import logout as auth_logout
+from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed, HttpResponseRedirect
+from django.shortcuts import render, resolve_url
+from django.utils.cache import add_never_cache_headers
+from django.utils.http import url_has_allowed_host_and_scheme
+
+from registration import forms as registration_forms
+from registration import tokens
+from registration.hashing import get_executor
+from registration.ratelimit import ratelimit
+from registration.views import (
+    SigninView,
+    SignupView,
+    UserPasswordChangeView,
+    UserPasswordResetConfirmView,
+    UserPasswordResetView,
+)
+
+
+async def aget_user(request):
+    """
+    Load the session and the user behind request.user in one thread hop
+    and replace the lazy object with the result.
+    """
+    if hasattr(request, "auth"):
+        user = await sync_to_async(tokens.get_user)(request)
+    else:
+        user = await sync_to_async(get_user)(request)
+    request.user = request._cached_user = user
+    return user
+
+
+async def arender(request, template_name, context=None):
+    if not hasattr(request, "_cached_user"):
+        await aget_user(request)
+    return render(request, template_name, context)
+
+
+def form_data(request):
+    return request.POST if request.method == "POST" else None
+
+
+def success_redirect(request, default_url):
+    redirect_to = request.POST.get("next", request.GET.get("next", ""))
+    url_is_safe = url_has_allowed_host_and_scheme(
+        url=redirect_to,
+        allowed_hosts={request.get_host()},
+        require_https=request.is_secure(),
+    )
+    return HttpResponseRedirect(redirect_to if url_is_safe else resolve_url(default_url))
+
+
+@ratelimit("login", email_field="username")
+async def signin(request):
+    if request.method not in ("GET", "POST"):
+        return HttpResponseNotAllowed(["GET", "POST"])
+
+    form = registration_forms.UserLoginForm(request, data=form_data(request))
+    if request.method == "POST" and await form.ais_valid():
+        await sync_to_async(auth_login)(request, form.get_user())
+        response = success_redirect(request, settings.LOGIN_REDIRECT_URL)
+    else:
+        response = await arender(request, SigninView.template_name, {"form": form})
+    add_never_cache_headers(response)
+    return response
+
+
+async def signout(request):
+    await sync_to_async(auth_logout)(request)
+    response = success_redirect(request, settings.LOGOUT_REDIRECT_URL)
+    add_never_cache_headers(response)
+    return response
+
+
+async def signup(request):
+    if request.method not in ("GET", "POST"):
+        return HttpResponseNotAllowed(["GET", "POST"])
+
+    form = registration_forms.UserCreateForm(data=form_data(request))
+    # Validation checks the unique email index, so it needs the database
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        user = form.instance
+        user.password = await get_executor().amake_password(
+            form.cleaned_data["password1"]
+        )
+        await sync_to_async(user.save)()
+        messages.success(request, SignupView.success_message)
+        return HttpResponseRedirect(resolve_url(SignupView.success_url))
+    return await arender(request, SignupView.template_name, {"form": form})
+
+
+async def change_password(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    form = registration_forms.UserPasswordChangeForm(user, data=form_data(request))
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        await sync_to_async(form.save)()
+        await sync_to_async(update_session_auth_hash)(request, form.user)
+        messages.success(request, UserPasswordChangeView.success_message)
+        response = HttpResponseRedirect(resolve_url(UserPasswordChangeView.success_url))
+    else:
+        response = await arender(
+            request, UserPasswordChangeView.template_name, {"form": form}
+        )
+    add_never_cache_headers(response)
+    return response
+
+
+@ratelimit("reset_password")
+async def reset_password(request):
+    form = registration_forms.UserPasswordResetForm(data=form_data(request))
+    if request.method == "POST" and form.is_valid():
+        await sync_to_async(form.save)(
+            request=request, use_https=request.is_secure(),
+        )
+        messages.success(request, UserPasswordResetView.success_message)
+        return HttpResponseRedirect(resolve_url(UserPasswordResetView.success_url))
+    return await arender(request, UserPasswordResetView.template_name, {"form": form})
+
+
+async def reset_password_confirm(request, uidb64, token):
+    """
+    Async counterpart of UserPasswordResetConfirmView. The view class does the
+    token and session bookkeeping; it runs in a thread because it reads the
+    user and the session.
+    """
+    view = UserPasswordResetConfirmView.as_view()
+    response = await sync_to_async(view)(request, uidb64=uidb64, token=token)
+    if hasattr(response, "render"):
+        response = await sync_to_async(response.render)()
+    return response
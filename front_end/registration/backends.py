@@ -0,0 +1,80 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, load_backend, user_login_failed
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from registration import usercache
+from registration.hashing import get_executor
+
+
+class EmailBackend(ModelBackend):
+    """
+    ModelBackend for the email-keyed User model, with an async
+    authenticate for the ASGI views. Users are looked up through
+    registration.usercache on every request.
+    """
+
+    def get_user(self, user_id):
+        user, version = usercache.get_user(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                usercache.cache_user(user, version)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await sync_to_async(UserModel._default_manager.get_by_natural_key)(
+                username
+            )
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            await get_executor().amake_password(password)
+        else:
+            if await user.acheck_password(password) and self.user_can_authenticate(
+                user
+            ):
+                return user
+        return None
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async counterpart of django.contrib.auth.authenticate(). Backends without
+    an aauthenticate() method are run in a thread.
+    """
+    for backend_path in settings.AUTHENTICATION_BACKENDS:
+        backend = load_backend(backend_path)
+        backend_authenticate = getattr(backend, "aauthenticate", None)
+        if backend_authenticate is None:
+            backend_authenticate = sync_to_async(backend.authenticate)
+        try:
+            inspect.signature(backend.authenticate).bind(request, **credentials)
+        except TypeError:
+            # This backend doesn't accept these credentials as arguments.
+            continue
+        try:
+            user = await backend_authenticate(request, **credentials)
+        except PermissionDenied:
+            break
+        if user is None:
+            continue
+        user.backend = backend_path
+        return user
+
+    await sync_to_async(user_login_failed.send)(
+        sender=__name__,
+        credentials={"username": credentials.get("username"), "password": "*" * 20},
+        request=request,
+    )
+    return None
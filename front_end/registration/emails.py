@@ -0,0 +1,86 @@
+"""
+Email validation and normalization, cached per process.
+
+The sign-in, sign-up and reset forms, the user manager and the admin search
+all go through here, so an address seen again is answered from a bounded
+LRU (EMAIL_CACHE_SIZE entries per function) instead of running the
+validator's regexes and the IDNA codec again. There are three forms of an
+address:
+
+- normalize(): what User.email stores. The domain is lowercased and
+  IDNA-encoded, the local part is kept as typed.
+- lookup_key(): what lower(email) is compared with, the normalized address
+  lowercased. It matches the registration_user_email_lower_uniq index.
+- rate_key(): the lookup key with plus tags and dots folded for the domains
+  in EMAIL_FOLDING, which deliver those variants to one mailbox, so they
+  share a rate limit bucket. It's never used to find a user.
+"""
+import functools
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.core.validators import validate_email
+from django.dispatch import receiver
+
+CACHE_SIZE = getattr(settings, "EMAIL_CACHE_SIZE", 10000)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def is_valid(email):
+    try:
+        validate_email(email)
+    except ValidationError:
+        return False
+    return True
+
+
+def validate(email):
+    """Validator for form and model fields, raising validate_email's error."""
+    if not is_valid(email):
+        raise ValidationError(validate_email.message, code=validate_email.code)
+
+
+def _split(email):
+    local, at, domain = email.strip().rpartition("@")
+    if not at:
+        return email.strip(), ""
+    domain = domain.lower()
+    try:
+        domain = domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        # Not a valid domain name, which validate() reports
+        pass
+    return local, "@" + domain
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize(email):
+    return "".join(_split(email))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def lookup_key(email):
+    return normalize(email).lower()
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def rate_key(email):
+    local, domain = _split(email.lower())
+    folding = getattr(settings, "EMAIL_FOLDING", {}).get(domain[1:], ())
+    if "plus" in folding:
+        local = local.partition("+")[0]
+    if "dots" in folding:
+        local = local.replace(".", "")
+    return local + domain
+
+
+def clear():
+    for function in (is_valid, normalize, lookup_key, rate_key):
+        function.cache_clear()
+
+
+@receiver(setting_changed)
+def clear_on_setting_changed(**kwargs):
+    if kwargs["setting"] == "EMAIL_FOLDING":
+        rate_key.cache_clear()
@@ -6,9 +6,14 @@ from django.contrib.auth.forms import (
     SetPasswordForm,
     UserCreationForm,
 )
-from django.core.validators import EmailValidator
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.mail import EmailMultiAlternatives
 from django.forms.widgets import EmailInput, PasswordInput, TextInput
+from django.template import loader
 
+from . import emails, outbox
+from .backends import aauthenticate
 from .models import User
 
 
@@ -38,23 +43,123 @@ class UserCreateForm(UserCreationForm):
         model = User
         fields = ("email", "password1", "password2")
 
+    def clean_email(self):
+        return emails.normalize(self.cleaned_data["email"])
+
 
 class UserLoginForm(AuthenticationForm):
-    username = forms.CharField(
-        widget=TextInput(attrs=field_attrs("Email")), validators=[EmailValidator],
-    )
+    username = forms.CharField(widget=TextInput(attrs=field_attrs("Email")))
     password = forms.CharField(widget=PasswordInput(attrs=field_attrs("Password")))
 
     class Meta:
         model = User
         fields = ("username", "password")
 
+    def clean(self):
+        username = self.cleaned_data.get("username")
+        if username and not emails.is_valid(username):
+            # No account has it, so it's a wrong email without a password hash
+            raise self.get_invalid_login_error()
+        if not getattr(self, "_authenticated", False):
+            return super().clean()
+        # ais_valid() has already looked the credentials up
+        if self.cleaned_data.get("username") is not None and self.cleaned_data.get(
+            "password"
+        ):
+            if self.user_cache is None:
+                raise self.get_invalid_login_error()
+            self.confirm_login_allowed(self.user_cache)
+        return self.cleaned_data
+
+    async def ais_valid(self):
+        """
+        Async counterpart of is_valid(). Credentials are checked with
+        aauthenticate() before the (cheap) field validation runs.
+        """
+        username = self.data.get("username", "").strip()
+        password = self.data.get("password")
+        # clean() turns malformed emails away without a password hash
+        if username and password and emails.is_valid(username):
+            self.user_cache = await aauthenticate(
+                self.request, username=username, password=password
+            )
+            self._authenticated = True
+        return self.is_valid()
+
 
 class UserPasswordResetForm(PasswordResetForm):
     email = forms.CharField(
-        widget=TextInput(attrs=field_attrs("Email")), validators=[EmailValidator],
+        widget=TextInput(attrs=field_attrs("Email")), validators=[emails.validate],
     )
 
+    def get_users(self, email):
+        active_users = User._default_manager.filter(
+            email__lower=emails.lookup_key(email), is_active=True
+        )
+        return (u for u in active_users if u.has_usable_password())
+
+    def save(
+        self,
+        domain_override=None,
+        subject_template_name="registration/password_reset_subject.txt",
+        email_template_name="registration/password_reset_email.html",
+        use_https=False,
+        token_generator=default_token_generator,
+        from_email=None,
+        request=None,
+        html_email_template_name=None,
+        extra_email_context=None,
+    ):
+        """
+        Queue the reset email in the outbox instead of sending it. The user
+        lookup and rendering happen in the worker (password_reset_messages),
+        so this takes the same time whether or not the email has an account.
+        The worker always uses the default token generator.
+        """
+        outbox.enqueue(
+            "registration.forms.password_reset_messages",
+            email=self.cleaned_data["email"],
+            domain_override=domain_override or get_current_site(request).domain,
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            use_https=use_https,
+            from_email=from_email,
+            html_email_template_name=html_email_template_name,
+            extra_email_context=extra_email_context,
+        )
+
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None,
+    ):
+        # Called by PasswordResetForm.save() in the worker: collect the
+        # message so the worker can send the batch over one connection
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = "".join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        email_message = EmailMultiAlternatives(subject, body, from_email, [to_email])
+        if html_email_template_name is not None:
+            html_email = loader.render_to_string(html_email_template_name, context)
+            email_message.attach_alternative(html_email, "text/html")
+        self.outgoing.append(email_message)
+
+
+def password_reset_messages(email, **options):
+    """
+    Outbox handler for UserPasswordResetForm.save(). Return the reset
+    emails for the active users with this email, if any.
+    """
+    form = UserPasswordResetForm()
+    form.cleaned_data = {"email": email}
+    form.outgoing = []
+    PasswordResetForm.save(form, **options)
+    return form.outgoing
+
 
 class UserPasswordResetConfirmForm(SetPasswordForm):
     new_password1 = forms.CharField(
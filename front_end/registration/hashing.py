@@ -0,0 +1,237 @@
+"""
+Password hashing executors.
+
+Argon2 is deliberately expensive, so hashing inline holds a request worker
+for the whole computation. ``User.set_password`` and ``User.check_password``
+hand the work to the executor configured by the PASSWORD_HASHING_EXECUTOR
+setting instead:
+
+    PASSWORD_HASHING_EXECUTOR = {
+        "BACKEND": "registration.hashing.ProcessPoolHashingExecutor",
+        "OPTIONS": {"max_workers": 4, "max_queue": 32, "retry_after": 1},
+    }
+
+Without the setting hashing stays inline.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_EXECUTOR = "registration.hashing.InlineHashingExecutor"
+
+
+class HashingQueueFull(Exception):
+    """
+    Raised when a pooled executor cannot accept another job.
+    HashingBackpressureMiddleware turns it into a 503 response.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+def must_update(encoded):
+    """
+    Check whether a hash should be upgraded to the preferred hasher.
+    This only decodes the hash, so it is cheap enough to run inline.
+    """
+    preferred = hashers.get_hasher("default")
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+class InlineHashingExecutor:
+    """
+    Hash on the calling thread, exactly like Django does by default.
+    The async variants hash on a worker thread so the event loop keeps going.
+    """
+
+    def make_password(self, password):
+        return hashers.make_password(password)
+
+    def check_password(self, password, encoded, setter=None):
+        return hashers.check_password(password, encoded, setter)
+
+    async def amake_password(self, password):
+        return await sync_to_async(self.make_password, thread_sensitive=False)(
+            password
+        )
+
+    async def acheck_password(self, password, encoded, setter=None):
+        is_correct = await sync_to_async(self.check_password, thread_sensitive=False)(
+            password, encoded
+        )
+        if setter and is_correct and must_update(encoded):
+            await sync_to_async(setter)(password)
+        return is_correct
+
+    def stats(self):
+        return {"queue_depth": 0, "in_flight": 0, "rejected": 0}
+
+    def shutdown(self):
+        pass
+
+
+def _init_worker(password_hashers):
+    """Configure just enough settings for hashers in a fresh worker process."""
+    if not settings.configured:
+        settings.configure(PASSWORD_HASHERS=password_hashers)
+
+
+def create_pool(max_workers=None):
+    """
+    Return a ProcessPoolExecutor whose workers can run the hashers in
+    PASSWORD_HASHERS. Workers are spawned rather than forked, so they don't
+    inherit database connections or threads.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(list(settings.PASSWORD_HASHERS),),
+    )
+
+
+class ProcessPoolHashingExecutor(InlineHashingExecutor):
+    """
+    Hash in a bounded pool of worker processes.
+
+    At most ``max_workers`` hashes run at once and up to ``max_queue`` more
+    wait for a free worker. Anything beyond that raises HashingQueueFull
+    straight away instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers=None, max_queue=32, retry_after=1):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def pool(self):
+        # Forked workers (e.g. gunicorn --preload) need a pool of their own
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = create_pool(self.max_workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _replace(self, broken):
+        """
+        Start a new pool in place of ``broken``, one whose worker died, unless
+        another thread already has, and return it.
+        """
+        with self._lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False)
+                self._pool = create_pool(self.max_workers)
+            return self._pool
+
+    @property
+    def queue_depth(self):
+        return max(0, self._in_flight - self.max_workers)
+
+    def submit(self, fn, *args):
+        """
+        Schedule a hashing job and return its future.
+        Raise HashingQueueFull if every worker and queue slot is taken.
+        """
+        pool = self.pool
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HashingQueueFull(self.retry_after)
+            self._in_flight += 1
+        try:
+            try:
+                future = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died, which breaks the whole pool for good
+                future = self._replace(pool).submit(fn, *args)
+        except Exception:
+            # e.g. a broken pool: the slot was never taken up
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def make_password(self, password):
+        if password is None:
+            # Unusable passwords are not hashed at all
+            return hashers.make_password(password)
+        return self.submit(hashers.make_password, password).result()
+
+    def check_password(self, password, encoded, setter=None):
+        if password is None or not hashers.is_password_usable(encoded):
+            return False
+        is_correct = self.submit(hashers.check_password, password, encoded).result()
+        if setter and is_correct and must_update(encoded):
+            setter(password)
+        return is_correct
+
+    async def amake_password(self, password):
+        if password is None:
+            return hashers.make_password(password)
+        return await asyncio.wrap_future(self.submit(hashers.make_password, password))
+
+    async def acheck_password(self, password, encoded, setter=None):
+        if password is None or not hashers.is_password_usable(encoded):
+            return False
+        is_correct = await asyncio.wrap_future(
+            self.submit(hashers.check_password, password, encoded)
+        )
+        if setter and is_correct and must_update(encoded):
+            await sync_to_async(setter)(password)
+        return is_correct
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+@functools.lru_cache()
+def get_executor():
+    config = getattr(settings, "PASSWORD_HASHING_EXECUTOR", {})
+    executor_class = import_string(config.get("BACKEND", DEFAULT_EXECUTOR))
+    return executor_class(**config.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def reset_executor(**kwargs):
+    if kwargs["setting"] in ("PASSWORD_HASHING_EXECUTOR", "PASSWORD_HASHERS"):
+        if get_executor.cache_info().currsize:
+            get_executor().shutdown()
+        get_executor.cache_clear()
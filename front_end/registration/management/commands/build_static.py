@@ -0,0 +1,95 @@
+import subprocess
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve
+
+from front_end import staticfiles
+
+
+def render_page(path):
+    """Return the HTML an anonymous GET of ``path`` responds with."""
+    match = resolve(path)
+    # Any host the site answers to; "localhost" when DEBUG allows it
+    host = next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), None)
+    request = RequestFactory().get(path, HTTP_HOST=host or "localhost")
+    request.user = AnonymousUser()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response.content.decode(response.charset)
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the vendored assets, build the CSS and JS bundles and the font "
+        "into static/build/, collect static files with hashed names and "
+        "compressed siblings, and report the weight of a page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fetch",
+            action="store_true",
+            help="Download vendored assets that are missing or don't match.",
+        )
+        parser.add_argument(
+            "--no-collect",
+            action="store_false",
+            dest="collect",
+            help="Only build static/build/, don't run collectstatic.",
+        )
+        parser.add_argument(
+            "--page",
+            default=settings.LOGIN_URL,
+            help="Page to report the weight of (default: %(default)s).",
+        )
+
+    def handle(self, *args, fetch, collect, page, **options):
+        verbosity = options["verbosity"]
+        try:
+            checked = staticfiles.check_vendor(fetch=fetch)
+        except (staticfiles.VendorError, OSError) as e:
+            raise CommandError(f"Vendored assets: {e}")
+        self.stdout.write(f"Checked {len(checked)} vendored asset(s).")
+
+        try:
+            sizes = staticfiles.build()
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise CommandError(f"Build failed: {e}")
+        for name, size in sizes.items():
+            self.stdout.write(f"Built {name} ({size / 1024:.1f} KiB).")
+
+        if collect:
+            call_command("collectstatic", interactive=False, verbosity=verbosity)
+        if page:
+            self.report(page)
+
+    def report(self, page):
+        html = render_page(page)
+        weights = staticfiles.page_weight(html)
+        self.stdout.write(f"\n{page}\n{'asset':<56} {'KiB':>8} {'gzip':>8} {'br':>8}")
+        totals = [0, 0, 0]
+        external = 0
+        for weight in [staticfiles.weigh(page, html.encode())] + weights:
+            if weight.raw is None:
+                external += 1
+                self.stdout.write(f"{weight.url:<56} {'external':>8}")
+                continue
+            totals[0] += weight.raw
+            totals[1] += weight.gzip
+            totals[2] += weight.brotli
+            self.stdout.write(
+                f"{weight.url:<56} {weight.raw / 1024:>8.1f} "
+                f"{weight.gzip / 1024:>8.1f} {weight.brotli / 1024:>8.1f}"
+            )
+        self.stdout.write(
+            f"{'total':<56} {totals[0] / 1024:>8.1f} "
+            f"{totals[1] / 1024:>8.1f} {totals[2] / 1024:>8.1f}\n"
+            f"{len(weights) + 1} request(s), {external} to other hosts"
+        )
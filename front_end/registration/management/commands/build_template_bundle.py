@@ -0,0 +1,34 @@
+import os
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from front_end.templating import bundle_dirs, write_bundle
+
+
+def bundle_path(module):
+    """Return the file the bundle module ``module`` is imported from."""
+    package, _, name = module.rpartition(".")
+    directory = find_spec(package).submodule_search_locations[0]
+    return os.path.join(directory, f"{name}.py")
+
+
+class Command(BaseCommand):
+    help = (
+        "Write every template to the TEMPLATE_BUNDLE module, which "
+        'TEMPLATE_MODE = "bundle" loads templates from.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="File to write (default: the TEMPLATE_BUNDLE module's file).",
+        )
+
+    def handle(self, *args, output, **options):
+        engine = engines["django"].engine
+        output = output or bundle_path(settings.TEMPLATE_BUNDLE)
+        count = write_bundle(output, bundle_dirs(engine), engine.file_charset)
+        self.stdout.write(f"Bundled {count} template(s) into {output}.")
@@ -0,0 +1,33 @@
+import inspect
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in chunks, instead of the single DELETE "
+        "that clearsessions runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of sessions deleted per statement (default: 1000).",
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+        engine = import_module(settings.SESSION_ENGINE)
+        clear_expired = engine.SessionStore.clear_expired
+        if "chunk_size" not in inspect.signature(clear_expired).parameters:
+            raise CommandError(
+                f"Session engine '{settings.SESSION_ENGINE}' can't delete in "
+                "chunks, use clearsessions instead."
+            )
+        deleted = clear_expired(chunk_size=chunk_size)
+        self.stdout.write(f"Deleted {deleted} expired session(s).")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from registration import tokens
+
+
+class Command(BaseCommand):
+    help = "Delete the revocations of expired bearer tokens."
+
+    def handle(self, *args, **options):
+        deleted = tokens.clear_expired()
+        self.stdout.write(f"Deleted {deleted} expired revocation(s).")
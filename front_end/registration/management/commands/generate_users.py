@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from registration.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert generated users (<prefix><n>@example.com, unusable password) "
+        "until there are --count of them, for benchmarking large tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, required=True)
+        parser.add_argument(
+            "--prefix",
+            default="generated",
+            help="Email prefix of the generated users (default: generated).",
+        )
+        parser.add_argument(
+            "--admin-every",
+            type=int,
+            default=1000,
+            help="Make every nth generated user an admin (default: 1000).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100000,
+            help="Number of users inserted per statement (default: 100000).",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the generated users with this prefix instead.",
+        )
+
+    def handle(self, *args, count, prefix, admin_every, batch_size, delete, **options):
+        if count < 0 or batch_size < 1 or admin_every < 1:
+            raise CommandError(
+                "--count, --batch-size and --admin-every must be positive."
+            )
+        generated = User.objects.filter(
+            email__lower__startswith=prefix.lower(),
+            email__lower__endswith="@example.com",
+        )
+        table = connection.ops.quote_name(User._meta.db_table)
+        if delete:
+            # Generated users can't log in, so there are no sessions or cached
+            # users to clean up, and a plain DELETE skips loading millions of
+            # instances for the post_delete receivers
+            sql, params = generated.values("pk").query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({sql})", params)
+                deleted = cursor.rowcount
+            self.stdout.write(f"Deleted {deleted} generated user(s).")
+            return
+
+        existing = generated.count()
+        start = time.perf_counter()
+        for first in range(existing + 1, count + 1, batch_size):
+            last = min(first + batch_size - 1, count)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} (email, password, is_active, is_admin) "
+                    "SELECT %s || i || '@example.com', '!', true, i %% %s = 0 "
+                    "FROM generate_series(%s, %s) AS i "
+                    "ON CONFLICT DO NOTHING",
+                    [prefix, admin_every, first, last],
+                )
+            self.stdout.write(f"Inserted users {first}-{last}.")
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {table}")
+        added = max(count - existing, 0)
+        self.stdout.write(
+            f"Added {added} user(s) in {time.perf_counter() - start:.1f}s, "
+            f"{max(count, existing)} generated in total."
+        )
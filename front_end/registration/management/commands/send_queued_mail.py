@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from registration import outbox
+
+
+class Command(BaseCommand):
+    help = "Send the mail queued in OUTBOX_DIR, in batches over one connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of jobs sent per connection (default: 50).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the queue is empty (default: 5).",
+        )
+        parser.add_argument(
+            "--recover-after",
+            type=float,
+            default=10 * 60,
+            help=(
+                "Requeue jobs claimed more than this many seconds ago by a "
+                "worker that has since died (default: 600)."
+            ),
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once there are no more due jobs instead of polling.",
+        )
+
+    def handle(self, *args, batch_size, interval, recover_after, once, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        recovered = outbox.recover(recover_after)
+        if recovered:
+            self.stdout.write(f"Requeued {recovered} stale job(s).")
+        try:
+            while True:
+                counts = outbox.process(batch_size)
+                if counts:
+                    self.stdout.write(
+                        f"Sent {counts['sent']}, retrying {counts['retried']}, "
+                        f"dead {counts['dead']}."
+                    )
+                    continue
+                if once:
+                    return
+                time.sleep(interval)
+                outbox.recover(recover_after)
+        except KeyboardInterrupt:
+            pass
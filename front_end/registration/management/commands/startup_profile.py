@@ -0,0 +1,156 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from front_end import startup
+
+SETUP_PHASES = ("import", "models", "ready")
+
+
+def run_worker(paths, lazy, importtime=False):
+    """
+    Start Django in a new process the way wsgi.py does, GET ``paths`` and
+    return (the result of front_end.startup.profile(), its stderr).
+    """
+    env = dict(os.environ, LAZY_STARTUP="1" if lazy else "0")
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-m", "front_end.startup"] + list(paths)
+    env["STARTUP_STARTED"] = repr(time.time())
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise CommandError(f"The worker failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a worker in a new process the way wsgi.py does and report the "
+        "time taken by each startup phase, by django.setup() per app and by "
+        "imports per app and module, then compare the time to the first "
+        "response with LAZY_STARTUP off and on."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=(
+                "Path to GET after startup, in order; repeat for more "
+                f"(default: {settings.LOGIN_URL} then /admin/login/)."
+            ),
+        )
+        parser.add_argument(
+            "--modules",
+            type=int,
+            default=15,
+            help="Number of packages and of modules to list (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help=(
+                "Cold starts per LAZY_STARTUP value for the comparison; 0 skips "
+                "it (default: %(default)s)."
+            ),
+        )
+
+    def handle(self, *args, paths, modules, repeat, **options):
+        paths = paths or [settings.LOGIN_URL, "/admin/login/"]
+        lazy = getattr(settings, "LAZY_STARTUP", False)
+        result, stderr = run_worker(paths, lazy, importtime=True)
+        self.report_phases(result)
+        self.report_apps(result)
+        self.report_imports(startup.parse_importtime(stderr), result, modules)
+        if repeat:
+            self.compare(paths, repeat)
+
+    def report_phases(self, result):
+        self.stdout.write(
+            f"LAZY_STARTUP={'on' if result['lazy'] else 'off'}\n"
+            f"{'phase':<40} {'ms':>8}"
+        )
+        for phase, app, ms in result["timings"]:
+            if phase in SETUP_PHASES:
+                continue
+            indent = "  " if phase not in ("settings", "wsgi.py", "urlconf") else ""
+            self.stdout.write(f"{indent + phase:<40} {ms:>8.1f}")
+        for index, (path, status, ms, admin_loaded) in enumerate(result["requests"]):
+            self.stdout.write(f"{f'GET {path} ({status})':<40} {ms:>8.1f}")
+            if index == 0:
+                self.stdout.write(
+                    f"{'time to first response':<40} "
+                    f"{result['first_request_ms']:>8.1f}"
+                )
+        loaded_by = next(
+            (path for path, _, _, loaded in result["requests"] if loaded), None
+        )
+        if loaded_by == result["requests"][0][0]:
+            loaded_by = "startup"
+        self.stdout.write(f"registration.admin imported by: {loaded_by or 'nothing'}")
+
+    def report_apps(self, result):
+        totals = {}
+        for phase, app, ms in result["timings"]:
+            if phase in SETUP_PHASES:
+                totals.setdefault(app, dict.fromkeys(SETUP_PHASES, 0.0))[phase] += ms
+        self.stdout.write(
+            f"\ndjango.setup() by app{'':<19} "
+            + " ".join(f"{phase:>8}" for phase in SETUP_PHASES)
+        )
+        for app, phases in totals.items():
+            self.stdout.write(
+                f"{app:<40} "
+                + " ".join(f"{phases[phase]:>8.1f}" for phase in SETUP_PHASES)
+            )
+
+    def report_imports(self, imports, result, modules):
+        packages = startup.imports_by_package(imports, result["apps"])
+        total = sum(own for _, own, _ in imports) / 1000
+        self.stdout.write(
+            f"\nimports by app or package{'':<15} {'ms':>8} {'modules':>8}"
+        )
+        for package, (own, count) in list(packages.items())[:modules]:
+            self.stdout.write(f"{package:<40} {own / 1000:>8.1f} {count:>8}")
+        self.stdout.write(f"{'total':<40} {total:>8.1f} {len(imports):>8}")
+
+        self.stdout.write(f"\nslowest modules{'':<25} {'ms':>8} {'with deps':>10}")
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)
+        for module, own, cumulative in slowest[:modules]:
+            self.stdout.write(
+                f"{module:<40} {own / 1000:>8.1f} {cumulative / 1000:>10.1f}"
+            )
+
+    def compare(self, paths, repeat):
+        self.stdout.write(
+            f"\nmedian of {repeat} cold start(s){'':<11} "
+            f"{'first ms':>8} {paths[-1]:>16}"
+        )
+        medians = {}
+        for lazy in (False, True):
+            first, last = [], []
+            for _ in range(repeat):
+                result, _ = run_worker(paths, lazy)
+                first.append(result["first_request_ms"])
+                last.append(result["requests"][-1][2])
+            medians[lazy] = statistics.median(first)
+            self.stdout.write(
+                f"{f'LAZY_STARTUP={int(lazy)}':<40} {medians[lazy]:>8.1f} "
+                f"{statistics.median(last):>16.1f}"
+            )
+        saved = medians[False] - medians[True]
+        self.stdout.write(
+            f"Lazy startup saves {saved:.1f} ms "
+            f"({saved / medians[False]:.0%}) before the first response."
+        )
@@ -0,0 +1,57 @@
+from django.contrib.auth import middleware as auth_middleware
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from registration import tokens
+from registration.hashing import HashingQueueFull
+
+
+class HashingBackpressureMiddleware(MiddlewareMixin):
+    """
+    Answer with a cheap 503 and a Retry-After header when the password
+    hashing pool is saturated, instead of queueing more work behind it.
+    """
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, HashingQueueFull):
+            response = HttpResponse(
+                "Too many sign-in attempts right now, please try again shortly.",
+                content_type="text/plain",
+                status=503,
+            )
+            response["Retry-After"] = str(exception.retry_after)
+            return response
+
+
+class TokenAuthenticationMiddleware(MiddlewareMixin):
+    """
+    Authenticate requests carrying an ``Authorization: Bearer`` access token
+    (see registration/tokens.py). It runs before SessionMiddleware, and
+    AuthenticationMiddleware leaves request.user alone for these requests,
+    so no session is loaded. Invalid tokens are answered with a 401.
+    """
+
+    def process_request(self, request):
+        scheme, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        try:
+            request.auth = tokens.verify_access(token.strip())
+        except tokens.InvalidToken as e:
+            response = HttpResponse(str(e), content_type="text/plain", status=401)
+            response["WWW-Authenticate"] = 'Bearer error="invalid_token"'
+            return response
+        request.user = SimpleLazyObject(lambda: tokens.get_user(request))
+        # Browsers don't send bearer tokens on their own, so there's no
+        # cross-site request to forge
+        request._dont_enforce_csrf_checks = True
+        return None
+
+
+class AuthenticationMiddleware(auth_middleware.AuthenticationMiddleware):
+    """Django's, except for requests TokenAuthenticationMiddleware took."""
+
+    def process_request(self, request):
+        if not hasattr(request, "auth"):
+            super().process_request(request)
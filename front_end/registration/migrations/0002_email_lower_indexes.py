@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # normalize_email() only lowercased the domain, so an address can be on
+    # several users in different cases. Which one to keep is for a person to
+    # decide, as each can own ledger data; list them rather than leave the
+    # unique index to fail on the first.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT lower(email), array_agg(id ORDER BY id) FROM registration_user "
+            "GROUP BY lower(email) HAVING count(*) > 1 ORDER BY 1"
+        )
+        duplicates = cursor.fetchall()
+    if duplicates:
+        raise RuntimeError(
+            "These emails are on more than one user, in different cases. Change "
+            "or delete all but one user of each, then migrate again:\n"
+            + "\n".join(
+                f"  {email}: users {', '.join(map(str, ids))}"
+                for email, ids in duplicates
+            )
+        )
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm ships with PostgreSQL's contrib modules, which not every
+    # install has. Without it admin search falls back to prefix matches.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX registration_user_email_trgm "
+        "ON registration_user USING gin (lower(email) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS registration_user_email_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registration", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # Serves both lower(email) = ... and lower(email) LIKE 'prefix%'
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX registration_user_email_lower_uniq "
+            "ON registration_user (lower(email) text_pattern_ops)",
+            "DROP INDEX registration_user_email_lower_uniq",
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
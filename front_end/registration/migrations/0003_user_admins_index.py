@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0002_email_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(is_admin=True), fields=['email'], name='registration_user_admins'),
+        ),
+    ]
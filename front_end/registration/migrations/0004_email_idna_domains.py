@@ -0,0 +1,38 @@
+from django.db import migrations
+
+import registration.models
+
+
+def encode_idn_domains(apps, schema_editor):
+    # Emails are now stored with IDNA-encoded domains (registration.emails),
+    # so the few stored with Unicode domains are rewritten to match lookups
+    User = apps.get_model("registration", "User")
+    users = User.objects.filter(email__regex=r"@.*[^\x00-\x7f]")
+    for user in users.only("email").iterator():
+        local, _, domain = user.email.rpartition("@")
+        try:
+            domain = domain.lower().encode("idna").decode("ascii")
+        except UnicodeError:
+            continue
+        email = f"{local}@{domain}"
+        # Left alone if the encoded address has an account of its own
+        if not User.objects.filter(email__iexact=email).exists():
+            User.objects.filter(pk=user.pk).update(email=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registration", "0003_user_admins_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=registration.models.EmailField(
+                max_length=254, unique=True, verbose_name="email"
+            ),
+        ),
+        migrations.RunPython(encode_idn_domains, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,11 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower
+
+from front_end import metrics
+from registration import emails
+from registration.hashing import get_executor
 
 
 """
@@ -12,7 +18,27 @@ Why?
 """
 
 
+# email__lower=... compiles to lower(email) = ..., which the unique
+# registration_user_email_lower_uniq index covers (unlike email__iexact)
+models.EmailField.register_lookup(Lower)
+
+
+class EmailField(models.EmailField):
+    """EmailField validated through the registration.emails cache."""
+
+    default_validators = [emails.validate]
+
+
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """Lowercase and IDNA-encode the domain (registration.emails)."""
+        return emails.normalize(email or "")
+
+    def get_by_natural_key(self, email):
+        """Look the user up by email, ignoring case."""
+        return self.get(email__lower=emails.lookup_key(email))
+
     def create_user(self, email, password=None):
         """
         Creates and saves a User with the given email, date of
@@ -47,7 +73,7 @@ class UserManager(BaseUserManager):
 
 
 class User(AbstractBaseUser):
-    email = models.EmailField(verbose_name="email", unique=True,)
+    email = EmailField(verbose_name="email", unique=True,)
     is_active = models.BooleanField(default=True)
     is_admin = models.BooleanField(default=False)
 
@@ -55,9 +81,80 @@ class User(AbstractBaseUser):
 
     USERNAME_FIELD = "email"
 
+    class Meta:
+        indexes = [
+            # Admins are few, so counting and listing them stays cheap
+            models.Index(
+                fields=["email"],
+                name="registration_user_admins",
+                condition=models.Q(is_admin=True),
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
+    def validate_unique(self, exclude=None):
+        """
+        Check email uniqueness ignoring case, as the lower(email) index does,
+        instead of Django's exact match.
+        """
+        exclude = set(exclude or ())
+        errors = {}
+        try:
+            super().validate_unique(exclude=exclude | {"email"})
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+
+        if "email" not in exclude and self.email:
+            duplicates = User._default_manager.filter(
+                email__lower=emails.lookup_key(self.email)
+            )
+            if not self._state.adding:
+                duplicates = duplicates.exclude(pk=self.pk)
+            if duplicates.exists():
+                errors.setdefault("email", []).append(
+                    self.unique_error_message(User, ["email"])
+                )
+        if errors:
+            raise ValidationError(errors)
+
+    def set_password(self, raw_password):
+        with metrics.timed("hash"):
+            self.password = get_executor().make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Return a boolean of whether the raw_password was correct. Handles
+        hashing formats behind the scenes.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        with metrics.timed("hash"):
+            return get_executor().check_password(raw_password, self.password, setter)
+
+    async def acheck_password(self, raw_password):
+        """
+        Async counterpart of check_password(). The hash is awaited on the
+        hashing executor, so the event loop is never blocked.
+        """
+
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+
+        with metrics.timed("hash"):
+            return await get_executor().acheck_password(
+                raw_password, self.password, setter
+            )
+
     def has_perm(self, *args):
         "Does the user have a specific permission?"
         # Simplest possible answer: Yes, always
@@ -73,3 +170,16 @@ class User(AbstractBaseUser):
         "Is the user a member of staff?"
         # Simplest possible answer: All admins are staff
         return self.is_admin
+
+
+class RevokedToken(models.Model):
+    """
+    A signed-out sign-in's family id or a used refresh token's id (see
+    registration/tokens.py), kept until the tokens it stops have expired.
+    """
+
+    token_id = models.CharField(max_length=32, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.token_id
@@ -0,0 +1,161 @@
+"""
+A durable, file-backed queue of outgoing mail, sent by the
+``send_queued_mail`` management command.
+
+Requests call enqueue() with the dotted path of a function that builds the
+messages and the arguments to call it with, so lookups and template
+rendering happen in the worker rather than the request. Each job is a JSON
+file named after the time it is due, so a sorted directory listing is the
+sending order:
+
+    OUTBOX_DIR/new/      jobs waiting to be sent
+    OUTBOX_DIR/sending/  jobs claimed by a worker
+    OUTBOX_DIR/dead/     jobs that failed OUTBOX_MAX_ATTEMPTS times
+
+Files are moved between folders with os.rename(), which is atomic, so any
+number of workers can share a folder.
+"""
+import collections
+import json
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.utils.module_loading import import_string
+
+NEW = "new"
+SENDING = "sending"
+DEAD = "dead"
+
+
+def _dir(state):
+    path = os.path.join(settings.OUTBOX_DIR, state)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _job_name(due):
+    return f"{int(due * 1e6):020d}-{uuid.uuid4().hex}.json"
+
+
+def _write(state, name, job):
+    path = _dir(state)
+    tmp_path = os.path.join(path, f".{name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(path, name))
+
+
+def _read(state, name):
+    with open(os.path.join(_dir(state), name)) as f:
+        return json.load(f)
+
+
+def enqueue(handler, **kwargs):
+    """
+    Queue a job for the worker. ``handler`` is the dotted path of a function
+    that takes ``kwargs`` and returns a list of EmailMessages; ``kwargs``
+    must be JSON serializable.
+    """
+    job = {"handler": handler, "kwargs": kwargs, "attempts": 0, "errors": []}
+    _write(NEW, _job_name(time.time()), job)
+
+
+def jobs(state=NEW):
+    return sorted(name for name in os.listdir(_dir(state)) if not name.startswith("."))
+
+
+def claim(batch_size):
+    """
+    Move up to ``batch_size`` due jobs from new/ to sending/ and return
+    their names.
+    """
+    new, sending = _dir(NEW), _dir(SENDING)
+    now = _job_name(time.time())[:20]
+    claimed = []
+    for name in jobs(NEW):
+        if len(claimed) >= batch_size or name[:20] > now:
+            break
+        try:
+            os.rename(os.path.join(new, name), os.path.join(sending, name))
+        except FileNotFoundError:
+            # Claimed by another worker
+            continue
+        # Mark when it was claimed, for recover()
+        os.utime(os.path.join(sending, name))
+        claimed.append(name)
+    return claimed
+
+
+def recover(older_than):
+    """
+    Move jobs that have been in sending/ for more than ``older_than``
+    seconds, i.e. whose worker died, back to new/.
+    """
+    sending, new = _dir(SENDING), _dir(NEW)
+    recovered = 0
+    for name in jobs(SENDING):
+        path = os.path.join(sending, name)
+        try:
+            if time.time() - os.path.getmtime(path) < older_than:
+                continue
+            os.rename(path, os.path.join(new, name))
+        except FileNotFoundError:
+            continue
+        recovered += 1
+    return recovered
+
+
+def _failed(name, job, error):
+    job["attempts"] += 1
+    job["errors"].append(f"{type(error).__name__}: {error}")
+    if job["attempts"] >= settings.OUTBOX_MAX_ATTEMPTS:
+        _write(DEAD, name, job)
+        outcome = "dead"
+    else:
+        delay = settings.OUTBOX_RETRY_DELAY * 2 ** (job["attempts"] - 1)
+        _write(NEW, _job_name(time.time() + delay), job)
+        outcome = "retried"
+    os.remove(os.path.join(_dir(SENDING), name))
+    return outcome
+
+
+def process(batch_size=50, connection=None):
+    """
+    Send one batch of due jobs over a single connection. Failed jobs are
+    retried with exponential backoff, and moved to dead/ after
+    OUTBOX_MAX_ATTEMPTS attempts. Return a Counter of jobs sent, retried
+    and dead.
+    """
+    counts = collections.Counter()
+    names = claim(batch_size)
+    if not names:
+        return counts
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for name in names:
+            counts[_failed(name, _read(SENDING, name), e)] += 1
+        return counts
+
+    try:
+        for name in names:
+            job = _read(SENDING, name)
+            try:
+                messages = import_string(job["handler"])(**job["kwargs"])
+                if messages:
+                    connection.send_messages(messages)
+            except Exception as e:
+                counts[_failed(name, job, e)] += 1
+            else:
+                os.remove(os.path.join(_dir(SENDING), name))
+                counts["sent"] += 1
+    finally:
+        connection.close()
+    return counts
@@ -0,0 +1,222 @@
+"""
+Token bucket rate limits for sign-in and password reset.
+
+Each POST takes a token from a bucket per client IP, per submitted email
+(with plus tags and dots folded as registration.emails.rate_key() does) and
+one shared by everyone, before the form is validated, so rejected
+attempts cost neither a database lookup nor a password hash. A bucket holds
+up to ``count`` tokens and refills at ``count`` per period:
+
+    RATELIMITS = {
+        "login": {"ip": "30/m", "email": "10/m", "global": "100/s"},
+    }
+
+Buckets live in the RATELIMIT_CACHE_ALIAS cache, by default a file-based
+one shared by every worker process on the host, so a client gets the
+configured rate however many processes serve it. A bucket's entry expires
+once the bucket would be full again, as a missing bucket counts as full,
+which keeps the cache to recent clients. Taking a token isn't atomic across
+processes: two workers checking the same bucket at once can both take its
+last token, so a burst may overshoot by a token per process, not the rate.
+Rejected requests get a plain 429 with Retry-After. Async views check
+their limits in a thread, as reading and writing the buckets is file I/O.
+
+Behind a reverse proxy every request comes from the proxy's address, so
+client IPs are read from X-Forwarded-For when REMOTE_ADDR is one of
+TRUSTED_PROXIES (addresses or networks, e.g. "10.0.0.0/8").
+"""
+
+import asyncio
+import functools
+import hashlib
+import ipaddress
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from . import emails
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """Return (capacity, tokens per second) for a rate like "10/m"."""
+    count, _, period = rate.partition("/")
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class RateLimiter:
+    """
+    Token buckets for one scope, keyed by (kind, value), where kind is one
+    of the configured rates ("ip", "email" or "global").
+    """
+
+    def __init__(self, scope, rates):
+        self.scope = scope
+        self.rates = {kind: parse_rate(rate) for kind, rate in rates.items()}
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "RATELIMIT_CACHE_ALIAS", "default")]
+
+    def key(self, kind, value):
+        # Hashed, as emails may hold characters cache keys can't
+        digest = hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+        return f"ratelimit:{self.scope}:{kind}:{digest}"
+
+    def check(self, keys):
+        """
+        Take a token from the bucket of each item of ``keys`` that has a
+        rate, e.g. ``{"ip": "192.0.2.1", "email": "a@example.com",
+        "global": ""}``. Tokens are only taken if every bucket has one.
+        Return 0 when allowed, otherwise the seconds until it would be.
+        """
+        rates = {
+            self.key(kind, value): self.rates[kind]
+            for kind, value in keys.items()
+            if kind in self.rates and value is not None
+        }
+        # Wall clock time, as the buckets are shared between processes
+        now = time.time()
+        cache = self.cache
+        with self._lock:
+            # Each bucket is (tokens, last refill)
+            stored = cache.get_many(rates)
+            tokens = {}
+            wait = 0
+            for key, (capacity, refill) in rates.items():
+                left, last = stored.get(key, (capacity, now))
+                left = min(capacity, left + max(0, now - last) * refill)
+                if left < 1:
+                    wait = max(wait, (1 - left) / refill)
+                tokens[key] = left
+            if wait:
+                self.rejected += 1
+                return wait
+            for key, left in tokens.items():
+                capacity, refill = rates[key]
+                full_in = math.ceil((capacity - left + 1) / refill)
+                cache.set(key, (left - 1, now), full_in)
+            self.allowed += 1
+            return 0
+
+
+@functools.lru_cache()
+def get_limiter(scope):
+    rates = getattr(settings, "RATELIMITS", {}).get(scope)
+    if not rates:
+        return None
+    return RateLimiter(scope, rates)
+
+
+@functools.lru_cache()
+def trusted_proxies():
+    return [
+        ipaddress.ip_network(proxy, strict=False)
+        for proxy in getattr(settings, "TRUSTED_PROXIES", [])
+    ]
+
+
+@receiver(setting_changed)
+def reset_limiters(**kwargs):
+    if kwargs["setting"] == "RATELIMITS":
+        get_limiter.cache_clear()
+    elif kwargs["setting"] == "TRUSTED_PROXIES":
+        trusted_proxies.cache_clear()
+
+
+def reset():
+    """Empty every limiter's buckets."""
+    get_limiter.cache_clear()
+    caches[getattr(settings, "RATELIMIT_CACHE_ALIAS", "default")].clear()
+
+
+def is_trusted(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies())
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or if that's a trusted proxy, the last address in
+    X-Forwarded-For that isn't, as earlier ones may be made up by the client.
+    """
+    address = request.META.get("REMOTE_ADDR")
+    if not trusted_proxies() or not is_trusted(address):
+        return address
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+    for hop in reversed([hop.strip() for hop in forwarded if hop.strip()]):
+        address = hop
+        if not is_trusted(hop):
+            break
+    return address
+
+
+def rate_limited(retry_after):
+    response = HttpResponse(
+        "Too many attempts, please try again later.",
+        content_type="text/plain",
+        status=429,
+    )
+    response["Retry-After"] = str(math.ceil(retry_after))
+    return response
+
+
+def check_request(scope, request, email_field):
+    """Return a 429 response if a POST to ``scope`` is over its limits."""
+    if request.method != "POST":
+        return None
+    limiter = get_limiter(scope)
+    if limiter is None:
+        return None
+    email = request.POST.get(email_field, "").strip()
+    email = emails.rate_key(email) if email else None
+    wait = limiter.check({"ip": client_ip(request), "email": email, "global": ""})
+    return rate_limited(wait) if wait else None
+
+
+def ratelimit(scope, email_field="email"):
+    """
+    Decorate a sync or async view so POSTs over the ``scope`` limits in
+    RATELIMITS are answered with a 429 before the view runs.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                # Not thread sensitive: the limiter has a lock of its own
+                response = await sync_to_async(check_request, thread_sensitive=False)(
+                    scope, request, email_field
+                )
+                if response is not None:
+                    return response
+                return await view(request, *args, **kwargs)
+
+        else:
+
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                response = check_request(scope, request, email_field)
+                if response is not None:
+                    return response
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
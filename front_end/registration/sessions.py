@@ -0,0 +1,156 @@
+"""
+Layered session engine: an in-process LRU in front of the shared session
+cache, optionally written through to the database.
+
+    SESSION_ENGINE = "registration.sessions"
+
+Reads are served from the LRU when possible, so an authenticated page view
+normally touches neither the cache nor the database. Saves that don't
+change the session data are skipped; if only the expiry moved by more than
+SESSION_TOUCH_INTERVAL seconds, the new expiry is written to the cache and
+queued for a batched UPDATE rather than rewriting the row.
+
+Other processes can serve a session from their LRU for up to
+SESSION_LOCAL_CACHE_TTL seconds after it was changed or deleted here, so
+keep that TTL short.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.utils import timezone
+
+from front_end import metrics
+
+from .lru import LRUCache
+from .touches import session_expiries
+
+KEY_PREFIX = "registration.sessions"
+
+# Serialized session data and the expiry it was stored with
+Entry = namedtuple("Entry", ["data", "expire_date"])
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+    local = LRUCache(
+        maxsize=getattr(settings, "SESSION_LOCAL_CACHE_SIZE", 10000),
+        ttl=getattr(settings, "SESSION_LOCAL_CACHE_TTL", 5),
+    )
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.write_through = getattr(settings, "SESSION_WRITE_THROUGH", True)
+        self.touch_interval = timedelta(
+            seconds=getattr(settings, "SESSION_TOUCH_INTERVAL", 300)
+        )
+        self._stored = None
+
+    def load(self):
+        entry = self._load_entry()
+        if entry is None:
+            self._session_key = None
+            return {}
+        self._stored = entry
+        return self.serializer().loads(entry.data)
+
+    def _load_entry(self):
+        session_key = self._session_key
+        if session_key is None:
+            return None
+        entry = self.local.get(session_key)
+        if entry is None:
+            try:
+                entry = self._cache.get(self.cache_key)
+            except Exception:
+                # Some backends raise on invalid keys, treat it as a miss
+                entry = None
+            if entry is None:
+                metrics.count("cache_misses")
+                if self.write_through:
+                    entry = self._load_entry_from_db()
+            else:
+                metrics.count("cache_hits")
+            if entry is None:
+                return None
+            self.local.set(session_key, entry)
+        else:
+            metrics.count("cache_hits")
+        if entry.expire_date <= timezone.now():
+            return None
+        return entry
+
+    def _load_entry_from_db(self):
+        s = self._get_session_from_db()
+        if s is None:
+            return None
+        entry = Entry(
+            self.serializer().dumps(self.decode(s.session_data)), s.expire_date
+        )
+        self._cache.set(
+            self.cache_key, entry, self.get_expiry_age(expiry=s.expire_date)
+        )
+        return entry
+
+    def exists(self, session_key):
+        if not session_key:
+            return False
+        if self.local.get(session_key) is not None:
+            return True
+        if self.cache_key_prefix + session_key in self._cache:
+            return True
+        return self.write_through and DBStore.exists(self, session_key)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        entry = Entry(self.serializer().dumps(data), self.get_expiry_date())
+        stored = self._stored
+        if not must_create and stored is not None and stored.data == entry.data:
+            if entry.expire_date - stored.expire_date < self.touch_interval:
+                return
+            if self.write_through:
+                session_expiries.touch(self.session_key, entry.expire_date)
+        elif self.write_through:
+            DBStore.save(self, must_create)
+        elif must_create:
+            if not self._cache.add(self.cache_key, entry, self.get_expiry_age()):
+                raise CreateError
+        self._cache.set(self.cache_key, entry, self.get_expiry_age())
+        self.local.set(self.session_key, entry)
+        self._stored = entry
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        if self.write_through:
+            DBStore.delete(self, session_key)
+        self._cache.delete(self.cache_key_prefix + session_key)
+        self.local.delete(session_key)
+        if session_key == self.session_key:
+            self._stored = None
+
+    @classmethod
+    def clear_expired(cls, chunk_size=1000):
+        """
+        Delete expired sessions from the database ``chunk_size`` rows at a
+        time so that no single statement holds locks on the whole table.
+        Return the number of sessions deleted.
+        """
+        model = cls.get_model_class()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=timezone.now()).values_list(
+                    "pk", flat=True
+                )[:chunk_size]
+            )
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
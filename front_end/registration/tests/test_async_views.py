@@ -0,0 +1,196 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from front_end.asgi import AsyncViewsASGIHandler
+from registration import outbox
+from registration.tests.utils import FreshRateLimitsMixin, TemporaryOutboxMixin
+from registration.views import SignupView, UserPasswordChangeView
+
+# AsyncClient can't post multipart data on Django 3.1, so forms go urlencoded
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+INVALID_LOGIN_ERROR = (
+    "Please enter a correct email and password. "
+    "Note that both fields may be case-sensitive."
+)
+
+
+class TestAsyncViewsASGIHandler(TestCase):
+    def test_request_urlconf(self):
+        handler = AsyncViewsASGIHandler()
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+        request, error_response = handler.create_request(scope, None)
+        self.assertIsNone(error_response)
+        self.assertEqual(request.urlconf, "front_end.asgi_urls")
+
+
+@override_settings(ROOT_URLCONF="front_end.asgi_urls")
+class AsyncViewTestCase(FreshRateLimitsMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = AsyncClient()
+
+    async def post(self, path, data):
+        return await self.client.post(
+            path, urlencode(data), content_type=FORM_CONTENT_TYPE
+        )
+
+
+class TestAsyncSignin(AsyncViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "test_user@test.com"
+        cls.password = "abcd12efgh"
+        cls.user = get_user_model().objects.create_user(
+            email=cls.email, password=cls.password
+        )
+
+    async def test_signin_get(self):
+        response = await self.client.get(reverse("registration:login"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "registration/login.html")
+
+    async def test_signin_post_blank_all(self):
+        response = await self.post(reverse("registration:login"), {})
+        self.assertFormError(response, "form", "username", "This field is required.")
+        self.assertFormError(response, "form", "password", "This field is required.")
+
+    async def test_signin_post_invalid_password(self):
+        data = {"username": self.email, "password": "abcd"}
+        response = await self.post(reverse("registration:login"), data)
+        self.assertFormError(response, "form", None, INVALID_LOGIN_ERROR)
+
+    async def test_signin_post_unknown_email(self):
+        data = {"username": f"unknown-{self.email}", "password": self.password}
+        response = await self.post(reverse("registration:login"), data)
+        self.assertFormError(response, "form", None, INVALID_LOGIN_ERROR)
+
+    async def test_signin_success_redirect(self):
+        data = {"username": self.email, "password": self.password}
+        response = await self.post(reverse("registration:login"), data)
+        self.assertRedirects(response, reverse("home"), fetch_redirect_response=False)
+
+    async def test_signin_unsafe_next_ignored(self):
+        data = {
+            "username": self.email,
+            "password": self.password,
+            "next": "https://example.com/",
+        }
+        response = await self.post(reverse("registration:login"), data)
+        self.assertRedirects(response, reverse("home"), fetch_redirect_response=False)
+
+
+class TestAsyncHomeAndSignout(AsyncViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "test_user@test.com"
+        cls.password = "abcd12efgh"
+        cls.user = get_user_model().objects.create_user(
+            email=cls.email, password=cls.password
+        )
+
+    async def test_home_anonymous_redirect(self):
+        response = await self.client.get(reverse("home"))
+        self.assertRedirects(
+            response, reverse("registration:login"), fetch_redirect_response=False
+        )
+
+    async def test_home_authenticated(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        response = await self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "index.html")
+        self.assertContains(response, self.email)
+
+    async def test_signout(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        response = await self.client.get(reverse("registration:logout"))
+        self.assertRedirects(
+            response, reverse("registration:login"), fetch_redirect_response=False
+        )
+        response = await self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 302)
+
+
+class TestAsyncSignup(AsyncViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "test_user1@test.com"
+        cls.password = "abcd12efgh"
+        cls.valid_data = {
+            "email": cls.email,
+            "password1": cls.password,
+            "password2": cls.password,
+        }
+
+    async def test_signup_success(self):
+        response = await self.post(reverse("registration:signup"), self.valid_data)
+        self.assertRedirects(
+            response, reverse("registration:login"), fetch_redirect_response=False
+        )
+        user = await sync_to_async(get_user_model().objects.get)(email=self.email)
+        self.assertTrue(await user.acheck_password(self.password))
+
+    async def test_signup_success_message(self):
+        await self.post(reverse("registration:signup"), self.valid_data)
+        response = await self.client.get(reverse("registration:login"))
+        message = list(response.context.get("messages"))[0]
+        self.assertEqual(message.message, SignupView.success_message)
+
+    async def test_signup_existing_user(self):
+        await sync_to_async(get_user_model().objects.create_user)(
+            email=self.email, password=self.password
+        )
+        response = await self.post(reverse("registration:signup"), self.valid_data)
+        error = "User with this Email already exists."
+        self.assertFormError(response, "form", "email", error)
+
+
+class TestAsyncPasswordViews(TemporaryOutboxMixin, AsyncViewTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "test_user@test.com"
+        cls.old_password = "abcd12efgh"
+        cls.new_password = "efghi56789"
+        cls.user = get_user_model().objects.create_user(
+            email=cls.email, password=cls.old_password
+        )
+
+    async def test_change_password_anonymous_redirect(self):
+        response = await self.client.get(reverse("registration:change_password"))
+        self.assertRedirects(
+            response,
+            "/registration/login/?next=/registration/change_password/",
+            fetch_redirect_response=False,
+        )
+
+    async def test_change_password_success(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        data = {
+            "old_password": self.old_password,
+            "new_password1": self.new_password,
+            "new_password2": self.new_password,
+        }
+        response = await self.post(reverse("registration:change_password"), data)
+        self.assertRedirects(response, reverse("home"), fetch_redirect_response=False)
+
+        # The session survives the password change
+        response = await self.client.get(reverse("home"))
+        message = list(response.context.get("messages"))[0]
+        self.assertEqual(message.message, UserPasswordChangeView.success_message)
+        await sync_to_async(self.user.refresh_from_db)()
+        self.assertTrue(await self.user.acheck_password(self.new_password))
+
+    async def test_reset_password_sends_email(self):
+        response = await self.post(
+            reverse("registration:reset_password"), {"email": self.email}
+        )
+        self.assertRedirects(
+            response, reverse("registration:login"), fetch_redirect_response=False
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        await sync_to_async(outbox.process)()
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,171 @@
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from registration.admin import UserAdmin
+from registration.changelist import estimate_count
+from registration.models import User
+
+PATH = "/admin/registration/user/"
+
+
+class TestEstimateCount(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            User.objects.create_user(email=f"user{i}@example.com", password="x")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE registration_user")
+
+    def test_below_threshold_is_exact(self):
+        User.objects.create_user(email="late@example.com", password="x")
+        self.assertEqual(estimate_count(User.objects.all(), 100), 6)
+
+    def test_table_estimate(self):
+        User.objects.create_user(email="late@example.com", password="x")
+        with self.assertNumQueries(1):
+            self.assertEqual(estimate_count(User.objects.all(), 1), 5)
+
+    def test_filtered_estimate(self):
+        queryset = User.objects.filter(email__lower__startswith="user")
+        with self.assertNumQueries(1):
+            self.assertGreaterEqual(estimate_count(queryset, 1), 1)
+
+
+@mock.patch.object(UserAdmin, "list_per_page", 3)
+@mock.patch.object(UserAdmin, "keyset_threshold", 5)
+class TestUserChangeList(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email="admin@example.com", password="abcd12efgh"
+        )
+        for i in range(7):
+            User.objects.create_user(email=f"user{i}@example.com", password="x")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def emails(self, response):
+        return [user.email for user in response.context["cl"].result_list]
+
+    def test_keyset_pages(self):
+        response = self.client.get(PATH)
+        cl = response.context["cl"]
+        self.assertTrue(cl.keyset)
+        self.assertEqual(cl.result_count, 8)
+        self.assertEqual(
+            self.emails(response),
+            ["admin@example.com", "user0@example.com", "user1@example.com"],
+        )
+        self.assertIsNone(cl.previous_url)
+        self.assertContains(response, "about 8 users")
+
+        response = self.client.get(PATH + cl.next_url)
+        cl = response.context["cl"]
+        self.assertEqual(
+            self.emails(response),
+            ["user2@example.com", "user3@example.com", "user4@example.com"],
+        )
+        self.assertIsNotNone(cl.previous_url)
+
+        response = self.client.get(PATH + cl.next_url)
+        cl = response.context["cl"]
+        self.assertEqual(
+            self.emails(response), ["user5@example.com", "user6@example.com"]
+        )
+        self.assertIsNone(cl.next_url)
+
+        response = self.client.get(PATH + cl.previous_url)
+        self.assertEqual(
+            self.emails(response),
+            ["user2@example.com", "user3@example.com", "user4@example.com"],
+        )
+
+    def test_descending_keyset_pages(self):
+        response = self.client.get(PATH + "?o=-1")
+        cl = response.context["cl"]
+        self.assertTrue(cl.keyset)
+        self.assertEqual(
+            self.emails(response),
+            ["user6@example.com", "user5@example.com", "user4@example.com"],
+        )
+        response = self.client.get(PATH + cl.next_url)
+        self.assertEqual(
+            self.emails(response),
+            ["user3@example.com", "user2@example.com", "user1@example.com"],
+        )
+
+    def test_cursor_dropped_from_other_links(self):
+        response = self.client.get(PATH + "?after=user2@example.com")
+        cl = response.context["cl"]
+        self.assertNotIn("after", cl.get_query_string({"q": "x"}))
+        self.assertNotIn("after", cl.next_url.replace("?after=", "", 1))
+
+    def test_small_results_use_numbered_pages(self):
+        response = self.client.get(PATH + "?q=user1")
+        cl = response.context["cl"]
+        self.assertFalse(cl.keyset)
+        self.assertEqual(self.emails(response), ["user1@example.com"])
+
+    def test_small_results_counted_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(PATH + "?q=user1")
+        counts = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT COUNT(*)") and "user1" in query["sql"]
+        ]
+        self.assertEqual(len(counts), 1)
+
+    def test_other_orderings_use_numbered_pages(self):
+        response = self.client.get(PATH + "?o=2")
+        cl = response.context["cl"]
+        self.assertFalse(cl.keyset)
+        self.assertTrue(cl.multi_page)
+
+    def test_admin_facet_counts(self):
+        response = self.client.get(PATH)
+        self.assertContains(response, "Yes (1)")
+        self.assertContains(response, "No (7)")
+        self.assertEqual(cache.get("registration:admin-count"), 1)
+
+        response = self.client.get(PATH + "?is_admin=1")
+        self.assertEqual(self.emails(response), ["admin@example.com"])
+        self.assertFalse(response.context["cl"].keyset)
+
+    def test_search_script(self):
+        response = self.client.get(PATH)
+        # Hashed, if static files have been collected
+        self.assertContains(response, "registration/admin_search.")
+
+
+class TestGenerateUsers(TestCase):
+    def call(self, *args):
+        out = io.StringIO()
+        call_command("generate_users", *args, stdout=out)
+        return out.getvalue()
+
+    def test_generate_and_delete(self):
+        out = self.call("--count", "5", "--admin-every", "2", "--batch-size", "2")
+        self.assertIn("Added 5 user(s)", out)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(User.objects.filter(is_admin=True).count(), 2)
+        self.assertFalse(User.objects.first().has_usable_password())
+
+        out = self.call("--count", "7")
+        self.assertIn("Added 2 user(s)", out)
+        self.assertTrue(User.objects.filter(email="generated7@example.com").exists())
+
+        User.objects.create_user(email="kept@example.com", password="x")
+        out = self.call("--count", "0", "--delete")
+        self.assertIn("Deleted 7 generated user(s).", out)
+        self.assertEqual(
+            list(User.objects.values_list("email", flat=True)), ["kept@example.com"]
+        )
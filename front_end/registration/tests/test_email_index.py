@@ -0,0 +1,131 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.contrib.admin.sites import AdminSite
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from registration.admin import UserAdmin
+from registration.forms import UserCreateForm
+from registration.models import User
+
+
+def has_trigram_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_indexes WHERE indexname = 'registration_user_email_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+class TestCaseInsensitiveEmail(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="Mixed.Case@Example.com", password="abcd12efgh"
+        )
+
+    def test_get_by_natural_key(self):
+        self.assertEqual(
+            User.objects.get_by_natural_key("mixed.case@example.COM"), self.user
+        )
+
+    def test_login_ignores_case(self):
+        self.assertTrue(
+            self.client.login(username="MIXED.CASE@example.com", password="abcd12efgh")
+        )
+
+    def test_signup_rejects_case_variant(self):
+        form = UserCreateForm(
+            {
+                "email": "mixed.case@example.com",
+                "password1": "abcd12efgh",
+                "password2": "abcd12efgh",
+            }
+        )
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["email"], ["User with this Email already exists."])
+
+    def test_changing_own_email_case(self):
+        self.user.email = "mixed.case@example.com"
+        self.user.validate_unique()
+
+    def test_admin_search(self):
+        User.objects.create_user(email="other@example.org", password="abcd12efgh")
+        admin = UserAdmin(User, AdminSite())
+        request = RequestFactory().get("/")
+        for term, expected in [
+            ("CASE@", [self.user]),
+            ("mi", [self.user]),
+            ("ex", []),
+            ("example .org", ["other@example.org"]),
+        ]:
+            with self.subTest(term=term):
+                queryset, may_have_duplicates = admin.get_search_results(
+                    request, User.objects.all(), term
+                )
+                self.assertFalse(may_have_duplicates)
+                self.assertEqual(
+                    [str(user) for user in queryset], [str(user) for user in expected]
+                )
+
+
+class TestDuplicateEmailCheck(TestCase):
+    def test_lists_case_variants(self):
+        migration = import_module("registration.migrations.0002_email_lower_indexes")
+        schema_editor = SimpleNamespace(connection=connection)
+        first = User.objects.create_user(email="dup@example.com", password="x")
+        with connection.cursor() as cursor:
+            # Rolled back with the test
+            cursor.execute("DROP INDEX registration_user_email_lower_uniq")
+        migration.check_duplicate_emails(None, schema_editor)
+        second = User.objects.create_user(email="Dup@example.com", password="x")
+        message = f"dup@example.com: users {first.pk}, {second.pk}"
+        with self.assertRaisesMessage(RuntimeError, message):
+            migration.check_duplicate_emails(None, schema_editor)
+
+
+class TestEmailIndexPlans(TestCase):
+    """Query plans against a million users."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO registration_user (email, password, is_active, is_admin) "
+                "SELECT 'user' || i || '@example.com', '!', true, false "
+                "FROM generate_series(1, 1000000) AS i"
+            )
+            cursor.execute("ANALYZE registration_user")
+
+    def assertIndexScan(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn("Index", plan)
+        self.assertIn(index, plan)
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_get_by_natural_key(self):
+        self.assertIndexScan(
+            User.objects.filter(email__lower="USER500000@example.com".lower()),
+            "registration_user_email_lower_uniq",
+        )
+
+    def test_signup_duplicate_check(self):
+        self.assertIndexScan(
+            User.objects.filter(email__lower="user500000@example.com").values("pk")[:1],
+            "registration_user_email_lower_uniq",
+        )
+
+    def test_admin_prefix_search(self):
+        self.assertIndexScan(
+            User.objects.filter(email__lower__startswith="user5000"),
+            "registration_user_email_lower_uniq",
+        )
+
+    def test_admin_trigram_search(self):
+        if not has_trigram_index():
+            self.skipTest("pg_trgm is not available")
+        self.assertIndexScan(
+            User.objects.filter(email__lower__contains="er50000@"),
+            "registration_user_email_trgm",
+        )
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from registration import emails
+from registration.forms import UserLoginForm
+from registration.models import User
+
+
+class TestEmails(SimpleTestCase):
+    def setUp(self):
+        emails.clear()
+
+    def test_validate(self):
+        emails.validate("user@example.com")
+        emails.validate("user@bücher.de")
+        for email in ("", "user", "user@", "user@exa mple.com", "@example.com"):
+            with self.assertRaisesMessage(ValidationError, "Enter a valid email"):
+                emails.validate(email)
+
+    def test_validation_is_cached(self):
+        with mock.patch(
+            "registration.emails.validate_email", wraps=emails.validate_email
+        ) as validate_email:
+            for _ in range(3):
+                emails.validate("cached@example.com")
+                with self.assertRaises(ValidationError):
+                    emails.validate("not-an-email")
+        self.assertEqual(validate_email.call_count, 2)
+
+    def test_normalize(self):
+        self.assertEqual(
+            emails.normalize(" John.Doe@Example.COM "), "John.Doe@example.com"
+        )
+        self.assertEqual(emails.normalize("a@Bücher.de"), "a@xn--bcher-kva.de")
+        self.assertEqual(emails.normalize("no-at-sign"), "no-at-sign")
+        self.assertEqual(
+            emails.lookup_key("John.Doe@Example.COM"), "john.doe@example.com"
+        )
+
+    def test_rate_key(self):
+        self.assertEqual(emails.rate_key("J.O.Hn+news@Gmail.com"), "john@gmail.com")
+        self.assertEqual(emails.rate_key("jo.hn+news@outlook.com"), "jo.hn@outlook.com")
+        self.assertEqual(
+            emails.rate_key("jo.hn+news@example.com"), "jo.hn+news@example.com"
+        )
+        with override_settings(EMAIL_FOLDING={}):
+            self.assertEqual(emails.rate_key("j.ohn@gmail.com"), "j.ohn@gmail.com")
+
+
+class TestUserEmails(TestCase):
+    def test_create_user_normalizes(self):
+        user = User.objects.create_user(email="Ann@Bücher.DE", password="abcd12efgh")
+        self.assertEqual(user.email, "Ann@xn--bcher-kva.de")
+        self.assertEqual(User.objects.get_by_natural_key("ann@bücher.de"), user)
+
+    def test_model_validation(self):
+        user = User(email="not-an-email", password="x")
+        with self.assertRaisesMessage(ValidationError, "Enter a valid email"):
+            user.full_clean()
+
+    def test_login_skips_malformed_emails(self):
+        form = UserLoginForm(data={"username": "abcd123", "password": "abcd12efgh"})
+        with mock.patch("django.contrib.auth.forms.authenticate") as authenticate:
+            self.assertFalse(form.is_valid())
+        authenticate.assert_not_called()
+        self.assertEqual(form.errors["__all__"][0][:26], "Please enter a correct ema")
@@ -0,0 +1,128 @@
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.contrib.auth.hashers import make_password
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+    tag,
+)
+
+from front_end.settings.base import PASSWORD_HASHERS
+from registration.hashing import (
+    HashingQueueFull,
+    InlineHashingExecutor,
+    ProcessPoolHashingExecutor,
+    get_executor,
+)
+from registration.middleware import HashingBackpressureMiddleware
+from registration.models import User
+
+INLINE_EXECUTOR = {"BACKEND": "registration.hashing.InlineHashingExecutor"}
+POOLED_EXECUTOR = {
+    "BACKEND": "registration.hashing.ProcessPoolHashingExecutor",
+    "OPTIONS": {"max_workers": 1, "max_queue": 0, "retry_after": 7},
+}
+
+
+class TestGetExecutor(SimpleTestCase):
+    @override_settings(PASSWORD_HASHING_EXECUTOR=INLINE_EXECUTOR)
+    def test_inline_executor(self):
+        self.assertIsInstance(get_executor(), InlineHashingExecutor)
+        self.assertNotIsInstance(get_executor(), ProcessPoolHashingExecutor)
+
+    @override_settings(PASSWORD_HASHING_EXECUTOR=POOLED_EXECUTOR)
+    def test_pooled_executor_options(self):
+        executor = get_executor()
+        self.assertIsInstance(executor, ProcessPoolHashingExecutor)
+        self.assertEqual(executor.max_workers, 1)
+        self.assertEqual(executor.max_queue, 0)
+        self.assertEqual(executor.retry_after, 7)
+
+
+# Tagged "serial" as they start processes, see front_end/runner.py
+@tag("serial")
+@override_settings(PASSWORD_HASHERS=PASSWORD_HASHERS)
+class TestProcessPoolHashingExecutor(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.executor = ProcessPoolHashingExecutor(max_workers=1, max_queue=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        super().tearDownClass()
+
+    def test_make_and_check_password(self):
+        encoded = self.executor.make_password("abcd12efgh")
+        self.assertTrue(encoded.startswith("argon2$"))
+        self.assertTrue(self.executor.check_password("abcd12efgh", encoded))
+        self.assertFalse(self.executor.check_password("wrong", encoded))
+
+    def test_unusable_password(self):
+        encoded = self.executor.make_password(None)
+        self.assertFalse(self.executor.check_password("abcd12efgh", encoded))
+
+    def test_queue_full(self):
+        future = self.executor.submit(time.sleep, 0.5)
+        with self.assertRaises(HashingQueueFull):
+            self.executor.submit(time.sleep, 0)
+        self.assertEqual(self.executor.stats()["rejected"], 1)
+        future.result()
+
+    def test_replaces_a_broken_pool(self):
+        pool = self.executor.pool
+        with self.assertRaises(BrokenProcessPool):
+            self.executor.submit(os._exit, 1).result()
+        self.assertTrue(self.executor.make_password("abcd12efgh"))
+        self.assertIsNot(self.executor.pool, pool)
+        self.assertEqual(self.executor.stats()["in_flight"], 0)
+
+    def test_stats(self):
+        future = self.executor.submit(time.sleep, 0.2)
+        self.assertEqual(self.executor.stats()["in_flight"], 1)
+        self.assertEqual(self.executor.stats()["queue_depth"], 0)
+        future.result()
+
+
+@tag("serial")
+@override_settings(
+    PASSWORD_HASHING_EXECUTOR=POOLED_EXECUTOR, PASSWORD_HASHERS=PASSWORD_HASHERS
+)
+class TestUserPasswordHashing(TestCase):
+    def test_set_and_check_password(self):
+        user = User(email="user@test.com")
+        user.set_password("abcd12efgh")
+        self.assertTrue(user.password.startswith("argon2$"))
+        self.assertTrue(user.check_password("abcd12efgh"))
+        self.assertFalse(user.check_password("abcd"))
+
+    def test_check_password_upgrades_hash(self):
+        user = User.objects.create(
+            email="user@test.com",
+            password=make_password("abcd12efgh", hasher="pbkdf2_sha256"),
+        )
+        self.assertTrue(user.check_password("abcd12efgh"))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("argon2$"))
+
+
+class TestHashingBackpressureMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.middleware = HashingBackpressureMiddleware(lambda request: None)
+        self.request = RequestFactory().post("/registration/login/")
+
+    def test_queue_full_returns_503(self):
+        response = self.middleware.process_exception(
+            self.request, HashingQueueFull(retry_after=3)
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+
+    def test_other_exceptions_ignored(self):
+        response = self.middleware.process_exception(self.request, ValueError())
+        self.assertIsNone(response)
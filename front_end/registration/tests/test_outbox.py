@@ -0,0 +1,123 @@
+import os
+import time
+from io import StringIO
+from smtplib import SMTPException
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from registration import outbox
+from registration.models import User
+from registration.tests.utils import TemporaryOutboxMixin
+
+
+def messages_to(to):
+    return [EmailMessage("Subject", "Body", None, [to])]
+
+
+def failing_messages(**kwargs):
+    raise SMTPException("Mail server unavailable")
+
+
+class CountingBackend(EmailBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        return super().open()
+
+
+class BrokenBackend(EmailBackend):
+    def open(self):
+        raise SMTPException("Connection refused")
+
+
+HANDLER = "registration.tests.test_outbox.messages_to"
+FAILING_HANDLER = "registration.tests.test_outbox.failing_messages"
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=30)
+class TestOutbox(TemporaryOutboxMixin, TestCase):
+    def test_batch_uses_one_connection(self):
+        for i in range(3):
+            outbox.enqueue(HANDLER, to=f"user{i}@test.com")
+        connection = CountingBackend()
+        counts = outbox.process(batch_size=10, connection=connection)
+        self.assertEqual(counts["sent"], 3)
+        self.assertEqual(connection.opened, 1)
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [["user0@test.com"], ["user1@test.com"], ["user2@test.com"]],
+        )
+        self.assertEqual(outbox.jobs(outbox.NEW), [])
+        self.assertEqual(outbox.jobs(outbox.SENDING), [])
+
+    def test_batch_size(self):
+        for i in range(3):
+            outbox.enqueue(HANDLER, to=f"user{i}@test.com")
+        self.assertEqual(outbox.process(batch_size=2)["sent"], 2)
+        self.assertEqual(len(outbox.jobs(outbox.NEW)), 1)
+
+    def test_retry_with_backoff(self):
+        outbox.enqueue(FAILING_HANDLER)
+        self.assertEqual(outbox.process()["retried"], 1)
+        [name] = outbox.jobs(outbox.NEW)
+        due = int(name[:20]) / 1e6
+        self.assertGreaterEqual(due, time.time() + 25)
+        # Not due yet
+        self.assertEqual(outbox.process(), {})
+
+    def test_dead_letter(self):
+        outbox.enqueue(FAILING_HANDLER)
+        outbox.process()
+        [name] = outbox.jobs(outbox.NEW)
+        os.rename(
+            os.path.join(outbox._dir(outbox.NEW), name),
+            os.path.join(outbox._dir(outbox.NEW), "0" * 20 + name[20:]),
+        )
+        self.assertEqual(outbox.process()["dead"], 1)
+        [name] = outbox.jobs(outbox.DEAD)
+        job = outbox._read(outbox.DEAD, name)
+        self.assertEqual(job["attempts"], 2)
+        self.assertEqual(job["errors"][-1], "SMTPException: Mail server unavailable")
+
+    def test_connection_failure_retries_batch(self):
+        outbox.enqueue(HANDLER, to="user@test.com")
+        counts = outbox.process(connection=BrokenBackend())
+        self.assertEqual(counts["retried"], 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_recover(self):
+        outbox.enqueue(HANDLER, to="user@test.com")
+        [name] = outbox.claim(1)
+        self.assertEqual(outbox.recover(older_than=60), 0)
+        path = os.path.join(outbox._dir(outbox.SENDING), name)
+        os.utime(path, (time.time() - 120, time.time() - 120))
+        self.assertEqual(outbox.recover(older_than=60), 1)
+        self.assertEqual(outbox.jobs(outbox.NEW), [name])
+
+    def test_command(self):
+        outbox.enqueue(HANDLER, to="user@test.com")
+        out = StringIO()
+        call_command("send_queued_mail", "--once", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Sent 1, retrying 0, dead 0.")
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class TestPasswordResetQueue(TemporaryOutboxMixin, TestCase):
+    def test_request_does_not_query_users(self):
+        User.objects.create_user(email="user@test.com", password="abcd12efgh")
+        url = reverse("registration:reset_password")
+        for email in ("user@test.com", "nobody@test.com"):
+            with self.assertNumQueries(0):
+                self.client.post(url, {"email": email})
+        self.assertEqual(len(outbox.jobs()), 2)
+        self.assertEqual(outbox.process()["sent"], 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Spending Tree Password Reset")
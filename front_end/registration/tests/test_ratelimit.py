@@ -0,0 +1,208 @@
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from registration import ratelimit
+from registration.models import User
+from registration.ratelimit import RateLimiter, client_ip, parse_rate
+from registration.tests.test_async_views import AsyncViewTestCase
+from registration.tests.utils import FreshRateLimitsMixin
+
+LIMITS = {
+    "login": {"ip": "3/m", "email": "2/m", "global": "5/s"},
+    "reset_password": {"email": "1/h"},
+}
+
+
+class TestRateLimiter(FreshRateLimitsMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("registration.ratelimit.time.time", return_value=0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/m"), (10, 10 / 60))
+        self.assertEqual(parse_rate("5/s"), (5, 5))
+
+    def test_burst_then_refill(self):
+        limiter = RateLimiter("test", {"ip": "2/m"})
+        self.assertEqual(limiter.check({"ip": "a"}), 0)
+        self.assertEqual(limiter.check({"ip": "a"}), 0)
+        self.assertAlmostEqual(limiter.check({"ip": "a"}), 30)
+        self.assertEqual(limiter.check({"ip": "b"}), 0)
+
+        self.clock.return_value = 30
+        self.assertEqual(limiter.check({"ip": "a"}), 0)
+        self.assertAlmostEqual(limiter.check({"ip": "a"}), 30)
+        self.assertEqual((limiter.allowed, limiter.rejected), (4, 2))
+
+    def test_rejected_requests_take_no_tokens(self):
+        limiter = RateLimiter("test", {"ip": "5/m", "email": "1/m"})
+        self.assertEqual(limiter.check({"ip": "a", "email": "x"}), 0)
+        for _ in range(10):
+            self.assertTrue(limiter.check({"ip": "a", "email": "x"}))
+        for i in range(4):
+            self.assertEqual(limiter.check({"ip": "a", "email": f"y{i}"}), 0)
+        self.assertTrue(limiter.check({"ip": "a", "email": "z"}))
+
+    def test_unconfigured_and_missing_keys_are_ignored(self):
+        limiter = RateLimiter("test", {"ip": "1/m"})
+        for _ in range(3):
+            self.assertEqual(limiter.check({"ip": None, "email": "x"}), 0)
+
+    def test_buckets_are_shared_between_processes(self):
+        # As a limiter in another process would be
+        first, second = RateLimiter("test", {"ip": "2/m"}), RateLimiter(
+            "test", {"ip": "2/m"}
+        )
+        self.assertEqual(first.check({"ip": "a"}), 0)
+        self.assertEqual(second.check({"ip": "a"}), 0)
+        self.assertTrue(first.check({"ip": "a"}))
+        self.assertEqual(RateLimiter("other", {"ip": "2/m"}).check({"ip": "a"}), 0)
+
+    def test_buckets_expire_once_full(self):
+        limiter = RateLimiter("test", {"ip": "1/m"})
+        limiter.check({"ip": "a"})
+        key = limiter.key("ip", "a")
+        self.clock.return_value = 59
+        self.assertIsNotNone(caches["ratelimits"].get(key))
+        self.clock.return_value = 61
+        self.assertIsNone(caches["ratelimits"].get(key))
+        self.assertEqual(limiter.check({"ip": "a"}), 0)
+
+
+class TestClientIP(SimpleTestCase):
+    def ip(self, remote_addr, forwarded=None):
+        headers = {"REMOTE_ADDR": remote_addr}
+        if forwarded is not None:
+            headers["HTTP_X_FORWARDED_FOR"] = forwarded
+        return client_ip(RequestFactory().get("/", **headers))
+
+    def test_without_proxies(self):
+        self.assertEqual(self.ip("192.0.2.1", "198.51.100.7"), "192.0.2.1")
+
+    @override_settings(TRUSTED_PROXIES=["127.0.0.1", "10.0.0.0/8"])
+    def test_behind_trusted_proxies(self):
+        self.assertEqual(self.ip("127.0.0.1", "198.51.100.7"), "198.51.100.7")
+        # Addresses before the last untrusted one may be made up
+        self.assertEqual(
+            self.ip("127.0.0.1", "203.0.113.5, 198.51.100.7, 10.1.2.3"),
+            "198.51.100.7",
+        )
+        self.assertEqual(self.ip("127.0.0.1"), "127.0.0.1")
+        # Only trusted proxies are believed
+        self.assertEqual(self.ip("192.0.2.1", "198.51.100.7"), "192.0.2.1")
+
+
+@override_settings(RATELIMITS=LIMITS)
+class TestRateLimitedViews(FreshRateLimitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(email="user@example.com", password="abcd12efgh")
+
+    def login(self, email, ip="192.0.2.1"):
+        return self.client.post(
+            reverse("registration:login"),
+            {"username": email, "password": "wrong-password"},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_per_email(self):
+        self.assertEqual(self.login("user@example.com", "192.0.2.1").status_code, 200)
+        self.assertEqual(self.login("USER@example.com", "192.0.2.2").status_code, 200)
+        with mock.patch("registration.models.get_executor") as get_executor:
+            with self.assertNumQueries(0):
+                response = self.login("user@example.com", "192.0.2.3")
+        get_executor.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+    def test_per_ip(self):
+        for i in range(3):
+            self.assertEqual(self.login(f"user{i}@example.com").status_code, 200)
+        self.assertEqual(self.login("user3@example.com").status_code, 429)
+        self.assertEqual(self.login("user3@example.com", "192.0.2.9").status_code, 200)
+
+    @override_settings(TRUSTED_PROXIES=["127.0.0.1"])
+    def test_per_ip_behind_a_proxy(self):
+        def login(email, ip):
+            return self.client.post(
+                reverse("registration:login"),
+                {"username": email, "password": "wrong-password"},
+                REMOTE_ADDR="127.0.0.1",
+                HTTP_X_FORWARDED_FOR=ip,
+            )
+
+        for i in range(3):
+            self.assertEqual(
+                login(f"user{i}@example.com", "192.0.2.1").status_code, 200
+            )
+        self.assertEqual(login("user3@example.com", "192.0.2.1").status_code, 429)
+        self.assertEqual(login("user3@example.com", "192.0.2.9").status_code, 200)
+
+    # The global bucket refills 5 a second, so the clock is stopped
+    @mock.patch("registration.ratelimit.time.time", return_value=0)
+    def test_global(self, monotonic):
+        for i in range(5):
+            response = self.login(f"user{i}@example.com", f"192.0.2.{i}")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.login("other@example.com", "192.0.2.99").status_code, 429)
+
+    def test_get_is_not_limited(self):
+        for _ in range(5):
+            self.login("user@example.com")
+        self.assertEqual(
+            self.client.get(reverse("registration:login")).status_code, 200
+        )
+
+    def test_password_reset(self):
+        url = reverse("registration:reset_password")
+        self.client.post(url, {"email": "user@example.com"})
+        response = self.client.post(url, {"email": "user@example.com"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "3600")
+
+    def test_no_unlimited_auth_views(self):
+        # django.contrib.auth.urls would serve these without the limits
+        for urlconf in ["front_end.urls", "front_end.asgi_urls"]:
+            for path in [
+                "password_reset/",
+                "password_change/",
+                "password_reset/done/",
+                "reset/done/",
+            ]:
+                with self.subTest(urlconf=urlconf, path=path), self.settings(
+                    ROOT_URLCONF=urlconf
+                ):
+                    response = self.client.post(
+                        f"/registration/{path}", {"email": "user@example.com"}
+                    )
+                    self.assertEqual(response.status_code, 404)
+
+
+@override_settings(RATELIMITS=LIMITS)
+class TestAsyncRateLimitedViews(AsyncViewTestCase):
+    async def test_signin(self):
+        data = {"username": "user@example.com", "password": "wrong-password"}
+        for _ in range(2):
+            response = await self.post(reverse("registration:login"), data)
+            self.assertEqual(response.status_code, 200)
+        response = await self.post(reverse("registration:login"), data)
+        self.assertEqual(response.status_code, 429)
+
+    async def test_checks_off_the_event_loop(self):
+        threads = []
+
+        def check_request(*args):
+            threads.append(threading.current_thread())
+            return None
+
+        data = {"username": "user@example.com", "password": "wrong-password"}
+        with mock.patch.object(ratelimit, "check_request", check_request):
+            await self.post(reverse("registration:login"), data)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
@@ -0,0 +1,188 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from registration.lru import LRUCache
+from registration.models import User
+from registration.sessions import SessionStore
+from registration.touches import TouchBuffer, last_logins, session_expiries
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "users",
+    },
+    "ratelimits": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ratelimits",
+    },
+}
+
+
+class TestLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SESSION_TOUCH_INTERVAL=60)
+class TestSessionStore(TestCase):
+    def setUp(self):
+        SessionStore.local.clear()
+        session_expiries.flush()
+
+    def create_session(self, **data):
+        session = SessionStore()
+        session.update(data)
+        session.create()
+        return session
+
+    def test_load_from_local_cache(self):
+        session = self.create_session(colour="green")
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session.session_key)["colour"], "green")
+
+    def test_load_from_database(self):
+        session = self.create_session(colour="green")
+        SessionStore.local.clear()
+        session._cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(session.session_key)["colour"], "green")
+
+    def test_unchanged_save_is_skipped(self):
+        session = self.create_session(colour="green")
+        session = SessionStore(session.session_key)
+        session["colour"] = "green"
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_save_writes_through(self):
+        session = self.create_session(colour="green")
+        session = SessionStore(session.session_key)
+        session["colour"] = "blue"
+        session.save()
+        row = Session.objects.get(pk=session.session_key)
+        self.assertEqual(session.decode(row.session_data), {"colour": "blue"})
+        self.assertEqual(SessionStore(session.session_key)["colour"], "blue")
+
+    def test_expiry_touch_is_buffered(self):
+        session = self.create_session(colour="green")
+        session = SessionStore(session.session_key)
+        self.assertEqual(session["colour"], "green")
+        # As if the session had been saved two minutes ago
+        session._stored = session._stored._replace(
+            expire_date=session._stored.expire_date - timedelta(minutes=2)
+        )
+        with self.assertNumQueries(0):
+            session.save()
+        self.assertIn(session.session_key, session_expiries.pending())
+        self.assertEqual(session_expiries.flush(), 1)
+        row = Session.objects.get(pk=session.session_key)
+        self.assertEqual(row.expire_date, session._stored.expire_date)
+
+    def test_recent_expiry_is_not_touched(self):
+        session = self.create_session(colour="green")
+        session = SessionStore(session.session_key)
+        self.assertEqual(session["colour"], "green")
+        session.save()
+        self.assertEqual(session_expiries.pending(), {})
+
+    def test_delete(self):
+        session = self.create_session(colour="green")
+        session.delete()
+        self.assertFalse(Session.objects.filter(pk=session.session_key).exists())
+        self.assertEqual(SessionStore(session.session_key).load(), {})
+
+    @override_settings(SESSION_WRITE_THROUGH=False)
+    def test_cache_only(self):
+        session = self.create_session(colour="green")
+        self.assertFalse(Session.objects.filter(pk=session.session_key).exists())
+        SessionStore.local.clear()
+        self.assertEqual(SessionStore(session.session_key)["colour"], "green")
+
+    def test_authenticated_page_view(self):
+        User.objects.create_user(email="user@test.com", password="abcd12efgh")
+        self.client.post(
+            reverse("registration:login"),
+            {"username": "user@test.com", "password": "abcd12efgh"},
+        )
+        # The user lookup for request.user only; the session comes from the LRU
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+
+
+class TestTouchBuffer(TestCase):
+    def test_flush_when_full(self):
+        users = [
+            User.objects.create_user(email=f"user{i}@test.com", password="abcd12efgh")
+            for i in range(3)
+        ]
+        buffer = TouchBuffer("registration.User", "last_login", max_pending=3)
+        now = timezone.now()
+        buffer.touch(users[0].pk, now)
+        buffer.touch(users[1].pk, now)
+        self.assertFalse(User.objects.filter(last_login=now).exists())
+        with self.assertNumQueries(1):
+            buffer.touch(users[2].pk, now)
+        self.assertEqual(User.objects.filter(last_login=now).count(), 3)
+        self.assertEqual(buffer.pending(), {})
+
+    def test_login_is_buffered(self):
+        last_logins.flush()
+        user = User.objects.create_user(email="user@test.com", password="abcd12efgh")
+        self.client.login(username="user@test.com", password="abcd12efgh")
+        self.assertIsNone(User.objects.get(pk=user.pk).last_login)
+        self.assertIn(user.pk, last_logins.pending())
+        last_logins.flush()
+        self.assertIsNotNone(User.objects.get(pk=user.pk).last_login)
+
+
+class TestTouchBufferTimer(TransactionTestCase):
+    def test_flush_when_due_without_another_touch(self):
+        user = User.objects.create_user(email="user@test.com", password="abcd12efgh")
+        buffer = TouchBuffer("registration.User", "last_login", max_delay=0.05)
+        now = timezone.now()
+        buffer.touch(user.pk, now)
+        timer = buffer._timer
+        timer.join(5)
+        self.assertEqual(buffer.pending(), {})
+        self.assertEqual(User.objects.get(pk=user.pk).last_login, now)
+
+
+class TestExpireSessions(TestCase):
+    def test_deletes_expired_sessions_in_chunks(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(
+                session_key=f"expired{i}", session_data="", expire_date=now
+            )
+        Session.objects.create(
+            session_key="active", session_data="", expire_date=now + timedelta(1)
+        )
+        out = StringIO()
+        with self.assertNumQueries(7):
+            call_command("expire_sessions", chunk_size=2, stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Deleted 5 expired session(s).")
+        self.assertQuerysetEqual(Session.objects.all(), ["active"], lambda s: s.pk)
@@ -0,0 +1,248 @@
+import io
+
+from django.core import signing
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from registration import tokens
+from registration.models import RevokedToken, User
+from registration.tests.utils import FreshRateLimitsMixin
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "users",
+    },
+    "ratelimits": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ratelimits",
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestTokens(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="tokens@example.com", password="abcd12efgh"
+        )
+
+    def setUp(self):
+        tokens.local.clear()
+
+    def test_verify_access(self):
+        pair = tokens.issue(self.user)
+        # Whether the sign-in was revoked, then from the local cache
+        with self.assertNumQueries(1):
+            payload = tokens.verify_access(pair["access_token"])
+        with self.assertNumQueries(0):
+            tokens.verify_access(pair["access_token"])
+        self.assertEqual(payload["u"], self.user.pk)
+        self.assertEqual(pair["token_type"], "Bearer")
+
+        for token in ("", "garbage", pair["access_token"] + "x", pair["refresh_token"]):
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.verify_access(token)
+
+    def test_access_token_expires(self):
+        pair = tokens.issue(self.user)
+        with override_settings(TOKEN_ACCESS_TTL=-1):
+            with self.assertRaisesMessage(tokens.InvalidToken, "Signature age"):
+                tokens.verify_access(pair["access_token"])
+
+    def test_refresh_rotates(self):
+        first = tokens.issue(self.user)
+        second = tokens.refresh(first["refresh_token"])
+        self.assertNotEqual(second["refresh_token"], first["refresh_token"])
+        self.assertEqual(
+            tokens.verify_access(second["access_token"])["f"],
+            tokens.verify_access(first["access_token"])["f"],
+        )
+
+    def test_reused_refresh_token_revokes_the_family(self):
+        first = tokens.issue(self.user)
+        second = tokens.refresh(first["refresh_token"])
+        with self.assertRaisesMessage(tokens.InvalidToken, "reused"):
+            tokens.refresh(first["refresh_token"])
+        for token in (first["access_token"], second["access_token"]):
+            with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+                tokens.verify_access(token)
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.refresh(second["refresh_token"])
+        # Other sign-ins keep working
+        tokens.verify_access(tokens.issue(self.user)["access_token"])
+
+    def test_password_change_stops_refresh(self):
+        pair = tokens.issue(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password("new-password-1")
+        user.save()
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.refresh(pair["refresh_token"])
+
+    def test_revocation_is_shared(self):
+        pair = tokens.issue(self.user)
+        tokens.verify_access(pair["access_token"])
+        tokens.revoke_refresh(pair["refresh_token"])
+        # Another process, which has nothing in its local cache
+        tokens.local.clear()
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.verify_access(pair["access_token"])
+
+    def test_local_cache_answers_until_its_ttl(self):
+        pair = tokens.issue(self.user)
+        family = tokens.verify_access(pair["access_token"])["f"]
+        # Revoked by another process
+        RevokedToken.objects.create(token_id=family, expires_at=tokens._expires_at())
+        with self.assertNumQueries(0):
+            tokens.verify_access(pair["access_token"])
+        tokens.local.clear()
+        with self.assertRaisesMessage(tokens.InvalidToken, "revoked"):
+            tokens.verify_access(pair["access_token"])
+
+    def test_expire_tokens(self):
+        with override_settings(TOKEN_REFRESH_TTL=-1):
+            tokens.revoke("expired")
+        tokens.revoke("live")
+        out = io.StringIO()
+        call_command("expire_tokens", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Deleted 1 expired revocation(s).")
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("token_id", flat=True)), ["live"]
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TestTokenViews(FreshRateLimitsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.email = "tokenviews@example.com"
+        cls.password = "abcd12efgh"
+        cls.user = User.objects.create_user(email=cls.email, password=cls.password)
+
+    def setUp(self):
+        super().setUp()
+        tokens.local.clear()
+
+    def obtain(self):
+        response = self.client.post(
+            reverse("registration:token"),
+            {"email": self.email, "password": self.password},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        return response.json()
+
+    def bearer(self, token):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_obtain_token(self):
+        pair = self.obtain()
+        self.assertEqual(
+            set(pair), {"access_token", "token_type", "expires_in", "refresh_token"}
+        )
+        response = self.client.post(
+            reverse("registration:token"),
+            {"email": self.email, "password": "wrong"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "invalid_grant")
+        self.assertEqual(
+            self.client.get(reverse("registration:token")).status_code, 405
+        )
+
+    def test_me(self):
+        response = self.client.get(reverse("registration:me"))
+        self.assertEqual(response.status_code, 401)
+
+        pair = self.obtain()
+        response = self.client.get(
+            reverse("registration:me"), **self.bearer(pair["access_token"])
+        )
+        self.assertEqual(response.json(), {"email": self.email, "is_admin": False})
+        # No session is started for token requests
+        self.assertNotIn("sessionid", response.cookies)
+
+        self.client.login(email=self.email, password=self.password)
+        response = self.client.get(reverse("registration:me"))
+        self.assertEqual(response.json()["email"], self.email)
+
+    def test_invalid_token(self):
+        response = self.client.get(reverse("registration:me"), **self.bearer("nope"))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer error="invalid_token"')
+        # Other schemes are left to the session
+        response = self.client.get(
+            reverse("registration:me"), HTTP_AUTHORIZATION="Basic dXNlcjpwdw=="
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn("WWW-Authenticate", response)
+
+    def test_token_requests_skip_csrf(self):
+        pair = self.obtain()
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(
+            reverse("registration:change_password"),
+            {
+                "old_password": self.password,
+                "new_password1": "Changed-pw-123",
+                "new_password2": "Changed-pw-123",
+            },
+            **self.bearer(pair["access_token"]),
+        )
+        self.assertEqual(response.status_code, 302)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.check_password("Changed-pw-123"))
+
+    def test_refresh_and_revoke(self):
+        pair = self.obtain()
+        response = self.client.post(
+            reverse("registration:token_refresh"),
+            {"refresh_token": pair["refresh_token"]},
+        )
+        new_pair = response.json()
+        response = self.client.post(
+            reverse("registration:token_refresh"),
+            {"refresh_token": pair["refresh_token"]},
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            reverse("registration:token_revoke"), {"refresh_token": "unknown"}
+        )
+        self.assertEqual(response.status_code, 204)
+        self.client.post(
+            reverse("registration:token_revoke"),
+            {"refresh_token": new_pair["refresh_token"]},
+        )
+        response = self.client.get(
+            reverse("registration:me"), **self.bearer(new_pair["access_token"])
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(ROOT_URLCONF="front_end.asgi_urls")
+    async def test_async_home(self):
+        pair = tokens.issue(self.user)
+        # The async client takes header names as they're sent
+        response = await AsyncClient().get(
+            reverse("home"), authorization=f"Bearer {pair['access_token']}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_signed_with_the_secret_key(self):
+        pair = tokens.issue(self.user)
+        with override_settings(SECRET_KEY="another-secret"):
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.verify_access(pair["access_token"])
+        self.assertEqual(
+            signing.loads(pair["access_token"], salt=tokens.ACCESS_SALT)["u"],
+            self.user.pk,
+        )
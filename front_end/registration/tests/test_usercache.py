@@ -0,0 +1,92 @@
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from registration import usercache
+from registration.admin import UserChangeForm
+from registration.backends import EmailBackend
+from registration.models import User
+
+
+class TestUserCache(TransactionTestCase):
+    def setUp(self):
+        usercache.local.clear()
+        self.user = User.objects.create_user(
+            email="user@test.com", password="abcd12efgh"
+        )
+        self.backend = EmailBackend()
+
+    def test_get_user_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_shared_tier(self):
+        self.backend.get_user(self.user.pk)
+        usercache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_create_user_invalidates(self):
+        usercache.cache_user(User(pk=self.user.pk + 1, email="stale@test.com"))
+        user = User.objects.create_user(email="new@test.com", password="abcd12efgh")
+        self.assertEqual(user.pk, self.user.pk + 1)
+        self.assertEqual(self.backend.get_user(user.pk).email, "new@test.com")
+
+    def test_create_superuser_invalidates(self):
+        user = User.objects.create_superuser(
+            email="admin@test.com", password="abcd12efgh"
+        )
+        self.assertTrue(self.backend.get_user(user.pk).is_admin)
+
+    def test_set_password_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        self.user.set_password("new-password-123")
+        self.user.save()
+        self.assertTrue(
+            self.backend.get_user(self.user.pk).check_password("new-password-123")
+        )
+
+    def test_row_loaded_before_a_save_is_not_served(self):
+        _, version = usercache.get_user(self.user.pk)
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.set_password("new-password-123")
+        self.user.save()
+        # The reader caches what it loaded after the save invalidated it
+        usercache.cache_user(stale, version)
+        self.assertTrue(
+            self.backend.get_user(self.user.pk).check_password("new-password-123")
+        )
+
+    def test_admin_change_form_invalidates(self):
+        self.backend.get_user(self.user.pk)
+        form = UserChangeForm(
+            {"email": "user@test.com", "is_active": False, "is_admin": False},
+            instance=self.user,
+            initial={"password": self.user.password},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_delete_invalidates(self):
+        user_id = self.user.pk
+        self.backend.get_user(user_id)
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(user_id))
+
+    def test_warm_home_page_has_no_queries(self):
+        self.client.login(username="user@test.com", password="abcd12efgh")
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "index.html")
+
+
+class TestUserCacheInTransaction(TestCase):
+    def test_uncommitted_user_is_not_cached(self):
+        user = User.objects.create_user(email="user@test.com", password="abcd12efgh")
+        EmailBackend().get_user(user.pk)
+        with self.assertNumQueries(1):
+            EmailBackend().get_user(user.pk)
@@ -0,0 +1,138 @@
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import hashers
+from django.core.management import CommandError, call_command
+from django.test import TestCase, tag
+
+from registration.models import User
+from registration.userio import UserImporter, export_users, read_rows
+
+CSV = """email,password,password_hash,is_active,is_admin
+one@Example.COM,abcd12efgh,,,
+two@example.com,,{hash},true,true
+one@Example.COM,different,,,
+not-an-email,abcd12efgh,,,
+three@example.com,,unknown$nope$0000,,
+four@example.com,,,f,
+existing@example.com,abcd12efgh,,,
+"""
+
+
+class TestUserImporter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hash = hashers.make_password("pre-hashed-1", hasher="pbkdf2_sha256")
+        User.objects.create_user(email="existing@example.com", password="abcd12efgh")
+
+    def run_import(self, data, **options):
+        errors = []
+        importer = UserImporter(
+            workers=1, on_error=lambda *error: errors.append(error), **options
+        )
+        stats = importer.run(read_rows(io.StringIO(data), "csv"))
+        return stats, errors
+
+    def test_import(self):
+        stats, errors = self.run_import(CSV.format(hash=self.hash), batch_size=3)
+        self.assertEqual(stats["read"], 7)
+        self.assertEqual(stats["imported"], 3)
+        self.assertEqual(stats["duplicates"], 2)
+        self.assertEqual(stats["invalid"], 2)
+        self.assertEqual([line for line, _ in errors], [4, 5])
+        self.assertGreater(stats["max_rss"], 0)
+
+        one = User.objects.get(email="one@example.com")
+        self.assertTrue(one.check_password("abcd12efgh"))
+        self.assertTrue(one.is_active)
+        two = User.objects.get(email="two@example.com")
+        self.assertEqual(two.password, self.hash)
+        self.assertTrue(two.is_admin)
+        four = User.objects.get(email="four@example.com")
+        self.assertFalse(four.has_usable_password())
+        self.assertFalse(four.is_active)
+
+    def test_values_the_copy_would_reject_are_invalid_rows(self):
+        long_email = f"{'a' * 64}@{'b' * 63}.{'c' * 63}.{'d' * 63}.com"
+        data = (
+            "email,password,last_login\n"
+            "one@example.com,abcd12efgh,2026-01-02T03:04:05Z\n"
+            "two@example.com,abcd12efgh,yesterday\n"
+            f"{long_email},abcd12efgh,\n"
+            "three@example.com,abcd12efgh,2026-01-02 03:04:05\n"
+        )
+        stats, errors = self.run_import(data)
+        self.assertEqual(stats["imported"], 2)
+        self.assertEqual([line for line, _ in errors], [2, 3])
+        self.assertIn("'yesterday' is not a date and time", errors[0][1])
+        self.assertIn("at most 254 characters", errors[1][1])
+        self.assertEqual(
+            User.objects.get(email="three@example.com").last_login,
+            datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        )
+
+    @tag("serial")
+    def test_parallel_hashing(self):
+        data = "email,password\n" + "".join(
+            f"user{i}@example.com,password-{i}\n" for i in range(4)
+        )
+        stats = UserImporter(workers=2).run(read_rows(io.StringIO(data), "csv"))
+        self.assertEqual(stats["imported"], 4)
+        user = User.objects.get(email="user3@example.com")
+        self.assertTrue(user.check_password("password-3"))
+
+
+class TestImportExportCommands(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        User.objects.create_user(email="a@example.com", password="abcd12efgh")
+        User.objects.create_superuser(email="b@example.com", password="abcd12efgh")
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_export_csv(self):
+        out = io.StringIO()
+        export_users(out, "csv")
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(
+            rows[0], ["email", "password_hash", "is_active", "is_admin", "last_login"]
+        )
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][0], "b@example.com")
+        self.assertEqual(rows[2][1], User.objects.get(email="b@example.com").password)
+        self.assertEqual(rows[2][2:], ["t", "t", ""])
+
+    def test_round_trip(self):
+        for format in ("csv", "jsonl"):
+            with self.subTest(format=format):
+                path = self.path(f"users.{format}")
+                call_command("export_users", path, stdout=io.StringIO())
+                User.objects.all().delete()
+                out = io.StringIO()
+                call_command("import_users", path, "--workers", "1", stdout=out)
+                self.assertIn("Imported 2 of 2 row(s)", out.getvalue())
+                self.assertIn("rows/s, peak memory", out.getvalue())
+                b = User.objects.get(email="b@example.com")
+                self.assertTrue(b.is_admin)
+                self.assertTrue(b.check_password("abcd12efgh"))
+
+    def test_export_jsonl(self):
+        path = self.path("users.jsonl")
+        call_command("export_users", path, stdout=io.StringIO())
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(
+            [row["email"] for row in rows], ["a@example.com", "b@example.com"]
+        )
+        self.assertEqual(rows[1]["is_admin"], True)
+        self.assertIsNone(rows[1]["last_login"])
+
+    def test_missing_file(self):
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            call_command("import_users", self.path("missing.csv"))
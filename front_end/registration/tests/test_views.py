@@ -1,5 +1,10 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.contrib.auth.tokens import (
+    PasswordResetTokenGenerator,
+    default_token_generator,
+)
 from django.core import mail
 from django.shortcuts import resolve_url
 from django.test import Client, TestCase
@@ -7,6 +12,8 @@ from django.urls import reverse
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
+from registration import outbox
+from registration.tests.utils import FreshRateLimitsMixin, TemporaryOutboxMixin
 from registration.views import (
     SigninView,
     SignupView,
@@ -96,7 +103,7 @@ class TestSignupView(TestCase):
         self.assertEqual(message.message, SignupView.success_message)
 
 
-class TestSigninView(TestCase):
+class TestSigninView(FreshRateLimitsMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.email = "test_user@test.com"
@@ -113,26 +120,26 @@ class TestSigninView(TestCase):
         self.assertTemplateUsed(response, "registration/login.html")
 
     def test_signin_view_url_accessible_by_name(self):
-        response = self.client.get(reverse("login"))
+        response = self.client.get(reverse("registration:login"))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "registration/login.html")
 
     def test_signin_view_post_blank_password(self):
-        response = self.client.post(reverse("login"), {"username": self.email})
+        response = self.client.post(reverse("registration:login"), {"username": self.email})
         self.assertFormError(response, "form", "password", "This field is required.")
 
     def test_signin_view_post_blank_email(self):
-        response = self.client.post(reverse("login"), {"password": self.password})
+        response = self.client.post(reverse("registration:login"), {"password": self.password})
         self.assertFormError(response, "form", "username", "This field is required.")
 
     def test_signin_view_post_blank_email_password(self):
-        response = self.client.post(reverse("login"), {})
+        response = self.client.post(reverse("registration:login"), {})
         self.assertFormError(response, "form", "username", "This field is required.")
         self.assertFormError(response, "form", "password", "This field is required.")
 
     def test_signin_view_post_invalid_email(self):
         data = {"username": "abcd123", "password": self.password}
-        response = self.client.post(reverse("login"), data)
+        response = self.client.post(reverse("registration:login"), data)
         error = (
             "Please enter a correct email and password. "
             "Note that both fields may be case-sensitive."
@@ -141,7 +148,7 @@ class TestSigninView(TestCase):
 
     def test_signin_view_post_invalid_password(self):
         data = {"username": self.email, "password": "abcd"}
-        response = self.client.post(reverse("login"), data)
+        response = self.client.post(reverse("registration:login"), data)
         error = (
             "Please enter a correct email and password. "
             "Note that both fields may be case-sensitive."
@@ -149,16 +156,16 @@ class TestSigninView(TestCase):
         self.assertFormError(response, "form", None, error)
 
     def test_signin_view_success_redirect(self):
-        response = self.client.post(reverse("login"), self.valid_data)
+        response = self.client.post(reverse("registration:login"), self.valid_data)
         self.assertRedirects(response, reverse("home"))
 
     def test_signin_view_anonymous_get(self):
         response = self.client.get(reverse("home"), follow=True)
-        self.assertRedirects(response, reverse("login"))
+        self.assertRedirects(response, reverse("registration:login"))
 
     def test_signin_view_anonymous_post(self):
         response = self.client.post(reverse("home"), follow=True)
-        self.assertRedirects(response, reverse("login"))
+        self.assertRedirects(response, reverse("registration:login"))
 
 
 class TestSignupView(TestCase):
@@ -241,7 +248,7 @@ class TestSignupView(TestCase):
         self.assertEqual(message.message, SignupView.success_message)
 
 
-class TestUserPasswordResetView(TestCase):
+class TestUserPasswordResetView(FreshRateLimitsMixin, TemporaryOutboxMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.email = "test_user@test.com"
@@ -267,13 +274,8 @@ class TestUserPasswordResetView(TestCase):
         self.assertFormError(response, "form", "email", "This field is required.")
 
     def test_password_reset_view_post_invalid_email(self):
-        # This is a weird one. It still accepts invalid
-        # password with incorrect email. EmailValidator
-        # isn't working for some reason?
-        response = self.client.post(self.view_url, {"email": "abvd"}, follow=True)
-        message = list(response.context.get("messages"))[0]
-        self.assertEqual(message.tags, "alert-success")
-        self.assertEqual(message.message, UserPasswordResetView.success_message)
+        response = self.client.post(self.view_url, {"email": "abvd"})
+        self.assertFormError(response, "form", "email", "Enter a valid email address.")
 
     def test_password_reset_view_post_valid_email(self):
         response = self.client.post(self.view_url, {"email": self.email}, follow=True)
@@ -283,17 +285,22 @@ class TestUserPasswordResetView(TestCase):
 
     def test_password_reset_view_success_redirect(self):
         response = self.client.post(self.view_url, {"email": self.email})
-        self.assertRedirects(response, reverse("login"))
+        self.assertRedirects(response, reverse("registration:login"))
 
     def test_password_reset_view_send_email(self):
         response = self.client.post(self.view_url, {"email": self.email})
+        # Queued by the view, sent by the worker
+        self.assertEqual(len(mail.outbox), 0)
+        outbox.process()
         self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.email])
+        self.assertIn("/registration/reset/", mail.outbox[0].body)
 
     def test_password_reset_view_non_existing_user_redirect(self):
         response = self.client.post(
             self.view_url, {"email": f"non-existing-{self.email}"}
         )
-        self.assertRedirects(response, reverse("login"))
+        self.assertRedirects(response, reverse("registration:login"))
 
     def test_password_reset_view_non_existing_user_success_message(self):
         response = self.client.post(
@@ -307,9 +314,10 @@ class TestUserPasswordResetView(TestCase):
         response = self.client.post(
             self.view_url, {"email": f"non-existing-{self.email}"}, follow=True
         )
+        self.assertEqual(outbox.process()["sent"], 1)
         self.assertEqual(len(mail.outbox), 0)
 
-class TestUserPasswordChangeView(TestCase):
+class TestUserPasswordChangeView(FreshRateLimitsMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.email = "test_user@test.com"
@@ -389,7 +397,7 @@ class TestUserPasswordChangeView(TestCase):
         # Try to login with new (incorrect) password
         incorrect_login_client = Client()
         login_data = {"username": self.email, "password": self.new_password}
-        login_response = incorrect_login_client.post(reverse("login"), login_data)
+        login_response = incorrect_login_client.post(reverse("registration:login"), login_data)
         error = (
             "Please enter a correct email and password. "
             "Note that both fields may be case-sensitive."
@@ -403,10 +411,10 @@ class TestUserPasswordChangeView(TestCase):
 
         # Try to login
         login_client = Client()
-        login_response = login_client.post(reverse("login"), login_data)
+        login_response = login_client.post(reverse("registration:login"), login_data)
         self.assertRedirects(login_response, reverse("home"))
 
-class TestUserPasswordResetConfirmView(TestCase):
+class TestUserPasswordResetConfirmView(FreshRateLimitsMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.email = "test_user1@test.com"
@@ -423,7 +431,7 @@ class TestUserPasswordResetConfirmView(TestCase):
         cls.token = token_generator.make_token(cls.user)
 
         cls.get_view_url = resolve_url(
-            "password_reset_confirm", cls.user_b64, cls.token
+            "registration:password_reset_confirm", cls.user_b64, cls.token
         )
         cls.post_view_url = f"/registration/reset/{cls.user_b64}/set-password/"
 
@@ -434,9 +442,9 @@ class TestUserPasswordResetConfirmView(TestCase):
         session.save()
 
     def _invalid_user_base64(self):
-        last_char = self.user_b64[:-1]
-        new_char = "y" if last_char == "x" else "x"
-        return f"{self.user_b64[:-1]}{new_char}"
+        # Changing the last base64 character can leave the decoded id intact,
+        # so encode the id of a user that doesn't exist instead
+        return urlsafe_base64_encode(force_bytes(self.user.pk + 1))
 
     def _invalid_user_token(self):
         last_char = self.token[:-1]
@@ -459,7 +467,7 @@ class TestUserPasswordResetConfirmView(TestCase):
         # Try to login with new (incorrect) password
         login_client = Client()
         login_data = {"username": self.email, "password": self.new_psw}
-        login_response = login_client.post(reverse("login"), login_data)
+        login_response = login_client.post(reverse("registration:login"), login_data)
         error = (
             "Please enter a correct email and password. "
             "Note that both fields may be case-sensitive."
@@ -469,11 +477,11 @@ class TestUserPasswordResetConfirmView(TestCase):
         # Reset password
         self._init_session_token()
         password_reset_response = self.client.post(self.post_view_url, self.valid_data)
-        self.assertRedirects(password_reset_response, reverse("login"))
+        self.assertRedirects(password_reset_response, reverse("registration:login"))
 
         # Try to login
         login_client = Client()
-        login_response = login_client.post(reverse("login"), login_data)
+        login_response = login_client.post(reverse("registration:login"), login_data)
         self.assertRedirects(login_response, reverse("home"))
 
     def test_password_reset_confirm_view_success_message(self):
@@ -529,19 +537,19 @@ class TestUserPasswordResetConfirmView(TestCase):
 
     def test_password_reset_confirm_view_invalid_user_get_redirected(self):
         invalid_u64 = self._invalid_user_base64()
-        url = resolve_url("password_reset_confirm", invalid_u64, self.token)
+        url = resolve_url("registration:password_reset_confirm", invalid_u64, self.token)
         response = self.client.get(url)
         self.assertRedirects(response, reverse("registration:login"))
 
     def test_password_reset_confirm_view_invalid_token_get_redirected(self):
         invalid_token = self._invalid_user_token()
-        url = resolve_url("password_reset_confirm", self.user_b64, invalid_token)
+        url = resolve_url("registration:password_reset_confirm", self.user_b64, invalid_token)
         response = self.client.get(url)
         self.assertRedirects(response, reverse("registration:login"))
 
     def test_password_reset_confirm_view_invalid_user_redirect_get_message(self):
         invalid_u64 = self._invalid_user_base64()
-        url = resolve_url("password_reset_confirm", invalid_u64, self.token)
+        url = resolve_url("registration:password_reset_confirm", invalid_u64, self.token)
 
         response = self.client.get(url, follow=True)
         message = list(response.context.get("messages"))[0]
@@ -550,9 +558,34 @@ class TestUserPasswordResetConfirmView(TestCase):
 
     def test_password_reset_confirm_view_invalid_token_get_message(self):
         invalid_token = self._invalid_user_token()
-        url = resolve_url("password_reset_confirm", self.user_b64, invalid_token)
+        url = resolve_url("registration:password_reset_confirm", self.user_b64, invalid_token)
 
         response = self.client.get(url, follow=True)
         message = list(response.context.get("messages"))[0]
         self.assertEqual(message.tags, "alert-danger")
         self.assertEqual(message.message, UserPasswordResetConfirmView.error_message)
+
+    def test_password_reset_confirm_view_queries(self):
+        # The user, then creating the session with the token
+        with self.assertNumQueries(5):
+            self.client.get(self.get_view_url)
+        # The user; the session comes from its cache
+        with self.assertNumQueries(1):
+            self.client.get(self.post_view_url)
+        # The user, the new password and the session without the token
+        with self.assertNumQueries(5):
+            response = self.client.post(self.post_view_url, self.valid_data)
+        self.assertRedirects(response, reverse("registration:login"))
+
+    def test_password_reset_confirm_view_checks_token_once(self):
+        invalid_token = self._invalid_user_token()
+        for token in (self.token, invalid_token, "set-password"):
+            url = resolve_url("registration:password_reset_confirm", self.user_b64, token)
+            with mock.patch.object(
+                default_token_generator,
+                "check_token",
+                wraps=default_token_generator.check_token,
+            ) as check_token:
+                self.client.get(url)
+            self.assertEqual(check_token.call_count, 1)
+
@@ -0,0 +1,24 @@
+import shutil
+import tempfile
+
+from registration import ratelimit
+
+
+class TemporaryOutboxMixin:
+    """Point OUTBOX_DIR at a temporary directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        outbox_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outbox_dir)
+        override = self.settings(OUTBOX_DIR=outbox_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class FreshRateLimitsMixin:
+    """Start each test with empty rate limit buckets."""
+
+    def setUp(self):
+        super().setUp()
+        ratelimit.reset()
@@ -0,0 +1,182 @@
+"""
+Signed bearer tokens for API clients.
+
+POSTing an email and password to registration:token returns a pair:
+
+- an access token, sent as ``Authorization: Bearer <token>``. It is checked
+  by its HMAC signature, its age and whether its sign-in was revoked, so
+  TokenAuthenticationMiddleware authenticates a request without a session;
+  the user is only loaded (through registration.usercache) if the view
+  uses request.user. It lives TOKEN_ACCESS_TTL seconds.
+- a refresh token, exchanged at registration:token_refresh for a new pair.
+  Each one can be used once: using it again revokes every token of the
+  same sign-in, as one of the two uses must have been by someone else. It
+  lives TOKEN_REFRESH_TTL seconds and stops working when the password
+  changes.
+
+Signing out (registration:token_revoke) revokes every token of the sign-in
+by adding its family id to the RevokedToken table, where used refresh token
+ids are recorded too. It's the database rather than a cache, which could
+evict an entry and so bring a revoked token back. Each process keeps the
+answers in an LRU for TOKEN_REVOCATION_LOCAL_TTL seconds, so a sign-in's
+tokens cost a query at most that often, and access tokens can keep working
+in other processes for that long. Rows expire with the tokens they stop,
+and ``manage.py expire_tokens`` deletes them.
+"""
+import datetime
+import secrets
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, load_backend
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .lru import LRUCache
+from .models import RevokedToken
+
+ACCESS_SALT = "registration.tokens.access"
+REFRESH_SALT = "registration.tokens.refresh"
+
+# Token id -> whether it's revoked
+local = LRUCache(
+    maxsize=getattr(settings, "TOKEN_REVOCATION_LOCAL_SIZE", 10000),
+    ttl=getattr(settings, "TOKEN_REVOCATION_LOCAL_TTL", 5),
+)
+
+
+class InvalidToken(Exception):
+    """Raised for a token that is malformed, tampered with, expired or revoked."""
+
+
+def _access_ttl():
+    return getattr(settings, "TOKEN_ACCESS_TTL", 5 * 60)
+
+
+def _refresh_ttl():
+    return getattr(settings, "TOKEN_REFRESH_TTL", 14 * 24 * 60 * 60)
+
+
+def _expires_at():
+    # When every token a revocation stops has expired
+    return timezone.now() + datetime.timedelta(seconds=_refresh_ttl())
+
+
+def _password_hash(user):
+    # Changes with the password, like the session's auth hash
+    return user.get_session_auth_hash()[:16]
+
+
+def _load(token, salt, max_age):
+    try:
+        return signing.loads(token, salt=salt, max_age=max_age)
+    except signing.BadSignature as e:
+        # Including SignatureExpired
+        raise InvalidToken(str(e)) from None
+
+
+def issue(user, family=None):
+    """
+    Return a new access and refresh token pair for ``user``, in the
+    ``family`` of an earlier pair if given, as the token endpoints' JSON.
+    """
+    family = family or secrets.token_urlsafe(12)
+    access = signing.dumps({"u": user.pk, "f": family}, salt=ACCESS_SALT)
+    refresh = signing.dumps(
+        {
+            "u": user.pk,
+            "f": family,
+            "j": secrets.token_urlsafe(12),
+            "p": _password_hash(user),
+        },
+        salt=REFRESH_SALT,
+    )
+    return {
+        "access_token": access,
+        "token_type": "Bearer",
+        "expires_in": _access_ttl(),
+        "refresh_token": refresh,
+    }
+
+
+def is_revoked(token_id):
+    revoked = local.get(token_id)
+    if revoked is None:
+        revoked = RevokedToken.objects.filter(token_id=token_id).exists()
+        local.set(token_id, revoked)
+    return revoked
+
+
+def revoke(token_id):
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(token_id=token_id, expires_at=_expires_at())],
+        ignore_conflicts=True,
+    )
+    local.set(token_id, True)
+
+
+def _use(token_id):
+    """Record refresh token ``token_id`` as used, or return False if it was."""
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(token_id=token_id, expires_at=_expires_at())
+    except IntegrityError:
+        return False
+    return True
+
+
+def clear_expired():
+    """Delete the revocations of expired tokens and return how many."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def verify_access(token):
+    """
+    Return the payload of access token ``token`` ({"u": user id, "f":
+    family id}) or raise InvalidToken. Queries the database only when the
+    family's revocation isn't in the local LRU.
+    """
+    payload = _load(token, ACCESS_SALT, _access_ttl())
+    if is_revoked(payload["f"]):
+        raise InvalidToken("Token revoked")
+    return payload
+
+
+def refresh(token):
+    """
+    Return a new token pair for refresh token ``token``, which can't be
+    used again, or raise InvalidToken.
+    """
+    payload = _load(token, REFRESH_SALT, _refresh_ttl())
+    if is_revoked(payload["f"]):
+        raise InvalidToken("Token revoked")
+    if not _use(payload["j"]):
+        revoke(payload["f"])
+        raise InvalidToken("Refresh token reused")
+    user = get_user_model()._default_manager.filter(pk=payload["u"]).first()
+    if (
+        user is None
+        or not user.is_active
+        or not constant_time_compare(payload["p"], _password_hash(user))
+    ):
+        raise InvalidToken("Token revoked")
+    return issue(user, payload["f"])
+
+
+def revoke_refresh(token):
+    """Revoke every token of the sign-in refresh token ``token`` belongs to."""
+    revoke(_load(token, REFRESH_SALT, _refresh_ttl())["f"])
+
+
+def get_user(request):
+    """
+    Return the user of a request authenticated by an access token, cached
+    on the request like django.contrib.auth.get_user() does.
+    """
+    if not hasattr(request, "_cached_user"):
+        backend = load_backend(settings.AUTHENTICATION_BACKENDS[0])
+        request._cached_user = backend.get_user(request.auth["u"]) or AnonymousUser()
+    return request._cached_user
@@ -0,0 +1,103 @@
+"""
+Batched timestamp updates.
+
+Bumping ``last_login`` on every login or a session's expiry date on every
+request costs an UPDATE each time. A TouchBuffer collects those timestamps
+in memory and writes them with one bulk UPDATE once enough are pending or
+the oldest has waited long enough, on the next touch or from a timer if
+none comes. A touch can be lost if the process dies before it is flushed,
+which is acceptable for these bookkeeping fields.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class TouchBuffer:
+    def __init__(self, model_label, field, max_pending=None, max_delay=None):
+        self.model_label = model_label
+        self.field = field
+        self.max_pending = max_pending or getattr(settings, "TOUCH_BUFFER_SIZE", 100)
+        self.max_delay = max_delay or getattr(settings, "TOUCH_BUFFER_DELAY", 5)
+        self._pending = {}
+        self._first_pending_at = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def touch(self, pk, value):
+        with self._lock:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+                self._timer = threading.Timer(self.max_delay, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+            self._pending[pk] = value
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._first_pending_at >= self.max_delay
+            )
+        if due:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self):
+        """
+        Write every pending timestamp in a single UPDATE and return how many
+        rows were touched.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        model = apps.get_model(self.model_label)
+        objs = [model(pk=pk, **{self.field: value}) for pk, value in pending.items()]
+        model._default_manager.bulk_update(objs, [self.field])
+        return len(objs)
+
+    def _flush_due(self):
+        # In the timer's thread, which has database connections of its own
+        try:
+            self.flush()
+        except Exception:
+            logger.exception(
+                "Flushing %s.%s touches failed", self.model_label, self.field
+            )
+        finally:
+            connections.close_all()
+
+
+last_logins = TouchBuffer(settings.AUTH_USER_MODEL, "last_login")
+session_expiries = TouchBuffer("sessions.Session", "expire_date")
+
+
+def buffer_last_login(sender, user, **kwargs):
+    """
+    Replacement for django.contrib.auth.models.update_last_login that
+    defers the write to the last_logins buffer.
+    """
+    user.last_login = timezone.now()
+    last_logins.touch(user.pk, user.last_login)
+
+
+@atexit.register
+def flush_all():
+    for buffer in (last_logins, session_expiries):
+        try:
+            buffer.flush()
+        except Exception:
+            # The database may already be gone at interpreter exit
+            pass
@@ -22,4 +22,8 @@ urlpatterns = [
         views.UserPasswordResetConfirmView.as_view(),
         name="password_reset_confirm",
     ),
+    path("token/", views.obtain_token, name="token"),
+    path("token/refresh/", views.refresh_token, name="token_refresh"),
+    path("token/revoke/", views.revoke_token, name="token_revoke"),
+    path("me/", views.me, name="me"),
 ]
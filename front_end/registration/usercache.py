@@ -0,0 +1,118 @@
+"""
+Two-tier cache of User rows keyed by id, used by EmailBackend.get_user() so
+AuthenticationMiddleware doesn't query the database on every request.
+
+Entries in the shared cache are stored under a per-user version token, and
+saving or deleting a user replaces the token, so every process stops
+reading the old entry at once. A row is cached under the version read
+before it was loaded, so a row loaded before a concurrent save is written
+to the dead version rather than the one the save put in place. The in-process tier is trusted for
+USER_CACHE_LOCAL_TTL seconds, which bounds how long another process can
+keep serving a user after it was changed. Changes that bypass save(), like
+QuerySet.update(), must call invalidate() themselves.
+"""
+import pickle
+import threading
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from front_end import metrics
+
+from .lru import LRUCache
+
+local = LRUCache(
+    maxsize=getattr(settings, "USER_CACHE_LOCAL_SIZE", 10000),
+    ttl=getattr(settings, "USER_CACHE_LOCAL_TTL", 5),
+)
+# Ids of users saved in a transaction this thread hasn't finished yet
+_uncommitted = threading.local()
+
+
+def _shared():
+    return caches[getattr(settings, "USER_CACHE_ALIAS", "default")]
+
+
+def _version_key(user_id):
+    return f"user:{user_id}:version"
+
+
+def _current_version(user_id):
+    cache = _shared()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def get_user(user_id):
+    """
+    Return ``(user, version)``: the cached user with this id and None, or on
+    a miss None and the version to pass cache_user() with the loaded row.
+    """
+    data = local.get(user_id)
+    if data is None:
+        version = _current_version(user_id)
+        data = _shared().get(f"user:{user_id}:{version}")
+        if data is None:
+            metrics.count("cache_misses")
+            return None, version
+        local.set(user_id, data)
+    metrics.count("cache_hits")
+    return pickle.loads(data), None
+
+
+def _uncommitted_ids():
+    if not hasattr(_uncommitted, "ids"):
+        _uncommitted.ids = set()
+    return _uncommitted.ids
+
+
+def cache_user(user, version=None):
+    """
+    Cache ``user`` under ``version``, as returned by get_user() before the
+    row was loaded. Without one the current version is used, which is only
+    right if nothing can have saved the user since it was loaded.
+    """
+    uncommitted = _uncommitted_ids()
+    if uncommitted:
+        if not transaction.get_connection(user._state.db).in_atomic_block:
+            # Those transactions are over. Rolled back ones were invalidated
+            # when the user was saved, so there's nothing left to do.
+            uncommitted.clear()
+        elif user.pk in uncommitted:
+            return
+    data = pickle.dumps(user)
+    if version is None:
+        version = _current_version(user.pk)
+    _shared().set(
+        f"user:{user.pk}:{version}",
+        data,
+        getattr(settings, "USER_CACHE_TIMEOUT", 60 * 60),
+    )
+    if _current_version(user.pk) == version:
+        local.set(user.pk, data)
+
+
+def invalidate(user_id):
+    _shared().set(_version_key(user_id), uuid.uuid4().hex, None)
+    local.delete(user_id)
+
+
+def _committed(user_id):
+    _uncommitted_ids().discard(user_id)
+    invalidate(user_id)
+
+
+def invalidate_user(sender, instance, using, **kwargs):
+    """post_save and post_delete receiver for the user model."""
+    invalidate(instance.pk)
+    if transaction.get_connection(using).in_atomic_block:
+        # Caching the row before the transaction commits would keep it
+        # in the cache after a rollback
+        _uncommitted_ids().add(instance.pk)
+        transaction.on_commit(partial(_committed, instance.pk), using=using)
@@ -0,0 +1,264 @@
+"""
+Streaming bulk import and export of users with PostgreSQL COPY, used by the
+import_users and export_users commands.
+
+Rows are read and written one batch at a time, so memory use doesn't grow
+with the size of the file. Each imported batch is copied into a temporary
+table and inserted from there with ON CONFLICT DO NOTHING, so existing
+users and duplicates across batches are skipped by the unique lower(email)
+index rather than by keeping every email seen in memory.
+"""
+
+import csv
+import datetime
+import io
+import itertools
+import json
+import resource
+import sys
+import time
+
+from django.contrib.auth import hashers
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxLengthValidator, validate_email
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .hashing import create_pool
+from .models import User
+
+IMPORT_TABLE = "registration_user_import"
+TRUE = {"1", "t", "true", "yes", "y"}
+FALSE = {"0", "f", "false", "no", "n"}
+UTC = datetime.timezone.utc
+
+
+def infer_format(path):
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(file, format):
+    """Yield each row of a CSV (with a header) or JSON lines file as a dict."""
+    if format == "csv":
+        yield from csv.DictReader(file)
+    else:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def max_rss():
+    """Peak resident memory of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _boolean(value, default):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in TRUE:
+        return True
+    if value in FALSE:
+        return False
+    raise ValueError(f"'{value}' is not a boolean")
+
+
+def _datetime(value):
+    if value is None or value == "":
+        return None
+    parsed = parse_datetime(str(value).strip())
+    if parsed is None:
+        raise ValueError(f"'{value}' is not a date and time")
+    # Taken to be UTC, as Postgres would in the connection's time zone
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, UTC)
+
+
+def _password_hash(encoded):
+    """Return ``encoded`` if it's unusable or made by one of PASSWORD_HASHERS."""
+    if not encoded.startswith(hashers.UNUSABLE_PASSWORD_PREFIX):
+        hashers.identify_hasher(encoded)
+    return encoded
+
+
+# Checked in _clean(), as a longer value would fail the batch's COPY
+_validate_email_length = MaxLengthValidator(User._meta.get_field("email").max_length)
+_validate_password_length = MaxLengthValidator(
+    User._meta.get_field("password").max_length
+)
+
+
+class UserImporter:
+    """
+    Import rows with an ``email`` and either a plaintext ``password`` or an
+    encoded ``password_hash``, plus optional ``is_active``, ``is_admin`` and
+    ``last_login``. Rows without a password get an unusable one.
+
+    Plaintext passwords are hashed across ``workers`` processes; with a
+    single worker they're hashed inline.
+    """
+
+    def __init__(self, batch_size=10000, workers=None, on_error=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.on_error = on_error
+        self.stats = dict.fromkeys(["read", "imported", "duplicates", "invalid"], 0)
+
+    def run(self, rows):
+        start = time.perf_counter()
+        pool = create_pool(self.workers) if self.workers != 1 else None
+        try:
+            self._create_import_table()
+            for batch in batched(rows, self.batch_size):
+                self._import_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stats["seconds"] = time.perf_counter() - start
+        self.stats["max_rss"] = max_rss()
+        return self.stats
+
+    def _error(self, line, message):
+        self.stats["invalid"] += 1
+        if self.on_error is not None:
+            self.on_error(line, message)
+
+    def _clean(self, batch):
+        """
+        Validate and normalize a batch, dropping invalid rows and repeated
+        emails. Return the cleaned rows and the plaintext passwords to hash,
+        by row index.
+        """
+        cleaned, plaintext, seen = [], {}, set()
+        for row in batch:
+            self.stats["read"] += 1
+            line = self.stats["read"]
+            try:
+                email = User.objects.normalize_email((row.get("email") or "").strip())
+                _validate_email_length(email)
+                validate_email(email)
+                password_hash = row.get("password_hash") or None
+                if password_hash is not None:
+                    _validate_password_length(password_hash)
+                    password_hash = _password_hash(password_hash)
+                is_active = _boolean(row.get("is_active"), True)
+                is_admin = _boolean(row.get("is_admin"), False)
+                last_login = _datetime(row.get("last_login"))
+            except (ValidationError, ValueError) as e:
+                message = e.messages[0] if isinstance(e, ValidationError) else str(e)
+                self._error(line, message)
+                continue
+            if email.lower() in seen:
+                self.stats["duplicates"] += 1
+                continue
+            seen.add(email.lower())
+            if password_hash is None:
+                if row.get("password"):
+                    plaintext[len(cleaned)] = row["password"]
+                else:
+                    password_hash = hashers.make_password(None)
+            cleaned.append([email, password_hash, is_active, is_admin, last_login])
+        return cleaned, plaintext
+
+    def _import_batch(self, batch, pool):
+        cleaned, plaintext = self._clean(batch)
+        if plaintext:
+            if pool is None:
+                hashed = map(hashers.make_password, plaintext.values())
+            else:
+                hashed = pool.map(
+                    hashers.make_password, plaintext.values(), chunksize=8
+                )
+            for index, encoded in zip(plaintext, hashed):
+                cleaned[index][1] = encoded
+        if not cleaned:
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for email, password, is_active, is_admin, last_login in cleaned:
+            writer.writerow(
+                [
+                    email,
+                    password,
+                    "t" if is_active else "f",
+                    "t" if is_admin else "f",
+                    last_login,
+                ]
+            )
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(User._meta.db_table)
+        columns = "email, password, is_active, is_admin, last_login"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {IMPORT_TABLE}")
+            cursor.copy_expert(
+                f"COPY {IMPORT_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM {IMPORT_TABLE} "
+                "ON CONFLICT DO NOTHING"
+            )
+            imported = cursor.rowcount
+        self.stats["imported"] += imported
+        self.stats["duplicates"] += len(cleaned) - imported
+
+    def _create_import_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {IMPORT_TABLE} ("
+                "email varchar(254), password varchar(128), is_active boolean, "
+                "is_admin boolean, last_login timestamp with time zone)"
+            )
+
+
+class _JSONLinesWriter(io.TextIOBase):
+    """Write the CSV produced by COPY ... TO STDOUT as JSON lines."""
+
+    def __init__(self, out):
+        self.out = out
+        self.partial = ""
+
+    def write(self, data):
+        lines = (self.partial + data).split("\n")
+        self.partial = lines.pop()
+        for email, password_hash, is_active, is_admin, last_login in csv.reader(lines):
+            row = {
+                "email": email,
+                "password_hash": password_hash,
+                "is_active": is_active == "t",
+                "is_admin": is_admin == "t",
+                "last_login": last_login or None,
+            }
+            self.out.write(json.dumps(row) + "\n")
+        return len(data)
+
+
+def export_users(out, format):
+    """
+    Stream every user to ``out`` as CSV with a header or as JSON lines and
+    return the number of rows written.
+    """
+    table = connection.ops.quote_name(User._meta.db_table)
+    query = (
+        "SELECT email, password AS password_hash, is_active, is_admin, last_login "
+        f"FROM {table} ORDER BY id"
+    )
+    options = "FORMAT csv, HEADER" if format == "csv" else "FORMAT csv"
+    target = out if format == "csv" else _JSONLinesWriter(out)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH ({options})", target)
+        return cursor.rowcount
@@ -1,4 +1,5 @@
 from django.contrib import messages
+from django.contrib.auth import authenticate, user_logged_in
 from django.contrib.auth.views import (
     LoginView,
     PasswordChangeView,
@@ -6,15 +7,19 @@ from django.contrib.auth.views import (
     PasswordResetView,
 )
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.utils.safestring import mark_safe
 from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.debug import sensitive_post_parameters
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import CreateView
 
 from registration import forms as registration_forms
+from registration import tokens
+from registration.ratelimit import ratelimit
 
 
 class SignupView(SuccessMessageMixin, CreateView):
@@ -24,11 +29,13 @@ class SignupView(SuccessMessageMixin, CreateView):
     success_message = "Account created successfully. You can now login"
 
 
+@method_decorator(ratelimit("login", email_field="username"), name="dispatch")
 class SigninView(LoginView):
     form_class = registration_forms.UserLoginForm
     template_name = "registration/login.html"
 
 
+@method_decorator(ratelimit("reset_password"), name="dispatch")
 class UserPasswordResetView(SuccessMessageMixin, PasswordResetView):
     form_class = registration_forms.UserPasswordResetForm
     template_name = "registration/password_reset_form.html"
@@ -45,6 +52,27 @@ class UserPasswordChangeView(SuccessMessageMixin, PasswordChangeView):
     success_message = "Your password has been changed"
     success_url = reverse_lazy("home")
 
+class CheckedOnceTokenGenerator:
+    """
+    Wrap a token generator so that each token is checked once per request,
+    as PasswordResetConfirmView.dispatch() and UserPasswordResetConfirmView
+    both ask. An invalid token costs two HMACs (one for the legacy format).
+    """
+
+    def __init__(self, token_generator):
+        self.token_generator = token_generator
+        self.checked = {}
+
+    def __getattr__(self, name):
+        return getattr(self.token_generator, name)
+
+    def check_token(self, user, token):
+        key = (user and user.pk, token)
+        if key not in self.checked:
+            self.checked[key] = self.token_generator.check_token(user, token)
+        return self.checked[key]
+
+
 class UserPasswordResetConfirmView(SuccessMessageMixin, PasswordResetConfirmView):
     form_class = registration_forms.UserPasswordResetConfirmForm
     success_url = reverse_lazy("registration:login")
@@ -52,6 +80,10 @@ class UserPasswordResetConfirmView(SuccessMessageMixin, PasswordResetConfirmView
     success_message = mark_safe("Your password has been reset")
     error_message = mark_safe("Password reset link is not valid")
 
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.token_generator = CheckedOnceTokenGenerator(self.token_generator)
+
     @method_decorator(sensitive_post_parameters())
     @method_decorator(never_cache)
     def dispatch(self, *args, **kwargs):
@@ -62,10 +94,74 @@ class UserPasswordResetConfirmView(SuccessMessageMixin, PasswordResetConfirmView
 
         dispatch_return = super().dispatch(*args, **kwargs)
 
+        # The session's token was checked by super() if it's the link's
+        # second step, and the link's token comes from its cache otherwise
         token = kwargs["token"]
-        valid_token = self.token_generator.check_token(self.user, token)
-        if valid_token or token == self.reset_url_token:
+        if token == self.reset_url_token or self.token_generator.check_token(
+            self.user, token
+        ):
             return dispatch_return
         else:
             messages.add_message(self.request, messages.ERROR, self.error_message)
             return HttpResponseRedirect(reverse_lazy("registration:login"))
+
+
+def token_error(error, description, status=400):
+    return JsonResponse(
+        {"error": error, "error_description": description}, status=status
+    )
+
+
+# The token endpoints take form-encoded POSTs from API clients, which carry
+# no cookies for a forged request to ride on.
+
+
+@csrf_exempt
+@require_POST
+@sensitive_post_parameters("password")
+@never_cache
+@ratelimit("login")
+def obtain_token(request):
+    """Exchange an email and password for a token pair (registration/tokens.py)."""
+    user = authenticate(
+        request,
+        username=request.POST.get("email"),
+        password=request.POST.get("password"),
+    )
+    if user is None:
+        return token_error("invalid_grant", "Wrong email or password.")
+    user_logged_in.send(sender=user.__class__, request=request, user=user)
+    return JsonResponse(tokens.issue(user))
+
+
+@csrf_exempt
+@require_POST
+@never_cache
+def refresh_token(request):
+    """Exchange a refresh token for a new token pair."""
+    try:
+        return JsonResponse(tokens.refresh(request.POST.get("refresh_token", "")))
+    except tokens.InvalidToken as e:
+        return token_error("invalid_grant", str(e))
+
+
+@csrf_exempt
+@require_POST
+def revoke_token(request):
+    """Sign out the refresh token's sign-in. Unknown tokens are ignored."""
+    try:
+        tokens.revoke_refresh(request.POST.get("refresh_token", ""))
+    except tokens.InvalidToken:
+        pass
+    return HttpResponse(status=204)
+
+
+@require_GET
+@never_cache
+def me(request):
+    """The signed-in user, by session or by access token."""
+    if not request.user.is_authenticated:
+        return token_error("unauthorized", "Sign in first.", status=401)
+    return JsonResponse(
+        {"email": request.user.email, "is_admin": request.user.is_admin}
+    )
@@ -0,0 +1,27 @@
+// Submit the changelist search shortly after typing stops, rather than
+// waiting for Enter. One or two characters match too much of a large table
+// to be worth a request each, so those still need Enter.
+(function() {
+    "use strict";
+    var DELAY = 400;
+
+    document.addEventListener("DOMContentLoaded", function() {
+        var input = document.getElementById("searchbar");
+        if (!input) {
+            return;
+        }
+        var submitted = input.value.trim();
+        var timer;
+        input.addEventListener("input", function() {
+            clearTimeout(timer);
+            timer = setTimeout(function() {
+                var term = input.value.trim();
+                if (term === submitted || (term.length > 0 && term.length < 3)) {
+                    return;
+                }
+                submitted = term;
+                input.form.submit();
+            }, DELAY);
+        });
+    });
+})();
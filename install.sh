@@ -3,11 +3,12 @@
 echo "Installing dependencies..."
 conda env create -f build-mac.yml
 brew update
-brew install sass/sass/sass
-brew install postgresql
+# 15 or newer, see README.md
+brew install postgresql@16
+brew link --force postgresql@16
 
 echo "Starting Postgres..."
-brew services start postgres
+brew services start postgresql@16
 
 psql -U "$USER" -d postgres -c "CREATE USER ${POSTGRES_USER} WITH PASSWORD '${POSTGRES_PASSWORD}';"
 psql -U "$USER" -d postgres -c "CREATE DATABASE ${POSTGRES_DB} WITH OWNER "$USER" TEMPLATE template0 ENCODING 'UTF8';"
@@ -15,8 +16,8 @@ psql -U "$USER" -d postgres -c "GRANT ALL PRIVILEGES ON DATABASE ${POSTGRES_DB}
 psql -U "$USER" -d postgres -c "ALTER ROLE ${POSTGRES_USER} SET timezone TO 'UTC';"
 psql -U "$USER" -d postgres -c "ALTER USER ${POSTGRES_USER} CREATEDB;"
 
-echo "Compiling CSS..."
-sass front_end/static/base.scss front_end/static/base.css
+echo "Building static files..."
+python front_end/manage.py build_static
 
 echo "Applying Django migrations..."
 python front_end/manage.py migrate